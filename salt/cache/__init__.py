@@ -8,6 +8,7 @@ Loader mechanism for caching data, with data expiration, etc.
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
 import logging
+import os
 import time
 
 # Import Salt libs
@@ -17,9 +18,13 @@ from salt.payload import Serial
 from salt.utils.odict import OrderedDict
 import salt.loader
 import salt.syspaths
+import salt.utils.event
 
 log = logging.getLogger(__name__)
 
+# Fired on the master event bus by MemCache when keys are stored or flushed
+INVALIDATE_TAG = salt.utils.event.tagify('invalidate', 'cache')
+
 
 def factory(opts, **kwargs):
     '''
@@ -179,6 +184,114 @@ class Cache(object):
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, bank, keys):
+        '''
+        Fetch several keys of the same bank at once.
+
+        Drivers providing a ``fetch_many`` function get all the keys in one
+        request, the others are queried key by key.
+
+        :param bank:
+            The name of the location inside the cache which holds the keys.
+
+        :param keys:
+            An iterable of key names.
+
+        :return:
+            A dict mapping each key to the fetched python object, or to an
+            empty dict if the key was not found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+
+        .. versionadded:: Fluorine
+        '''
+        keys = list(keys)
+        fun = '{0}.fetch_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank, keys, **self._kwargs)
+        fetch = self.modules['{0}.fetch'.format(self.driver)]
+        return dict((key, fetch(bank, key, **self._kwargs)) for key in keys)
+
+    def fetch_banks(self, banks, key):
+        '''
+        Fetch the same key from several banks at once, i.e. the ``data`` key
+        of a list of ``minions/<minion_id>`` banks.
+
+        :param banks:
+            An iterable of bank names.
+
+        :param key:
+            The name of the key to fetch from each bank.
+
+        :return:
+            A dict mapping each bank to the fetched python object, or to an
+            empty dict if the key was not found in that bank.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+
+        .. versionadded:: Fluorine
+        '''
+        banks = list(banks)
+        fun = '{0}.fetch_banks'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](banks, key, **self._kwargs)
+        fetch = self.modules['{0}.fetch'.format(self.driver)]
+        return dict((bank, fetch(bank, key, **self._kwargs)) for bank in banks)
+
+    def store_many(self, bank, mapping):
+        '''
+        Store several keys of the same bank at once.
+
+        :param bank:
+            The name of the location inside the cache which will hold the keys.
+
+        :param mapping:
+            A dict mapping key names to the data to store under them.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+
+        .. versionadded:: Fluorine
+        '''
+        fun = '{0}.store_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank, mapping, **self._kwargs)
+        store = self.modules['{0}.store'.format(self.driver)]
+        for key, data in six.iteritems(mapping):
+            store(bank, key, data, **self._kwargs)
+
+    def iter_bank(self, bank):
+        '''
+        Iterate over the keys stored in the specified bank and their data.
+        Sub-banks are skipped.
+
+        :param bank:
+            The name of the location inside the cache which holds the keys.
+
+        :return:
+            An iterator of ``(key, data)`` tuples.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+
+        .. versionadded:: Fluorine
+        '''
+        fun = '{0}.iter_bank'.format(self.driver)
+        if fun in self.modules:
+            for item in self.modules[fun](bank, **self._kwargs):
+                yield item
+            return
+        fetch = self.modules['{0}.fetch'.format(self.driver)]
+        for key in self.list(bank):
+            if self.contains(bank, key):
+                yield key, fetch(bank, key, **self._kwargs)
+
     def updated(self, bank, key):
         '''
         Get the last updated epoch for the specified key
@@ -271,30 +384,51 @@ class Cache(object):
 
 class MemCache(Cache):
     '''
-    Short-lived in-memory cache store keeping values on time and/or size (count)
-    basis.
+    Short-lived in-memory cache store keeping values on time and/or size (count
+    and bytes) basis, evicting the least recently used values first.
+
+    With ``memcache_invalidate_events`` the master processes drop the values
+    stored or flushed by the other processes from their memory.
     '''
     # {<storage_id>: odict({<key>: [atime, data], ...}), ...}
     data = {}
+    # {<storage_id>: {<key>: size, ...}, ...}, only with memcache_max_bytes
+    sizes = {}
+    # {<storage_id>: {'hits': 0, 'misses': 0, 'evictions': 0, ...}, ...}
+    counters = {}
+    # {(<pid>, <listen>): <master event>, ...}
+    _events = {}
+    # {(<pid>, <listen>): <time of the next connection attempt>, ...}
+    _event_retries = {}
+    # Seconds between the attempts to connect to the master event bus
+    event_retry_interval = 60
 
     def __init__(self, opts, **kwargs):
         super(MemCache, self).__init__(opts, **kwargs)
         self.expire = opts.get('memcache_expire_seconds', 10)
         self.max = opts.get('memcache_max_items', 1024)
+        self.max_bytes = opts.get('memcache_max_bytes', 0)
         self.cleanup = opts.get('memcache_full_cleanup', False)
         self.debug = opts.get('memcache_debug', False)
+        self.notify = bool(opts.get('memcache_invalidate_events', False)
+                           and opts.get('__role') == 'master'
+                           and 'sock_dir' in opts)
         if self.debug:
             self.call = 0
             self.hit = 0
         self._storage = None
+        self._storage_id = None
 
     @classmethod
     def __cleanup(cls, expire):
         now = time.time()
-        for storage in six.itervalues(cls.data):
+        for storage_id, storage in six.iteritems(cls.data):
+            sizes = cls.sizes[storage_id]
             for key, data in list(storage.items()):
                 if data[0] + expire < now:
                     del storage[key]
+                    if key in sizes:
+                        cls.counters[storage_id]['bytes'] -= sizes.pop(key)
                 else:
                     break
 
@@ -311,16 +445,142 @@ class MemCache(Cache):
             storage_id = self._get_storage_id()
             if storage_id not in MemCache.data:
                 MemCache.data[storage_id] = OrderedDict()
+                MemCache.sizes[storage_id] = {}
+                MemCache.counters[storage_id] = dict.fromkeys(
+                    ('hits', 'misses', 'evictions', 'invalidations', 'bytes'), 0)
+            self._storage_id = storage_id
             self._storage = MemCache.data[storage_id]
+            self._sizes = MemCache.sizes[storage_id]
+            self._counters = MemCache.counters[storage_id]
         return self._storage
 
-    def fetch(self, bank, key):
+    def stats(self):
+        '''
+        Return the hit, miss, eviction and invalidation counters of the
+        storage used by this cache with its current size in items and, when
+        ``memcache_max_bytes`` is set, in serialized bytes.
+
+        The counters are shared by all the instances of the process using
+        the same storage.
+        '''
+        items = len(self.storage)
+        ret = dict(self._counters)
+        ret['items'] = items
+        return ret
+
+    def _event(self, listen):
+        '''
+        Return the master event bus connection of the current process used to
+        listen for or to fire the invalidation events, None if the bus can't
+        be reached. The connection is attempted again once
+        ``event_retry_interval`` seconds have passed.
+        '''
+        key = (os.getpid(), listen)
+        event = MemCache._events.get(key)
+        if event is not None or time.time() < MemCache._event_retries.get(key, 0):
+            return event
+        event = salt.utils.event.get_master_event(self.opts,
+                                                  self.opts['sock_dir'],
+                                                  listen=False)
+        if listen:
+            # Have the publisher only send the invalidation events, rather
+            # than every event of the master which would pile up between two
+            # drains
+            event.filter_events(tags=[['startswith', INVALIDATE_TAG]])
+            if not event.connect_pub(timeout=5):
+                log.warning('MemCache could not connect to the master event '
+                            'bus, entries are only expired by time for the '
+                            'next %s seconds', self.event_retry_interval)
+                event.destroy()
+                MemCache._event_retries[key] = time.time() + self.event_retry_interval
+                return None
+        MemCache._events[key] = event
+        return event
+
+    def _invalidate(self):
+        '''
+        Drop the entries stored or flushed by the other processes since the
+        last call.
+        '''
+        event = self._event(listen=True)
+        if event is None:
+            return
+        # The events name the storage they apply to, which is not known yet
+        # if nothing was cached by this instance before the first drain
+        storage_id = self._storage_id if self._storage is not None \
+            else self._get_storage_id()
+        while True:
+            try:
+                ret = event.get_event_noblock()
+            except Exception as exc:
+                # The events fired since the connection was lost are gone, so
+                # any entry may be stale
+                log.warning('MemCache lost the master event bus, dropping '
+                            'the cached entries: %s', exc)
+                event.destroy()
+                MemCache._events.pop((os.getpid(), True), None)
+                for bank, key in list(self.storage):
+                    self._drop(bank, key)
+                break
+            if ret is None:
+                break
+            if not ret['tag'].startswith(INVALIDATE_TAG):
+                continue
+            data = ret['data']
+            if data.get('pid') == os.getpid() \
+                    or data.get('storage') != storage_id:
+                continue
+            self._drop_keys(data['bank'], data.get('keys'))
+            self._counters['invalidations'] += 1
+
+    def _publish(self, bank, keys=None):
+        '''
+        Tell the other processes that keys of a bank, or the whole bank when
+        ``keys`` is None, were changed.
+        '''
+        event = self._event(listen=False)
+        try:
+            event.fire_event({'storage': self._storage_id,
+                              'bank': bank,
+                              'keys': keys,
+                              'pid': os.getpid()},
+                             INVALIDATE_TAG)
+        except Exception as exc:
+            log.warning('Failed to fire the cache invalidation event for %s: %s',
+                        bank, exc)
+
+    def _drop(self, bank, key):
+        self.storage.pop((bank, key), None)
+        if (bank, key) in self._sizes:
+            self._counters['bytes'] -= self._sizes.pop((bank, key))
+
+    def _drop_keys(self, bank, keys=None):
+        if keys is not None:
+            for key in keys:
+                self._drop(bank, key)
+            return
+        # The whole bank including its sub-banks
+        prefix = bank + '/'
+        for cbank, ckey in list(self.storage):
+            if cbank == bank or cbank.startswith(prefix):
+                self._drop(cbank, ckey)
+
+    def _full(self, size):
+        if len(self.storage) >= self.max:
+            return True
+        return bool(self.max_bytes) and self._counters['bytes'] + size > self.max_bytes
+
+    def _get(self, bank, key, now):
+        '''
+        Return the ``[atime, data]`` record of the key if it is cached and
+        not expired, None otherwise.
+        '''
         if self.debug:
             self.call += 1
-        now = time.time()
         record = self.storage.pop((bank, key), None)
         # Have a cached value for the key
         if record is not None and record[0] + self.expire >= now:
+            self._counters['hits'] += 1
             if self.debug:
                 self.hit += 1
                 log.debug(
@@ -330,28 +590,100 @@ class MemCache(Cache):
             # update atime and return
             record[0] = now
             self.storage[(bank, key)] = record
+            return record
+        self._counters['misses'] += 1
+        # Forget the size of an expired value
+        self._drop(bank, key)
+        return None
+
+    def _set(self, bank, key, data, now):
+        size = 0
+        if self.max_bytes:
+            size = len(self.serial.dumps(data))
+            if size > self.max_bytes:
+                # Would not fit even in an empty storage
+                return
+        if self.cleanup and self._full(size):
+            MemCache.__cleanup(self.expire)
+        while self.storage and self._full(size):
+            self._drop(*next(iter(self.storage)))
+            self._counters['evictions'] += 1
+        if self.max:
+            self.storage[(bank, key)] = [now, data]
+            if size:
+                self._sizes[(bank, key)] = size
+                self._counters['bytes'] += size
+
+    def fetch(self, bank, key):
+        if self.notify:
+            self._invalidate()
+        now = time.time()
+        record = self._get(bank, key, now)
+        if record is not None:
             return record[1]
 
         # Have no value for the key or value is expired
         data = super(MemCache, self).fetch(bank, key)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [now, data]
+        self._set(bank, key, data, now)
         return data
 
+    def fetch_many(self, bank, keys):
+        if self.notify:
+            self._invalidate()
+        now = time.time()
+        ret = {}
+        missing = []
+        for key in keys:
+            record = self._get(bank, key, now)
+            if record is None:
+                missing.append(key)
+            else:
+                ret[key] = record[1]
+        if missing:
+            fetched = super(MemCache, self).fetch_many(bank, missing)
+            for key in missing:
+                self._set(bank, key, fetched[key], now)
+            ret.update(fetched)
+        return ret
+
+    def fetch_banks(self, banks, key):
+        if self.notify:
+            self._invalidate()
+        now = time.time()
+        ret = {}
+        missing = []
+        for bank in banks:
+            record = self._get(bank, key, now)
+            if record is None:
+                missing.append(bank)
+            else:
+                ret[bank] = record[1]
+        if missing:
+            fetched = super(MemCache, self).fetch_banks(missing, key)
+            for bank in missing:
+                self._set(bank, key, fetched[bank], now)
+            ret.update(fetched)
+        return ret
+
     def store(self, bank, key, data):
-        self.storage.pop((bank, key), None)
+        self._drop(bank, key)
         super(MemCache, self).store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self._set(bank, key, data, time.time())
+        if self.notify:
+            self._publish(bank, [key])
+
+    def store_many(self, bank, mapping):
+        for key in mapping:
+            self._drop(bank, key)
+        super(MemCache, self).store_many(bank, mapping)
+        now = time.time()
+        for key, data in six.iteritems(mapping):
+            self._set(bank, key, data, now)
+        if self.notify:
+            self._publish(bank, list(mapping))
 
     def flush(self, bank, key=None):
-        self.storage.pop((bank, key), None)
+        self._drop_keys(bank, None if key is None else [key])
         super(MemCache, self).flush(bank, key)
+        if self.notify:
+            self._publish(bank, None if key is None else [key])
@@ -55,6 +55,7 @@ except ImportError:
     HAS_CONSUL = False
 
 from salt.exceptions import SaltCacheError
+from salt.ext import six
 
 log = logging.getLogger(__name__)
 api = None
@@ -126,6 +127,51 @@ def fetch(bank, key):
         )
 
 
+def _get_bank(bank):
+    '''
+    Get the values of all the keys directly under a bank in one request.
+    '''
+    try:
+        _, values = api.kv.get(bank + '/', recurse=True)
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error getting the key "{0}": {1}'.format(
+                bank, exc
+            )
+        )
+    ret = {}
+    for value in values or ():
+        key = value['Key'][len(bank) + 1:]
+        # Skip the keys of sub-banks and the sub-banks themselves
+        if not key or '/' in key or value['Value'] is None:
+            continue
+        ret[key] = value['Value']
+    return ret
+
+
+def fetch_many(bank, keys):
+    '''
+    Fetch several keys of the same bank with a single recursive request.
+    '''
+    values = _get_bank(bank)
+    ret = {}
+    for key in keys:
+        if key in values:
+            ret[key] = __context__['serial'].loads(values[key])
+        else:
+            ret[key] = {}
+    return ret
+
+
+def iter_bank(bank):
+    '''
+    Iterate over the keys of a bank and their data, fetched with a single
+    recursive request.
+    '''
+    return [(key, __context__['serial'].loads(value))
+            for key, value in six.iteritems(_get_bank(bank))]
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
@@ -57,6 +57,7 @@ except ImportError:
     HAS_ETCD = False
 
 from salt.exceptions import SaltCacheError
+from salt.ext import six
 
 _DEFAULT_PATH_PREFIX = "/salt_cache"
 
@@ -152,6 +153,57 @@ def fetch(bank, key):
         )
 
 
+def _get_bank(bank):
+    '''
+    Get the values of all the keys directly under a bank in one request.
+    '''
+    _init_client()
+    path = '{0}/{1}'.format(path_prefix, bank)
+    try:
+        children = list(client.get(path).children)
+    except etcd.EtcdKeyNotFound:
+        return {}
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error getting the key "{0}": {1}'.format(
+                bank, exc
+            )
+        )
+    ret = {}
+    for child in children:
+        # The children of an empty dir is the dir itself, skip it and the
+        # sub-banks
+        if child.dir or child.value is None:
+            continue
+        parent, key = child.key.rsplit('/', 1)
+        if parent == path:
+            ret[key] = child.value
+    return ret
+
+
+def fetch_many(bank, keys):
+    '''
+    Fetch several keys of the same bank with a single request.
+    '''
+    values = _get_bank(bank)
+    ret = {}
+    for key in keys:
+        if key in values:
+            ret[key] = __context__['serial'].loads(values[key])
+        else:
+            ret[key] = {}
+    return ret
+
+
+def iter_bank(bank):
+    '''
+    Iterate over the keys of a bank and their data, fetched with a single
+    request.
+    '''
+    return [(key, __context__['serial'].loads(value))
+            for key, value in six.iteritems(_get_bank(bank))]
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
@@ -21,6 +21,7 @@ import tempfile
 from salt.exceptions import SaltCacheError
 import salt.utils.atomicfile
 import salt.utils.files
+from salt.ext import six
 
 log = logging.getLogger(__name__)
 
@@ -41,11 +42,7 @@ def get_storage_id(kwargs):
     return ('localfs', __cachedir(kwargs))
 
 
-def store(bank, key, data, cachedir):
-    '''
-    Store information in a file.
-    '''
-    base = os.path.join(cachedir, os.path.normpath(bank))
+def _makedirs(base):
     try:
         os.makedirs(base)
     except OSError as exc:
@@ -56,6 +53,8 @@ def store(bank, key, data, cachedir):
                 )
             )
 
+
+def _write(base, key, data):
     outfile = os.path.join(base, '{0}.p'.format(key))
     tmpfh, tmpfname = tempfile.mkstemp(dir=base)
     os.close(tmpfh)
@@ -72,6 +71,25 @@ def store(bank, key, data, cachedir):
         )
 
 
+def store(bank, key, data, cachedir):
+    '''
+    Store information in a file.
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    _makedirs(base)
+    _write(base, key, data)
+
+
+def store_many(bank, mapping, cachedir):
+    '''
+    Store several keys of a bank, creating the bank directory only once.
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    _makedirs(base)
+    for key, data in six.iteritems(mapping):
+        _write(base, key, data)
+
+
 def fetch(bank, key, cachedir):
     '''
     Fetch information from a file.
@@ -100,6 +118,75 @@ def fetch(bank, key, cachedir):
         )
 
 
+def _fetch_file(bank, key, cachedir):
+    '''
+    Open the key file directly and only fall back to fetch, which also looks
+    for the key inside a bank file, when it does not exist. This saves the
+    stat calls for the common case of a bulk read of existing keys.
+    '''
+    key_file = os.path.join(cachedir, os.path.normpath(bank), '{0}.p'.format(key))
+    try:
+        with salt.utils.files.fopen(key_file, 'rb') as fh_:
+            return __context__['serial'].load(fh_)
+    except IOError as exc:
+        if exc.errno not in (errno.ENOENT, errno.EISDIR):
+            raise SaltCacheError(
+                'There was an error reading the cache file "{0}": {1}'.format(
+                    key_file, exc
+                )
+            )
+    return fetch(bank, key, cachedir)
+
+
+def fetch_many(bank, keys, cachedir):
+    '''
+    Fetch several keys of the same bank.
+    '''
+    return dict((key, _fetch_file(bank, key, cachedir)) for key in keys)
+
+
+def fetch_banks(banks, key, cachedir):
+    '''
+    Fetch the same key from several banks.
+    '''
+    return dict((bank, _fetch_file(bank, key, cachedir)) for bank in banks)
+
+
+def iter_bank(bank, cachedir):
+    '''
+    Iterate over the ``(key, data)`` tuples of the files stored in a bank,
+    without a stat call per entry.
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    try:
+        items = os.listdir(base)
+    except OSError as exc:
+        if exc.errno == errno.ENOENT:
+            return
+        raise SaltCacheError(
+            'There was an error accessing directory "{0}": {1}'.format(
+                base, exc
+            )
+        )
+    for item in items:
+        if not item.endswith('.p'):
+            continue
+        key_file = os.path.join(base, item)
+        try:
+            with salt.utils.files.fopen(key_file, 'rb') as fh_:
+                data = __context__['serial'].load(fh_)
+        except IOError as exc:
+            if exc.errno in (errno.ENOENT, errno.EISDIR):
+                # Flushed since the listing or a sub-bank named like a key
+                continue
+            raise SaltCacheError(
+                'There was an error reading the cache file "{0}": {1}'.format(
+                    key_file, exc
+                )
+            )
+        yield item[:-2], data
+
+
 def updated(bank, key, cachedir):
     '''
     Return the epoch of the mtime for this cache file
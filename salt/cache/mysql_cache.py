@@ -66,6 +66,7 @@ except ImportError:
         MySQLdb = None
 
 from salt.exceptions import SaltCacheError
+from salt.ext import six
 
 _DEFAULT_DATABASE_NAME = "salt_cache"
 _DEFAULT_CACHE_TABLE_NAME = "cache"
@@ -89,16 +90,16 @@ def __virtual__():
     return bool(MySQLdb), 'No python mysql client installed.' if MySQLdb is None else ''
 
 
-def run_query(conn, query, retries=3):
+def run_query(conn, query, retries=3, args=None):
     '''
     Get a cursor and run a query. Reconnect up to `retries` times if
-    needed.
+    needed. The optional `args` are bound to the query placeholders.
     Returns: cursor, affected rows counter
     Raises: SaltCacheError, AttributeError, OperationalError
     '''
     try:
         cur = conn.cursor()
-        out = cur.execute(query)
+        out = cur.execute(query, args)
         return cur, out
     except (AttributeError, OperationalError) as e:
         if retries == 0:
@@ -111,7 +112,7 @@ def run_query(conn, query, retries=3):
             log.info("mysql_cache: recreating db connection due to: %r", e)
         global client
         client = MySQLdb.connect(**_mysql_kwargs)
-        return run_query(client, query, retries - 1)
+        return run_query(client, query, retries - 1, args)
     except Exception as e:
         if len(query) > 150:
             query = query[:150] + "<...>"
@@ -211,6 +212,88 @@ def fetch(bank, key):
     return __context__['serial'].loads(r[0])
 
 
+def _placeholders(count):
+    return ', '.join(['%s'] * count)
+
+
+def store_many(bank, mapping):
+    '''
+    Store several keys of the same bank with a single REPLACE query.
+    '''
+    if not mapping:
+        return
+    _init_client()
+    args = []
+    for key, data in six.iteritems(mapping):
+        args.extend((bank, key, __context__['serial'].dumps(data)))
+    query = "REPLACE INTO {0} (bank, etcd_key, data) values {1}".format(
+        _table_name,
+        ', '.join(['(%s, %s, %s)'] * len(mapping)))
+    cur, cnt = run_query(client, query, args=args)
+    cur.close()
+    # REPLACE counts 1 row for an insert and 2 for an update
+    if cnt < len(mapping):
+        raise SaltCacheError(
+            'Error storing {0} keys in {1} returned {2}'.format(
+                len(mapping), bank, cnt)
+        )
+
+
+def fetch_many(bank, keys):
+    '''
+    Fetch several keys of the same bank with a single query.
+    '''
+    if not keys:
+        return {}
+    _init_client()
+    query = "SELECT etcd_key, data FROM {0} WHERE bank=%s " \
+        "AND etcd_key IN ({1})".format(_table_name, _placeholders(len(keys)))
+    cur, _ = run_query(client, query, args=[bank] + list(keys))
+    found = dict(cur.fetchall())
+    cur.close()
+    ret = {}
+    for key in keys:
+        if key in found:
+            ret[key] = __context__['serial'].loads(found[key])
+        else:
+            ret[key] = {}
+    return ret
+
+
+def fetch_banks(banks, key):
+    '''
+    Fetch the same key from several banks with a single query.
+    '''
+    if not banks:
+        return {}
+    _init_client()
+    query = "SELECT bank, data FROM {0} WHERE etcd_key=%s " \
+        "AND bank IN ({1})".format(_table_name, _placeholders(len(banks)))
+    cur, _ = run_query(client, query, args=[key] + list(banks))
+    found = dict(cur.fetchall())
+    cur.close()
+    ret = {}
+    for bank in banks:
+        if bank in found:
+            ret[bank] = __context__['serial'].loads(found[bank])
+        else:
+            ret[bank] = {}
+    return ret
+
+
+def iter_bank(bank):
+    '''
+    Iterate over the keys of a bank and their data, fetched with a single
+    query.
+    '''
+    _init_client()
+    query = "SELECT etcd_key, data FROM {0} WHERE bank=%s".format(_table_name)
+    cur, _ = run_query(client, query, args=[bank])
+    rows = cur.fetchall()
+    cur.close()
+    return [(key, __context__['serial'].loads(data)) for key, data in rows]
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
@@ -157,7 +157,9 @@ except ImportError:
     HAS_REDIS_CLUSTER = False
 
 # Import salt
-from salt.ext.six.moves import range
+import salt.utils.stringutils
+from salt.ext import six
+from salt.ext.six.moves import range, zip
 from salt.exceptions import SaltCacheError
 
 # -----------------------------------------------------------------------------
@@ -377,6 +379,85 @@ def fetch(bank, key):
     return __context__['serial'].loads(redis_value)
 
 
+def _fetch_pipelined(redis_keys):
+    '''
+    Get the values of several Redis keys in one request.
+    '''
+    redis_pipe = _get_redis_server().pipeline()
+    for redis_key in redis_keys:
+        redis_pipe.get(redis_key)
+    try:
+        redis_values = redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot fetch the Redis cache keys {rkeys}: {rerr}'.format(rkeys=', '.join(redis_keys),
+                                                                          rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return [{} if redis_value is None else __context__['serial'].loads(redis_value)
+            for redis_value in redis_values]
+
+
+def fetch_many(bank, keys):
+    '''
+    Fetch several keys of the same bank using a single pipelined request.
+    '''
+    values = _fetch_pipelined([_get_key_redis_key(bank, key) for key in keys])
+    return dict(zip(keys, values))
+
+
+def fetch_banks(banks, key):
+    '''
+    Fetch the same key from several banks using a single pipelined request.
+    '''
+    values = _fetch_pipelined([_get_key_redis_key(bank, key) for bank in banks])
+    return dict(zip(banks, values))
+
+
+def store_many(bank, mapping):
+    '''
+    Store several keys of the same bank using a single pipelined request.
+    '''
+    if not mapping:
+        return
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    redis_bank_keys = _get_bank_keys_redis_key(bank)
+    try:
+        _build_bank_hier(bank, redis_pipe)
+        for key, data in six.iteritems(mapping):
+            redis_pipe.set(_get_key_redis_key(bank, key), __context__['serial'].dumps(data))
+        redis_pipe.sadd(redis_bank_keys, *mapping)
+        log.debug('Setting %s keys under %s', len(mapping), bank)
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot set the Redis cache keys under {rbank}: {rerr}'.format(rbank=bank,
+                                                                             rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def iter_bank(bank):
+    '''
+    Iterate over the keys of a bank and their data. The keys are read from
+    the bank-keys SET, their values with a single pipelined request.
+    '''
+    redis_server = _get_redis_server()
+    redis_bank_keys = _get_bank_keys_redis_key(bank)
+    try:
+        # The members are bytes unless the server decodes the responses
+        keys = [salt.utils.stringutils.to_unicode(key)
+                for key in redis_server.smembers(redis_bank_keys)]
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot list the Redis cache key {rkey}: {rerr}'.format(rkey=redis_bank_keys,
+                                                                       rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    if not keys:
+        return []
+    values = _fetch_pipelined([_get_key_redis_key(bank, key) for key in keys])
+    return list(zip(keys, values))
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content. If no key is specified, remove
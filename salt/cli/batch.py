@@ -11,7 +11,9 @@ import copy
 from datetime import datetime, timedelta
 
 # Import salt libs
+import salt.utils.asynchronous
 import salt.utils.stringutils
+import salt.cli.batch_async
 import salt.client
 import salt.output
 import salt.exceptions
@@ -21,6 +23,7 @@ import salt.exceptions
 from salt.ext import six
 from salt.ext.six.moves import range
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
+import tornado.ioloop
 import logging
 
 log = logging.getLogger(__name__)
@@ -29,6 +32,93 @@ log = logging.getLogger(__name__)
 class Batch(object):
     '''
     Manage the execution of batch runs
+
+    The run is driven by :py:class:`salt.cli.batch_async.BatchAsync` on an
+    IO loop of its own, and its results are yielded as they come.
+    '''
+    def __init__(self, opts, eauth=None, quiet=False, parser=None):
+        self.opts = opts
+        self.eauth = eauth if eauth else {}
+        self.quiet = quiet
+        self.options = parser
+        self.io_loop = tornado.ioloop.IOLoop()
+        self.minions = []
+        self.down_minions = set()
+
+    def get_bnum(self):
+        '''
+        Return the active number of minions to maintain
+        '''
+        try:
+            return salt.cli.batch_async.batch_size(self.opts['batch'], len(self.minions))
+        except ValueError:
+            if not self.quiet:
+                salt.utils.stringutils.print_cli('Invalid batch data sent: {0}\nData must be in the '
+                          'form of %10, 10% or 3'.format(self.opts['batch']))
+
+    def run(self):
+        '''
+        Execute the batch run
+        '''
+        if self.options:
+            show_jid = self.options.show_jid
+        else:
+            show_jid = False
+
+        with salt.utils.asynchronous.current_ioloop(self.io_loop):
+            try:
+                batch = salt.cli.batch_async.BatchAsync(
+                    self.opts, io_loop=self.io_loop, eauth=self.eauth, stream=True)
+            except salt.exceptions.SaltInvocationError as exc:
+                if not self.quiet:
+                    salt.utils.stringutils.print_cli(exc.strerror)
+                return
+            future = batch.run()
+            while True:
+                item = self.io_loop.run_sync(batch.results.get)
+                if item is None:
+                    break
+                if item[0] == 'down':
+                    if not self.quiet:
+                        salt.utils.stringutils.print_cli('Minion {0} did not respond. No job will be sent.'.format(item[1]))
+                    continue
+                if item[0] == 'run':
+                    if not self.quiet:
+                        salt.utils.stringutils.print_cli('\nExecuting run on {0}\n'.format(sorted(item[2])))
+                        if show_jid:
+                            salt.utils.stringutils.print_cli('jid: {0}'.format(item[1]))
+                    continue
+                minion, data = item[1:]
+                # Munge retcode into return data
+                if 'retcode' in data and isinstance(data['ret'], dict) and 'retcode' not in data['ret']:
+                    data['ret']['retcode'] = data['retcode']
+
+                if self.opts.get('raw'):
+                    yield data
+                else:
+                    yield {minion: data['ret']}
+                if not self.quiet:
+                    data[minion] = data.pop('ret')
+                    if 'out' in data:
+                        out = data.pop('out')
+                    else:
+                        out = None
+                    salt.output.display_output(
+                            data,
+                            out,
+                            self.opts)
+            # Raise the errors of the run
+            self.io_loop.run_sync(lambda: future)
+            self.minions = batch.minions
+            self.down_minions = batch.down_minions
+
+
+class LegacyBatch(object):
+    '''
+    Manage the execution of batch runs, pinging the minions first and
+    polling the sub-batches in turn
+
+    This is the implementation Batch used before it ran on an IO loop.
     '''
     def __init__(self, opts, eauth=None, quiet=False, parser=None):
         self.opts = opts
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+'''
+Execute batch runs on an IO loop
+
+The job is run on a window of minions at a time. The window is refilled as
+soon as a minion returns, and the minions join the run as they answer the
+ping, so that no process blocks on a sub-batch. The runs can be driven on the
+IO loop of a netapi or be waited on from a runner, see
+:py:class:`salt.cli.batch.Batch` for the synchronous interface.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import collections
+import logging
+import math
+import time
+from datetime import timedelta
+
+# Import salt libs
+import salt.client
+import salt.utils.event
+import salt.utils.jid
+from salt.exceptions import SaltClientError, SaltInvocationError
+
+# Import 3rd-party libs
+import tornado.gen
+import tornado.ioloop
+import tornado.locks
+import tornado.queues
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+
+def batch_size(batch, count):
+    '''
+    Return the number of minions of a batch value, like ``10`` or ``10%`` of
+    count minions. Raise ValueError if the value is invalid.
+    '''
+    batch = six.text_type(batch)
+    if '%' in batch:
+        res = float(batch.strip('%')) / 100.0 * count
+        if res < 1:
+            return int(math.ceil(res))
+        return int(res)
+    return int(batch)
+
+
+def parse_batch(batch):
+    '''
+    Return the smallest and the largest window of a batch value, which is
+    either a fixed window like ``10`` or ``10%``, or an adaptive window like
+    ``5:20`` or ``10%:50%``. Raise ValueError if the value is invalid.
+    '''
+    low, _, high = six.text_type(batch).partition(':')
+    high = high or low
+    for value in (low, high):
+        batch_size(value, 100)
+    return low, high
+
+
+class BatchAsync(object):
+    '''
+    Run a job on the targeted minions, a window of minions at a time
+
+    The minions answering the ping are added to the run at once, and the
+    window is refilled as each minion returns, or after batch_wait seconds.
+    An adaptive window grows by one minion for each success and halves on
+    each failure. The minions which do not return in time and which do not
+    send job heartbeats are asked whether they still run the job.
+
+    run() returns the results of the minions. With stream set, they are also
+    put on the ``results`` queue as they come, as ``('ret', minion, data)``,
+    along with the minions which did not answer the ping as ``('down',
+    minion)`` and the jobs published as ``('run', jid, minions)``, followed
+    by None once the run is over. The start and the end of the run are fired
+    on the event bus as ``salt/batch/<batch jid>/start`` and
+    ``salt/batch/<batch jid>/done``.
+
+    .. code-block:: python
+
+        batch = salt.cli.batch_async.BatchAsync(opts, io_loop=io_loop)
+        batch_jid = batch.start()
+    '''
+    def __init__(self, opts, io_loop=None, eauth=None, stream=False):
+        '''
+        :param dict opts: The master options, with the tgt, tgt_type, fun,
+                          arg and batch of the run, and optionally its
+                          batch_wait, failhard, raw and return
+        :param IOLoop io_loop: The IO loop to run on
+        :param dict eauth: The external authentication of the publications
+        :param bool stream: Whether to put the results on the results queue
+        '''
+        self.opts = opts
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.eauth = eauth if eauth else {}
+        try:
+            self.batch = parse_batch(opts['batch'])
+        except ValueError:
+            raise SaltInvocationError(
+                'Invalid batch data sent: {0}\nData must be in the form of '
+                '%10, 10% or 3, or of 3:10 for an adaptive window'.format(
+                    opts['batch']))
+        self.batch_jid = salt.utils.jid.gen_jid(opts)
+        self.local = salt.client.get_local_client(
+            opts['conf_file'], io_loop=self.io_loop)
+        self.results = tornado.queues.Queue() if stream else None
+        self.returns = {}
+        # jid -> (kind of job, jid of the job it is about)
+        self.jobs = {}
+        self.expected = set()
+        self.minions = []
+        self.down_minions = set()
+        self.failed = set()
+        self.to_run = collections.deque()
+        # minion -> jid of its job, time it is due and whether it sends
+        # heartbeats or is asked whether it runs the job
+        self.active = {}
+        # the times the slots held for batch_wait are released
+        self.waiting = []
+        self.size = None
+        self.ping_done = False
+        self.ping_timeout_at = None
+        self.stopped = False
+        self._last_jid = None
+        self._wake = tornado.locks.Condition()
+        self._reader = None
+
+    def _gen_jid(self):
+        jid = salt.utils.jid.gen_jid(self.opts)
+        while jid == self._last_jid:
+            jid = salt.utils.jid.gen_jid(self.opts)
+        self._last_jid = jid
+        return jid
+
+    def _window(self):
+        '''
+        Return the number of minions to keep running the job
+        '''
+        count = max(len(self.expected), len(self.minions))
+        low = batch_size(self.batch[0], count)
+        high = batch_size(self.batch[1], count)
+        if self.size is None:
+            self.size = low
+        self.size = min(max(self.size, low), high)
+        return max(self.size, 1)
+
+    def _adapt(self, success):
+        '''
+        Grow the window after a success, shrink it after a failure
+        '''
+        if self.batch[0] == self.batch[1] or self.size is None:
+            return
+        if success:
+            self.size += 1
+        else:
+            self.size //= 2
+
+    def _put(self, item):
+        if self.results is not None:
+            self.results.put_nowait(item)
+
+    def _fire(self, data, tag):
+        try:
+            self.local.event.fire_event(
+                data, salt.utils.event.tagify([self.batch_jid, tag], 'batch'))
+        except Exception as exc:
+            log.debug('Unable to fire the batch event: %s', exc)
+
+    def start(self):
+        '''
+        Start the run on the IO loop and return the batch jid
+        '''
+        self.io_loop.spawn_callback(self.run)
+        return self.batch_jid
+
+    @tornado.gen.coroutine
+    def run(self):
+        '''
+        Run the job on all the minions answering the ping, and return the
+        results of the minions
+        '''
+        self._reader = self.local.event.set_event_handler(self._handle_event)
+        try:
+            ping_jid = self._gen_jid()
+            self.jobs[ping_jid] = ('ping', None)
+            pub_data = yield self._publish(
+                self.opts['tgt'],
+                'test.ping',
+                [],
+                self.opts.get('selected_target_option') or self.opts.get('tgt_type', 'glob'),
+                ping_jid)
+            if pub_data:
+                self.expected.update(pub_data['minions'])
+                self.ping_timeout_at = time.time() + self.opts['timeout']
+                self._fire({'tgt': self.opts['tgt'],
+                            'fun': self.opts['fun'],
+                            'batch': self.opts['batch'],
+                            'minions': sorted(self.expected)}, 'start')
+                while not self._check():
+                    yield self._wake.wait(timeout=timedelta(seconds=self._next_check()))
+                self._fire({'minions': self.minions,
+                            'down_minions': sorted(self.down_minions),
+                            'failed': sorted(self.failed),
+                            'stopped': self.stopped}, 'done')
+        finally:
+            self._put(None)
+            # Stop listening, the pending events are still sent
+            self.local.event.close_pub()
+        raise tornado.gen.Return(self.returns)
+
+    @tornado.gen.coroutine
+    def _publish(self, tgt, fun, arg, tgt_type, jid):
+        kwargs = dict(self.eauth)
+        if fun == self.opts['fun']:
+            kwargs['ret'] = self.opts.get('return', '')
+        pub_data = yield self.local.run_job_async(
+            tgt,
+            fun,
+            arg,
+            tgt_type,
+            timeout=self.opts['timeout'],
+            jid=jid,
+            listen=False,
+            io_loop=self.io_loop,
+            **kwargs)
+        raise tornado.gen.Return(pub_data)
+
+    def _handle_event(self, raw):
+        '''
+        Track the returns and heartbeats of the jobs of the run
+        '''
+        mtag, data = salt.utils.event.SaltEvent.unpack(raw)
+        parts = mtag.split('/', 4)
+        if len(parts) < 5 or parts[:2] != ['salt', 'job'] or \
+                parts[2] not in self.jobs:
+            return
+        jid, kind, minion = parts[2], parts[3], parts[4]
+        job, about = self.jobs[jid]
+        if job == 'ping' and kind == 'ret':
+            self._found(minion)
+        elif job == 'run' and minion in self.active and \
+                self.active[minion]['jid'] == jid:
+            if kind == 'ret':
+                self._returned(minion, mtag, data)
+            elif kind == 'ack':
+                job_timeout = self.opts['gather_job_timeout']
+                if data.get('state') != 'finished':
+                    job_timeout = 2 * data.get('interval', job_timeout)
+                self.active[minion].update(
+                    {'timeout_at': time.time() + job_timeout, 'acked': True})
+        elif job == 'find_job' and kind == 'ret' and \
+                minion in self.active and self.active[minion]['jid'] == about:
+            if data.get('return'):
+                # still running the job
+                self.active[minion].update(
+                    {'timeout_at': time.time() + self.opts['timeout'],
+                     'checked': False})
+        else:
+            return
+        self._wake.notify_all()
+
+    def _found(self, minion):
+        if minion in self.minions or self.stopped:
+            return
+        self.minions.append(minion)
+        self.to_run.append(minion)
+
+    def _returned(self, minion, mtag, data):
+        if self.opts.get('raw', False):
+            result = {'data': data, 'tag': mtag}
+        else:
+            result = {'ret': data.get('return', {})}
+            for key in ('out', 'retcode', 'jid'):
+                if key in data:
+                    result[key] = data[key]
+        retcode = data.get('retcode', 0)
+        success = data.get('success', True) is not False and \
+            not (isinstance(retcode, int) and retcode > 0)
+        self._release(minion, success)
+        self.returns[minion] = result
+        self._put(('ret', minion, result))
+        if self.opts.get('failhard') and isinstance(retcode, int) and retcode > 0:
+            log.error(
+                'Minion %s returned with non-zero exit code. '
+                'Batch run stopped due to failhard', minion
+            )
+            self.stopped = True
+
+    def _timed_out(self, minion):
+        jid = self.active[minion]['jid']
+        self.failed.add(minion)
+        self._release(minion, False)
+        if self.opts.get('raw', False):
+            result = {'data': {'id': minion, 'jid': jid, 'return': {}, 'failed': True},
+                      'tag': salt.utils.event.tagify([jid, 'ret', minion], 'job')}
+        else:
+            result = {'ret': {}}
+        self.returns[minion] = result
+        self._put(('ret', minion, result))
+
+    def _release(self, minion, success):
+        del self.active[minion]
+        self._adapt(success)
+        if self.opts.get('batch_wait'):
+            self.waiting.append(time.time() + float(self.opts['batch_wait']))
+
+    def _next_check(self):
+        '''
+        Return the number of seconds until something is due
+        '''
+        now = time.time()
+        due = [now + 1]
+        if not self.ping_done:
+            due.append(self.ping_timeout_at)
+        due.extend(self.waiting)
+        due.extend(state['timeout_at'] for state in six.itervalues(self.active))
+        return max(min(due) - now, 0.01)
+
+    def _check(self):
+        '''
+        Handle what is due, fill the window and return whether the run is over
+        '''
+        now = time.time()
+        if not self.ping_done and (now > self.ping_timeout_at or
+                                   (self.expected and self.expected.issubset(self.minions))):
+            self.ping_done = True
+            for minion in sorted(self.expected.difference(self.minions)):
+                self.down_minions.add(minion)
+                self._put(('down', minion))
+        self.waiting = [release for release in self.waiting if release > now]
+        self._check_active(now)
+        if self.stopped:
+            return True
+        self._fill()
+        return self.ping_done and not self.to_run and not self.active
+
+    def _check_active(self, now):
+        '''
+        Give up on the minions which are overdue, or ask them whether they
+        still run the job
+        '''
+        find_jobs = {}
+        require_job_heartbeat = self.opts.get('require_job_heartbeat', False)
+        for minion, state in list(self.active.items()):
+            if state['timeout_at'] > now:
+                continue
+            if state['checked'] or state['acked'] or require_job_heartbeat:
+                self._timed_out(minion)
+                continue
+            state.update({'timeout_at': now + self.opts['gather_job_timeout'],
+                          'checked': True})
+            find_jobs.setdefault(state['jid'], []).append(minion)
+        for jid, minions in six.iteritems(find_jobs):
+            self.io_loop.spawn_callback(self._find_job, jid, minions)
+
+    def _fill(self):
+        '''
+        Publish the job to the next minions, up to the window
+        '''
+        free = self._window() - len(self.active) - len(self.waiting)
+        next_ = []
+        while self.to_run and len(next_) < free:
+            next_.append(self.to_run.popleft())
+        if not next_:
+            return
+        jid = self._gen_jid()
+        self.jobs[jid] = ('run', None)
+        timeout_at = time.time() + self.opts['timeout']
+        for minion in next_:
+            self.active[minion] = {'jid': jid,
+                                   'timeout_at': timeout_at,
+                                   'checked': False,
+                                   'acked': False}
+        self._put(('run', jid, next_))
+        self.io_loop.spawn_callback(self._run_on, jid, next_)
+
+    @tornado.gen.coroutine
+    def _run_on(self, jid, minions):
+        try:
+            pub_data = yield self._publish(
+                minions, self.opts['fun'], self.opts['arg'], 'list', jid)
+        except SaltClientError as exc:
+            log.error('Unable to publish the batch job: %s', exc)
+            pub_data = {}
+        if not pub_data:
+            for minion in minions:
+                if minion in self.active:
+                    self._timed_out(minion)
+            self._wake.notify_all()
+
+    @tornado.gen.coroutine
+    def _find_job(self, jid, minions):
+        find_jid = self._gen_jid()
+        self.jobs[find_jid] = ('find_job', jid)
+        try:
+            yield self._publish(minions, 'saltutil.find_job', [jid], 'list', find_jid)
+        except SaltClientError as exc:
+            log.error('Unable to check on the batch job: %s', exc)
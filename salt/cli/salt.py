@@ -267,8 +267,11 @@ class SaltCMD(salt.utils.parsers.SaltCMDOptionParser):
 
             ret = {}
 
-            for res in batch.run():
-                ret.update(res)
+            try:
+                for res in batch.run():
+                    ret.update(res)
+            except SaltClientError:
+                sys.exit(2)
 
             self._output_ret(ret, '')
 
@@ -281,12 +284,16 @@ class SaltCMD(salt.utils.parsers.SaltCMDOptionParser):
                 sys.exit(1)
             # Printing the output is already taken care of in run() itself
             retcode = 0
-            for res in batch.run():
-                for ret in six.itervalues(res):
-                    job_retcode = salt.utils.job.get_retcode(ret)
-                    if job_retcode > retcode:
-                        # Exit with the highest retcode we find
-                        retcode = job_retcode
+            try:
+                for res in batch.run():
+                    for ret in six.itervalues(res):
+                        job_retcode = salt.utils.job.get_retcode(ret)
+                        if job_retcode > retcode:
+                            # Exit with the highest retcode we find
+                            retcode = job_retcode
+            except SaltClientError as exc:
+                salt.utils.stringutils.print_cli(exc)
+                sys.exit(1)
             sys.exit(retcode)
 
     def _print_errors_summary(self, errors):
@@ -170,6 +170,11 @@ class LocalClient(object):
                 listen=False,
                 io_loop=io_loop,
                 keep_loop=keep_loop)
+        if io_loop is None:
+            # Only get the job events from the publisher. Their tags are not
+            # known before the jobs are published, hence the whole prefixes.
+            self.event.filter_events(tags=[['startswith', 'salt/job/'],
+                                           ['startswith', 'syndic/']])
         self.utils = salt.loader.utils(self.opts)
         self.functions = salt.loader.minion_mods(self.opts, utils=self.utils)
         self.returners = salt.loader.returners(self.opts, self.functions)
@@ -1053,10 +1058,15 @@ class LocalClient(object):
         if timeout is None:
             timeout = self.opts['timeout']
         gather_job_timeout = int(kwargs.get('gather_job_timeout', self.opts['gather_job_timeout']))
+        require_job_heartbeat = kwargs.get('require_job_heartbeat', self.opts.get('require_job_heartbeat', False))
         start = int(time.time())
 
         # timeouts per minion, id_ -> timeout time
         minion_timeouts = {}
+        # minions which acknowledged the job, id_ -> time their next
+        # heartbeat is due
+        job_acks = {}
+        ack_tag = 'salt/job/{0}/ack/'.format(jid)
 
         found = set()
         missing = set()
@@ -1101,6 +1111,19 @@ class LocalClient(object):
                     if 'missing' in raw.get('data', {}):
                         missing.update(raw['data']['missing'])
                     continue
+                if raw.get('tag', '').startswith(ack_tag):
+                    # the minion runs the job, or has just finished it and
+                    # its return is on the way
+                    id_ = raw['data'].get('id')
+                    if id_ and id_ not in found:
+                        minions.add(id_)
+                        if raw['data'].get('state') == 'finished':
+                            job_acks[id_] = time.time() + gather_job_timeout
+                        else:
+                            job_acks[id_] = time.time() + 2 * raw['data'].get(
+                                'interval', gather_job_timeout)
+                        minion_timeouts[id_] = job_acks[id_]
+                    continue
                 if 'return' not in raw['data']:
                     continue
                 if kwargs.get('raw', False):
@@ -1146,19 +1169,27 @@ class LocalClient(object):
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
+                # the minions sending heartbeats for the job are known to run
+                # it until their next heartbeat is due, only ask the others
+                unacked = minions - found - set(job_acks)
                 # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(jid, list(minions - found), 'list', **kwargs)
                 minions_running = False
-                # if we weren't assigned any jid that means the master thinks
-                # we have nothing to send
-                if 'jid' not in jinfo:
+                if not unacked or require_job_heartbeat:
+                    # nothing to ask, the minions which did not acknowledge
+                    # the job have timed out
                     jinfo_iter = []
                 else:
-                    jinfo_iter = self.get_returns_no_block('salt/job/{0}'.format(jinfo['jid']))
-                timeout_at = time.time() + gather_job_timeout
-                # if you are a syndic, wait a little longer
-                if self.opts['order_masters']:
-                    timeout_at += self.opts.get('syndic_wait', 1)
+                    jinfo = self.gather_job_info(jid, list(unacked), 'list', **kwargs)
+                    # if we weren't assigned any jid that means the master thinks
+                    # we have nothing to send
+                    if 'jid' not in jinfo:
+                        jinfo_iter = []
+                    else:
+                        jinfo_iter = self.get_returns_no_block('salt/job/{0}'.format(jinfo['jid']))
+                    timeout_at = time.time() + gather_job_timeout
+                    # if you are a syndic, wait a little longer
+                    if self.opts['order_masters']:
+                        timeout_at += self.opts.get('syndic_wait', 1)
 
             # check for minions that are running the job still
             for raw in jinfo_iter:
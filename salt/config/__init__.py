@@ -361,6 +361,13 @@ VALID_OPTS = {
     # Maximum number of concurrently active processes at any given point in time
     'process_count_max': int,
 
+    # The number of pre-forked processes to run the jobs of the minion in, instead of forking a
+    # process per job. 0 disables the pool.
+    'job_worker_pool': int,
+
+    # The number of jobs a pre-forked job worker runs before it is replaced. 0 disables the limit.
+    'job_worker_max_jobs': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -379,6 +386,14 @@ VALID_OPTS = {
     # The chunk size to use when streaming files with the file server
     'file_buffer_size': int,
 
+    # The number of chunk requests a minion keeps in flight when fetching a file
+    # from the master
+    'file_transfer_window': int,
+
+    # Store the files cached from the master once per content, keyed by their
+    # hash, and hardlink them into the file cache
+    'file_cache_store': bool,
+
     # The TCP port on which minion events should be published if ipc_mode is TCP
     'tcp_pub_port': int,
 
@@ -437,6 +452,10 @@ VALID_OPTS = {
     # If an event is above this size, it will be trimmed before putting it on the event bus
     'max_event_size': int,
 
+    # The number of master event publisher processes the events are spread
+    # over, by tag or by jid for job events
+    'event_publisher_shards': int,
+
     # Enable old style events to be sent on minion_startup. Change default to False in Neon release
     'enable_legacy_startup_events': bool,
 
@@ -476,6 +495,20 @@ VALID_OPTS = {
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # The number of worker processes running the state chunks whose
+    # requisites are met, 0 runs them one at a time
+    'state_workers': int,
+
+    # The state modules of which the state workers run one chunk at a time
+    'state_workers_serial': list,
+
+    # Reuse the compiled SLS files when the files, grains and pillar did not
+    # change
+    'state_render_cache': bool,
+
+    # The execution functions SLS files may call and still be cached
+    'state_render_cache_functions': list,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -719,6 +752,17 @@ VALID_OPTS = {
     # Specify a list of external pillar systems to use
     'ext_pillar': list,
 
+    # The number of external pillars evaluated at the same time, 0 evaluates
+    # them one after another
+    'ext_pillar_concurrency': int,
+
+    # The external pillars evaluated alone, after the ones before them merged
+    'ext_pillar_serial': list,
+
+    # The seconds after which a concurrent external pillar is given up on, or a
+    # dict of them by external pillar
+    'ext_pillar_timeout': (int, float, dict),
+
     # Reserved for future use to version the pillar structure
     'pillar_version': int,
 
@@ -734,6 +778,10 @@ VALID_OPTS = {
     # Pillar cache backend. Defaults to `disk` which stores caches in the master cache
     'pillar_cache_backend': six.string_types,
 
+    # Interval, in seconds, between two checks of the revisions of the pillar_roots
+    # and of the external pillars by the pillar cache
+    'pillar_cache_revision_interval': int,
+
     'pillar_safe_render_error': bool,
 
     # When creating a pillar, there are several strategies to choose from when
@@ -841,6 +889,14 @@ VALID_OPTS = {
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Keep an in-memory index of the grains and pillar in the minion data cache
+    # to resolve grain and pillar targets without reading the data of every minion
+    'minion_data_cache_index': bool,
+
+    # The number of seconds between checks of the update times of the minions
+    # in the minion data index
+    'minion_data_cache_index_interval': int,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -950,12 +1006,19 @@ VALID_OPTS = {
     # The size of key that should be generated when creating new keys
     'keysize': int,
 
+    # The cipher used for the master's session (AES) keys, aes-cbc-hmac or aes-gcm
+    'session_cipher': six.string_types,
+
     # The transport system for this daemon. (i.e. zeromq, raet, etc)
     'transport': six.string_types,
 
     # The number of seconds to wait when the client is requesting information about running jobs
     'gather_job_timeout': int,
 
+    # Instructs the client to only rely on the job heartbeats of the minions to know whether
+    # they still run a job, rather than asking the minions without heartbeats
+    'require_job_heartbeat': bool,
+
     # The number of seconds to wait before timing out an authentication request
     'auth_timeout': int,
 
@@ -1031,6 +1094,10 @@ VALID_OPTS = {
     # primarily as a mitigation technique against minion disconnects.
     'ping_interval': int,
 
+    # Instructs the minion to acknowledge the jobs it gets from its master(s), then to tell it
+    # every n number of seconds that they are still running, or that they finished
+    'job_heartbeat_interval': int,
+
     # Instructs the salt CLI to print a summary of a minion responses before returning
     'cli_summary': bool,
 
@@ -1110,10 +1177,14 @@ VALID_OPTS = {
     'memcache_expire_seconds': int,
     # Set a memcache limit in items (bank + key) per cache storage (driver + driver_opts).
     'memcache_max_items': int,
+    # Set a memcache limit in bytes of serialized data per cache storage, 0 disables it.
+    'memcache_max_bytes': int,
     # Each time a cache storage got full cleanup all the expired items not just the oldest one.
     'memcache_full_cleanup': bool,
     # Enable collecting the memcache stats and log it on `debug` log level.
     'memcache_debug': bool,
+    # Drop the memcache items stored or flushed by the other master processes.
+    'memcache_invalidate_events': bool,
 
     # Thin and minimal Salt extra modules
     'thin_extra_mods': six.string_types,
@@ -1264,6 +1335,7 @@ DEFAULT_MINION_OPTS = {
     'pillar_cache': False,
     'pillar_cache_ttl': 3600,
     'pillar_cache_backend': 'disk',
+    'pillar_cache_revision_interval': 5,
     'extension_modules': os.path.join(salt.syspaths.CACHE_DIR, 'minion', 'extmods'),
     'state_top': 'top.sls',
     'state_top_saltenv': None,
@@ -1369,6 +1441,8 @@ DEFAULT_MINION_OPTS = {
     'autosign_timeout': 120,
     'multiprocessing': True,
     'process_count_max': -1,
+    'job_worker_pool': 0,
+    'job_worker_max_jobs': 100,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
@@ -1376,6 +1450,8 @@ DEFAULT_MINION_OPTS = {
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': False,
     'file_buffer_size': 262144,
+    'file_transfer_window': 1,
+    'file_cache_store': False,
     'tcp_pub_port': 4510,
     'tcp_pull_port': 4511,
     'tcp_authentication_retries': 5,
@@ -1402,6 +1478,13 @@ DEFAULT_MINION_OPTS = {
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_workers': 0,
+    'state_workers_serial': ['pkg', 'pkgrepo', 'ports'],
+    'state_render_cache': False,
+    'state_render_cache_functions': ['grains.filter_by',
+                                     'grains.get', 'grains.item',
+                                     'grains.items', 'pillar.get',
+                                     'pillar.item', 'pillar.items'],
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1479,6 +1562,7 @@ DEFAULT_MINION_OPTS = {
     'cluster_masters': [],
     'restart_on_error': False,
     'ping_interval': 0,
+    'job_heartbeat_interval': 0,
     'username': None,
     'password': None,
     'zmq_filtering': False,
@@ -1639,6 +1723,9 @@ DEFAULT_MASTER_OPTS = {
     'minionfs_whitelist': [],
     'minionfs_blacklist': [],
     'ext_pillar': [],
+    'ext_pillar_concurrency': 0,
+    'ext_pillar_serial': [],
+    'ext_pillar_timeout': 0,
     'pillar_version': 2,
     'pillar_opts': False,
     'pillar_safe_render_error': True,
@@ -1648,6 +1735,7 @@ DEFAULT_MASTER_OPTS = {
     'pillar_cache': False,
     'pillar_cache_ttl': 3600,
     'pillar_cache_backend': 'disk',
+    'pillar_cache_revision_interval': 5,
     'ping_on_rotate': False,
     'peer': {},
     'preserve_minion_cache': False,
@@ -1702,6 +1790,8 @@ DEFAULT_MASTER_OPTS = {
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
     'minion_data_cache': True,
+    'minion_data_cache_index': False,
+    'minion_data_cache_index_interval': 5,
     'enforce_mine_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
@@ -1734,6 +1824,7 @@ DEFAULT_MASTER_OPTS = {
     'event_return_whitelist': [],
     'event_return_blacklist': [],
     'event_match_type': 'startswith',
+    'event_publisher_shards': 1,
     'runner_returns': True,
     'serial': 'msgpack',
     'test': False,
@@ -1743,6 +1834,13 @@ DEFAULT_MASTER_OPTS = {
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_workers': 0,
+    'state_workers_serial': ['pkg', 'pkgrepo', 'ports'],
+    'state_render_cache': False,
+    'state_render_cache_functions': ['grains.filter_by',
+                                     'grains.get', 'grains.item',
+                                     'grains.items', 'pillar.get',
+                                     'pillar.item', 'pillar.items'],
     'search': '',
     'loop_interval': 60,
     'nodegroups': {},
@@ -1782,8 +1880,10 @@ DEFAULT_MASTER_OPTS = {
     'tcp_keepalive_intvl': -1,
     'sign_pub_messages': True,
     'keysize': 2048,
+    'session_cipher': 'aes-cbc-hmac',
     'transport': 'zeromq',
     'gather_job_timeout': 10,
+    'require_job_heartbeat': False,
     'syndic_event_forward_timeout': 0.5,
     'syndic_jid_forward_cache_hwm': 100,
     'regen_thin': False,
@@ -1838,8 +1938,10 @@ DEFAULT_MASTER_OPTS = {
     'cache': 'localfs',
     'memcache_expire_seconds': 0,
     'memcache_max_items': 1024,
+    'memcache_max_bytes': 0,
     'memcache_full_cleanup': False,
     'memcache_debug': False,
+    'memcache_invalidate_events': False,
     'thin_extra_mods': '',
     'min_extra_mods': '',
     'ssl': None,
@@ -24,7 +24,6 @@ import getpass
 import tornado.gen
 
 # Import third party libs
-from salt.ext.six.moves import zip  # pylint: disable=import-error,redefined-builtin
 from salt.ext import six
 
 try:
@@ -56,6 +55,17 @@ if not HAS_M2 and not HAS_CDOME:
         # No need for crypt in local mode
         pass
 
+# AES-GCM is only provided by pycryptodome(x), which may be installed next to
+# M2Crypto or not at all when the old PyCrypto is used
+try:
+    from Cryptodome.Cipher import AES as GCM_AES
+except ImportError:
+    try:
+        from Crypto.Cipher import AES as GCM_AES
+    except ImportError:
+        GCM_AES = None
+HAS_GCM = hasattr(GCM_AES, 'MODE_GCM')
+
 # Import salt libs
 import salt.defaults.exitcodes
 import salt.payload
@@ -200,11 +210,25 @@ def get_rsa_key(path, passphrase):
     return _get_key_with_evict(path, six.text_type(os.path.getmtime(path)), passphrase)
 
 
+# Public keys loaded by get_rsa_pub_key, keyed by path, with the modification
+# time and size of the file they were read from
+_RSA_PUB_KEYS = {}
+
+
 def get_rsa_pub_key(path):
     '''
-    Read a public key off the disk.
+    Read a public key off the disk. The parsed key is kept in memory and
+    returned again until the file changes.
     '''
     log.debug('salt.crypt.get_rsa_pub_key: Loading public key')
+    try:
+        st = os.stat(path)
+        fingerprint = (st.st_mtime, st.st_size)
+    except OSError:
+        fingerprint = None
+    cached = _RSA_PUB_KEYS.get(path)
+    if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+        return cached[1]
     if HAS_M2:
         with salt.utils.files.fopen(path, 'rb') as f:
             data = f.read().replace(b'RSA ', b'')
@@ -213,6 +237,8 @@ def get_rsa_pub_key(path):
     else:
         with salt.utils.files.fopen(path) as f:
             key = RSA.importKey(f.read())
+    if fingerprint is not None:
+        _RSA_PUB_KEYS[path] = (fingerprint, key)
     return key
 
 
@@ -232,6 +258,38 @@ def sign_message(privkey_path, message, passphrase=None):
         return signer.sign(SHA.new(salt.utils.stringutils.to_bytes(message)))
 
 
+class MessageSigner(object):
+    '''
+    Sign messages with a private key which is loaded once and kept for the
+    life of the signer, so that processes which sign many messages, like the
+    MWorkers with sign_pub_messages, only pay for the RSA operation itself.
+    The key is reloaded when the key file changes.
+    '''
+    def __init__(self, privkey_path, passphrase=None):
+        self.privkey_path = privkey_path
+        self.passphrase = passphrase
+        self._mtime = None
+        self._signer = None
+
+    def _get_signer(self):
+        mtime = os.path.getmtime(self.privkey_path)
+        if mtime != self._mtime:
+            key = get_rsa_key(self.privkey_path, self.passphrase)
+            self._signer = key if HAS_M2 else PKCS1_v1_5.new(key)
+            self._mtime = mtime
+        return self._signer
+
+    def sign(self, message):
+        '''
+        Return the same signature sign_message would for this key
+        '''
+        signer = self._get_signer()
+        message = salt.utils.stringutils.to_bytes(message)
+        if HAS_M2:
+            return signer.sign(hashlib.sha1(message).digest())
+        return signer.sign(SHA.new(message))
+
+
 def verify_signature(pubkey_path, message, signature):
     '''
     Use Crypto.Signature.PKCS1_v1_5 to verify the signature on a message.
@@ -444,6 +502,10 @@ class AsyncAuth(object):
     # mapping of io_loop -> {key -> auth}
     instance_map = weakref.WeakKeyDictionary()
 
+    # The master public keys and signatures verify_pubkey_sig has already
+    # verified, the master sends the same ones on every re-authentication.
+    verified_sigs = {}
+
     # mapping of key -> creds
     creds_map = {}
 
@@ -824,6 +886,7 @@ class AsyncAuth(object):
             pass
         with salt.utils.files.fopen(self.pub_path) as f:
             payload['pub'] = f.read()
+        payload['session_ciphers'] = Crypticle.supported_ciphers()
         return payload
 
     def decrypt_aes(self, payload, master_pub=True):
@@ -909,9 +972,19 @@ class AsyncAuth(object):
                                 self.opts['master_sign_key_name'] + '.pub')
 
             if os.path.isfile(path):
-                res = verify_signature(path,
-                                       message,
-                                       binascii.a2b_base64(sig))
+                sig_key = (path,
+                           os.path.getmtime(path),
+                           hashlib.sha256(salt.utils.stringutils.to_bytes(message)).digest(),
+                           salt.utils.stringutils.to_bytes(sig))
+                res = sig_key in AsyncAuth.verified_sigs
+                if not res:
+                    res = verify_signature(path,
+                                           message,
+                                           binascii.a2b_base64(sig))
+                    if res:
+                        if len(AsyncAuth.verified_sigs) >= 32:
+                            AsyncAuth.verified_sigs.clear()
+                        AsyncAuth.verified_sigs[sig_key] = True
             else:
                 log.error(
                     'Verification public key %s does not exist. You need to '
@@ -1339,29 +1412,75 @@ class Crypticle(object):
 
     Encryption algorithm: AES-CBC
     Signing algorithm: HMAC-SHA256
+
+    Keys generated for the ``aes-gcm`` session cipher are prefixed with the
+    name of the cipher, such keys use single pass AES-256-GCM authenticated
+    encryption instead.
     '''
 
     PICKLE_PAD = b'pickle::'
     AES_BLOCK_SIZE = 16
     SIG_SIZE = hashlib.sha256().digest_size
+    DEFAULT_CIPHER = 'aes-cbc-hmac'
+    GCM_CIPHER = 'aes-gcm'
+    GCM_KEY_SIZE = 256
+    GCM_NONCE_SIZE = 12
+    GCM_TAG_SIZE = 16
 
     def __init__(self, opts, key_string, key_size=192):
         self.key_string = key_string
+        self.cipher = self.key_cipher(key_string)
+        if self.cipher == self.GCM_CIPHER:
+            if not HAS_GCM:
+                raise AuthenticationError(
+                    'The {0} session cipher requires pycryptodome'.format(self.GCM_CIPHER)
+                )
+            key_size = self.GCM_KEY_SIZE
         self.keys = self.extract_keys(self.key_string, key_size)
         self.key_size = key_size
         self.serial = salt.payload.Serial(opts)
 
     @classmethod
-    def generate_key_string(cls, key_size=192):
-        key = os.urandom(key_size // 8 + cls.SIG_SIZE)
+    def supported_ciphers(cls):
+        '''
+        Return the session ciphers which can be used with the installed crypto
+        libraries
+        '''
+        ciphers = [cls.DEFAULT_CIPHER]
+        if HAS_GCM:
+            ciphers.append(cls.GCM_CIPHER)
+        return ciphers
+
+    @classmethod
+    def key_cipher(cls, key_string):
+        '''
+        Return the session cipher a key string was generated for
+        '''
+        cipher, sep, _ = salt.utils.stringutils.to_unicode(key_string).rpartition(':')
+        return cipher if sep else cls.DEFAULT_CIPHER
+
+    @classmethod
+    def generate_key_string(cls, key_size=192, cipher=None):
+        if cipher == cls.GCM_CIPHER:
+            key = os.urandom(cls.GCM_KEY_SIZE // 8)
+        elif cipher in (None, cls.DEFAULT_CIPHER):
+            key = os.urandom(key_size // 8 + cls.SIG_SIZE)
+        else:
+            raise ValueError('Unknown session cipher: {0}'.format(cipher))
         b64key = base64.b64encode(key)
         if six.PY3:
             b64key = b64key.decode('utf-8')
+        if cipher == cls.GCM_CIPHER:
+            b64key = '{0}:{1}'.format(cls.GCM_CIPHER, b64key)
         # Return data must be a base64-encoded string, not a unicode type
         return b64key.replace('\n', '')
 
     @classmethod
     def extract_keys(cls, key_string, key_size):
+        if cls.key_cipher(key_string) == cls.GCM_CIPHER:
+            key = base64.b64decode(salt.utils.stringutils.to_bytes(key_string).rpartition(b':')[2])
+            assert len(key) == key_size / 8, 'invalid key'
+            return key, None
         if six.PY2:
             key = key_string.decode('base64')
         else:
@@ -1371,8 +1490,11 @@ class Crypticle(object):
 
     def encrypt(self, data):
         '''
-        encrypt data with AES-CBC and sign it with HMAC-SHA256
+        encrypt data with AES-CBC and sign it with HMAC-SHA256, or with
+        AES-GCM for aes-gcm keys
         '''
+        if self.cipher == self.GCM_CIPHER:
+            return self._encrypt_gcm(data)
         aes_key, hmac_key = self.keys
         pad = self.AES_BLOCK_SIZE - len(data) % self.AES_BLOCK_SIZE
         if six.PY2:
@@ -1393,26 +1515,18 @@ class Crypticle(object):
 
     def decrypt(self, data):
         '''
-        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        verify HMAC-SHA256 signature and decrypt data with AES-CBC, or with
+        AES-GCM for aes-gcm keys
         '''
+        if self.cipher == self.GCM_CIPHER:
+            return b''.join(self._decrypt_gcm(data))
         aes_key, hmac_key = self.keys
-        sig = data[-self.SIG_SIZE:]
-        data = data[:-self.SIG_SIZE]
         if six.PY3 and not isinstance(data, bytes):
             data = salt.utils.stringutils.to_bytes(data)
+        sig = data[-self.SIG_SIZE:]
+        data = data[:-self.SIG_SIZE]
         mac_bytes = hmac.new(hmac_key, data, hashlib.sha256).digest()
-        if len(mac_bytes) != len(sig):
-            log.debug('Failed to authenticate message')
-            raise AuthenticationError('message authentication failed')
-        result = 0
-
-        if six.PY2:
-            for zipped_x, zipped_y in zip(mac_bytes, sig):
-                result |= ord(zipped_x) ^ ord(zipped_y)
-        else:
-            for zipped_x, zipped_y in zip(mac_bytes, sig):
-                result |= zipped_x ^ zipped_y
-        if result != 0:
+        if not hmac.compare_digest(mac_bytes, sig):
             log.debug('Failed to authenticate message')
             raise AuthenticationError('message authentication failed')
         iv_bytes = data[:self.AES_BLOCK_SIZE]
@@ -1429,19 +1543,64 @@ class Crypticle(object):
         else:
             return data[:-data[-1]]
 
+    def _encrypt_gcm(self, *chunks):
+        '''
+        Encrypt and authenticate the chunks in a single AES-GCM pass. The
+        chunks are fed to the cipher one after the other instead of being
+        joined first.
+        '''
+        nonce = os.urandom(self.GCM_NONCE_SIZE)
+        cypher = GCM_AES.new(self.keys[0], GCM_AES.MODE_GCM, nonce=nonce, mac_len=self.GCM_TAG_SIZE)
+        parts = [nonce]
+        parts.extend(cypher.encrypt(chunk) for chunk in chunks)
+        parts.append(cypher.digest())
+        return b''.join(parts)
+
+    def _decrypt_gcm(self, data, head=0):
+        '''
+        Verify and decrypt an AES-GCM message. The plaintext is returned as a
+        tuple of its first ``head`` bytes and the rest, both decrypted
+        straight from slices of a memoryview of the message.
+        '''
+        if six.PY3 and not isinstance(data, bytes):
+            data = salt.utils.stringutils.to_bytes(data)
+        if len(data) < self.GCM_NONCE_SIZE + self.GCM_TAG_SIZE + head:
+            log.debug('Failed to authenticate message')
+            raise AuthenticationError('message authentication failed')
+        view = memoryview(data) if six.PY3 else data
+        body = self.GCM_NONCE_SIZE + head
+        cypher = GCM_AES.new(self.keys[0],
+                             GCM_AES.MODE_GCM,
+                             nonce=bytes(view[:self.GCM_NONCE_SIZE]),
+                             mac_len=self.GCM_TAG_SIZE)
+        ret = (cypher.decrypt(view[self.GCM_NONCE_SIZE:body]),
+               cypher.decrypt(view[body:-self.GCM_TAG_SIZE]))
+        try:
+            cypher.verify(view[-self.GCM_TAG_SIZE:])
+        except ValueError:
+            log.debug('Failed to authenticate message')
+            raise AuthenticationError('message authentication failed')
+        return ret
+
     def dumps(self, obj):
         '''
         Serialize and encrypt a python object
         '''
+        if self.cipher == self.GCM_CIPHER:
+            return self._encrypt_gcm(self.PICKLE_PAD, self.serial.dumps(obj))
         return self.encrypt(self.PICKLE_PAD + self.serial.dumps(obj))
 
     def loads(self, data, raw=False):
         '''
         Decrypt and un-serialize a python object
         '''
-        data = self.decrypt(data)
+        if self.cipher == self.GCM_CIPHER:
+            pad, data = self._decrypt_gcm(data, len(self.PICKLE_PAD))
+        else:
+            data = self.decrypt(data)
+            pad, data = data[:len(self.PICKLE_PAD)], data[len(self.PICKLE_PAD):]
         # simple integrity check to verify that we got meaningful data
-        if not data.startswith(self.PICKLE_PAD):
+        if pad != self.PICKLE_PAD:
             return {}
-        load = self.serial.loads(data[len(self.PICKLE_PAD):], raw=raw)
+        load = self.serial.loads(data, raw=raw)
         return load
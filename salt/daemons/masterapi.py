@@ -436,6 +436,7 @@ class RemoteFuncs(object):
         self._serve_file = fs_.serve_file
         self._file_find = fs_._find_file
         self._file_hash = fs_.file_hash
+        self._file_manifest = fs_.file_manifest
         self._file_list = fs_.file_list
         self._file_list_emptydirs = fs_.file_list_emptydirs
         self._dir_list = fs_.dir_list
@@ -605,9 +606,8 @@ class RemoteFuncs(object):
                 greedy=False
                 )
         minions = _res['minions']
-        for minion in minions:
-            fdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
-
+        cached = salt.utils.minions.fetch_minions_cache(self.cache, minions, 'mine')
+        for minion, fdata in six.iteritems(cached):
             if not isinstance(fdata, dict):
                 continue
 
@@ -746,9 +746,11 @@ class RemoteFuncs(object):
                 pillar_override=load.get('pillar_override', {}))
         data = pillar.compile_pillar()
         if self.opts.get('minion_data_cache', False):
+            mdata = {'grains': load['grains'], 'pillar': data}
             self.cache.store('minions/{0}'.format(load['id']),
                              'data',
-                             {'grains': load['grains'], 'pillar': data})
+                             mdata)
+            self.ckminions.update_data_index(load['id'], mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'comment': 'Minion data cache refresh'}, salt.utils.event.tagify(load['id'], 'refresh', 'minion'))
         return data
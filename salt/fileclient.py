@@ -12,6 +12,7 @@ import os
 import string
 import shutil
 import ftplib
+import threading
 from tornado.httputil import parse_response_start_line, HTTPHeaders, HTTPInputError
 import salt.utils.atomicfile
 
@@ -43,6 +44,7 @@ from salt.ext import six
 import salt.ext.six.moves.BaseHTTPServer as BaseHTTPServer
 from salt.ext.six.moves.urllib.error import HTTPError, URLError
 from salt.ext.six.moves.urllib.parse import urlparse, urlunparse
+from salt.ext.six.moves import queue, range
 # pylint: enable=no-name-in-module,import-error
 
 log = logging.getLogger(__name__)
@@ -92,6 +94,9 @@ class Client(object):
         self.opts = opts
         self.utils = salt.loader.utils(self.opts)
         self.serial = salt.payload.Serial(self.opts)
+        # The manifest entries remembered by file_manifest, by saltenv and
+        # path
+        self.manifest = {}
 
     # Add __setstate__ and __getstate__ so that the object may be
     # deep copied. It normally can't be deep copied because its
@@ -159,6 +164,106 @@ class Client(object):
 
             yield dest
 
+    def _store_loc(self, hash_server, cachedir=None):
+        '''
+        Return the location of the file with the hash reported by the master
+        in the content addressed store of the file cache, or None if the store
+        is disabled or the master did not report a hash
+        '''
+        if not self.opts.get('file_cache_store') \
+                or not isinstance(hash_server, dict) \
+                or not hash_server.get('hsum'):
+            return None
+        hsum = salt.utils.stringutils.to_str(hash_server['hsum'])
+        return salt.utils.path.join(
+            self.get_cachedir(cachedir),
+            'file_store',
+            salt.utils.stringutils.to_str(hash_server.get('hash_type', 'md5')),
+            hsum[:2],
+            hsum)
+
+    @staticmethod
+    def _link_file(src, dest):
+        '''
+        Hardlink src to dest, atomically replacing dest. Return False if the
+        link could not be made, for instance across filesystems.
+        '''
+        tmp = os.path.join(
+            os.path.dirname(dest),
+            '.{0}.{1}.{2}'.format(os.path.basename(dest),
+                                  os.getpid(),
+                                  threading.current_thread().ident))
+        try:
+            os.link(src, tmp)
+            salt.utils.files.rename(tmp, dest)
+        except (AttributeError, OSError, MinionError) as exc:
+            log.debug('Unable to link %s to %s: %s', src, dest, exc)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _fetch_store(self, store_loc, dest, hash_server, link=True):
+        '''
+        Put the file stored at store_loc in dest, as a hardlink if link is
+        True and as a copy otherwise. Return False if the file is not in the
+        store or no longer matches its hash.
+        '''
+        if not os.path.isfile(store_loc):
+            return False
+        hash_type = salt.utils.stringutils.to_str(
+            hash_server.get('hash_type', 'md5'))
+        if salt.utils.hashutils.get_hash(store_loc, hash_type) != \
+                salt.utils.stringutils.to_str(hash_server['hsum']):
+            # The file was changed in place through one of its links
+            log.warning('Removing corrupted file %s from the file store', store_loc)
+            os.remove(store_loc)
+            return False
+        if link:
+            if os.path.isdir(dest):
+                salt.utils.files.rm_rf(dest)
+            return self._link_file(store_loc, dest)
+        shutil.copyfile(store_loc, dest)
+        return True
+
+    def _add_store(self, store_loc, dest, hash_server):
+        '''
+        Add the cached file dest to the store as store_loc, if it matches the
+        hash reported by the master
+        '''
+        hash_type = salt.utils.stringutils.to_str(
+            hash_server.get('hash_type', 'md5'))
+        if salt.utils.hashutils.get_hash(dest, hash_type) != \
+                salt.utils.stringutils.to_str(hash_server['hsum']):
+            return
+        with salt.utils.files.set_umask(0o077):
+            try:
+                os.makedirs(os.path.dirname(store_loc))
+            except OSError as exc:
+                if exc.errno != errno.EEXIST:
+                    raise
+        self._link_file(dest, store_loc)
+
+    def prune_store(self, cachedir=None):
+        '''
+        Remove the files of the content addressed store which are no longer
+        linked from the file cache
+        '''
+        ret = []
+        store = os.path.join(self.get_cachedir(cachedir), 'file_store')
+        for root, dirs, files in salt.utils.path.os_walk(store):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_nlink < 2:
+                        os.remove(path)
+                        ret.append(path)
+                except OSError:
+                    pass
+        return ret
+
     def get_cachedir(self, cachedir=None):
         if cachedir is None:
             cachedir = self.opts['cachedir']
@@ -215,6 +320,8 @@ class Client(object):
                 self.cache_file(
                     salt.utils.url.create(path), saltenv, cachedir=cachedir)
             )
+        if self.opts.get('file_cache_store'):
+            self.prune_store(cachedir)
         return ret
 
     def cache_dir(self, path, saltenv='base', include_empty=False,
@@ -236,15 +343,25 @@ class Client(object):
         )
         # go through the list of all files finding ones that are in
         # the target directory and caching them
+        paths = []
         for fn_ in self.file_list(saltenv):
             fn_ = salt.utils.data.decode(fn_)
             if fn_.strip() and fn_.startswith(path):
                 if salt.utils.stringutils.check_include_exclude(
                         fn_, include_pat, exclude_pat):
-                    fn_ = self.cache_file(
-                        salt.utils.url.create(fn_), saltenv, cachedir=cachedir)
-                    if fn_:
-                        ret.append(fn_)
+                    paths.append(fn_)
+        # Get the hashes of all of the files in one request rather than one
+        # request per file
+        if paths:
+            self.file_manifest(saltenv, paths=paths, remember=True)
+        try:
+            for fn_ in paths:
+                fn_ = self.cache_file(
+                    salt.utils.url.create(fn_), saltenv, cachedir=cachedir)
+                if fn_:
+                    ret.append(fn_)
+        finally:
+            self.forget_manifest(saltenv)
 
         if include_empty:
             # Break up the path into a list containing the bottom-level
@@ -268,6 +385,63 @@ class Client(object):
                     ret.append(minion_dir)
         return ret
 
+    def file_manifest(self, saltenv='base', prefix='', paths=None,
+                      remember=False):
+        '''
+        Return the hash, mode and size of the files under prefix, or of the
+        files in paths, as a dict of ``{path: [hash, mode, size]}``.
+
+        If remember is True, the hashes and stats of these files are then
+        served from the manifest instead of being requested again, until
+        forget_manifest is called.
+        '''
+        ret = self._file_manifest(saltenv, prefix, paths)
+        if remember:
+            for path, entry in six.iteritems(ret):
+                self.manifest[(saltenv, path)] = entry
+        return ret
+
+    def _file_manifest(self, saltenv, prefix, paths):
+        '''
+        Build the manifest of file_manifest one file at a time
+        '''
+        if paths is None:
+            paths = self.file_list(saltenv, prefix)
+        ret = {}
+        for path in paths:
+            hash_, stat = self.hash_and_stat_file(
+                salt.utils.url.create(path), saltenv)
+            if not hash_:
+                continue
+            try:
+                ret[path] = [hash_, stat[0], stat[6]]
+            except (IndexError, TypeError):
+                ret[path] = [hash_, None, None]
+        return ret
+
+    def forget_manifest(self, saltenv=None):
+        '''
+        Drop the manifest entries remembered by file_manifest, for a single
+        saltenv or for all of them
+        '''
+        if saltenv is None:
+            self.manifest.clear()
+            return
+        for key in [x for x in self.manifest if x[0] == saltenv]:
+            self.manifest.pop(key)
+
+    def _manifest_entry(self, path, saltenv):
+        '''
+        Return the manifest entry remembered for a salt:// path, if any
+        '''
+        if not self.manifest:
+            return None
+        try:
+            path = self._check_proto(path)
+        except MinionError:
+            return None
+        return self.manifest.get((saltenv, path))
+
     def cache_local_file(self, path, **kwargs):
         '''
         Cache a local file on the minion in the localfiles cache
@@ -1054,6 +1228,10 @@ class RemoteClient(Client):
             self.auth = self.channel.auth
         else:
             self.auth = ''
+        # The number of chunk requests kept in flight when fetching a file,
+        # and the channels they are sent on
+        self.transfer_window = self.opts.get('file_transfer_window', 1)
+        self.transfer_channels = []
 
     def _refresh_channel(self):
         '''
@@ -1062,6 +1240,70 @@ class RemoteClient(Client):
         self.channel = salt.transport.Channel.factory(self.opts)
         return self.channel
 
+    def _get_file_window(self, load, fn_, chunk, size, hash_server):
+        '''
+        Fetch the chunks of a file after the first one, keeping
+        ``file_transfer_window`` requests in flight, each on its own channel,
+        and write them at their offset in fn_. Return False if the transfer
+        failed or the file does not match the hash of the master.
+        '''
+        offsets = queue.Queue()
+        for loc in range(chunk, size, chunk):
+            offsets.put(loc)
+        window = min(self.transfer_window, offsets.qsize())
+        while len(self.transfer_channels) < window:
+            self.transfer_channels.append(salt.transport.Channel.factory(self.opts))
+        lock = threading.Lock()
+        errors = []
+
+        def _fetch(channel):
+            while not errors:
+                try:
+                    loc = offsets.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    data = channel.send(dict(load, loc=loc), raw=True)
+                    if six.PY3:
+                        data = decode_dict_keys_to_str(data)
+                    if not data['data']:
+                        raise ValueError('no data at offset {0}'.format(loc))
+                    if data.get('gzip', None):
+                        data = salt.utils.gzip_util.uncompress(data['data'])
+                    else:
+                        data = data['data']
+                    if six.PY3 and isinstance(data, str):
+                        data = data.encode()
+                    with lock:
+                        fn_.seek(loc)
+                        fn_.write(data)
+                except Exception as exc:
+                    errors.append(exc)
+
+        threads = [threading.Thread(target=_fetch, args=(channel,))
+                   for channel in self.transfer_channels[:window]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            log.warning(
+                'Windowed transfer of %s failed, fetching it chunk by chunk: %s',
+                load['path'], errors[0]
+            )
+            return False
+        fn_.flush()
+        if isinstance(hash_server, dict) and hash_server.get('hsum'):
+            hsum = salt.utils.hashutils.get_hash(
+                fn_.name, hash_server.get('hash_type', 'md5'))
+            if hsum != hash_server['hsum']:
+                log.warning(
+                    'Windowed transfer of %s does not match the hash of the '
+                    'master, fetching it chunk by chunk', load['path']
+                )
+                return False
+        return True
+
     def get_file(self,
                  path,
                  dest='',
@@ -1083,11 +1325,12 @@ class RemoteClient(Client):
             hash_server, stat_server = self.hash_and_stat_file(path, saltenv)
             try:
                 mode_server = stat_server[0]
+                size_server = stat_server[6]
             except (IndexError, TypeError):
-                mode_server = None
+                mode_server = size_server = None
         else:
             hash_server = self.hash_file(path, saltenv)
-            mode_server = None
+            mode_server = size_server = None
 
         # Check if file exists on server, before creating files and
         # directories
@@ -1141,12 +1384,25 @@ class RemoteClient(Client):
             if hash_local == hash_server:
                 return dest2check
 
+        # Files cached from the master are hardlinks of the content addressed
+        # store, the file is not transferred again if its content is already
+        # there under another path or saltenv
+        store_loc = self._store_loc(hash_server, cachedir)
+        if store_loc and not dest \
+                and self._fetch_store(store_loc, dest2check, hash_server):
+            log.debug(
+                'In saltenv \'%s\', found \'%s\' in the file store',
+                saltenv, path
+            )
+            return dest2check
+
         log.debug(
             'Fetching file from saltenv \'%s\', ** attempting ** \'%s\'',
             saltenv, path
         )
         d_tries = 0
         transport_tries = 0
+        window_done = self.transfer_window < 2 or not size_server
         path = self._check_proto(path)
         load = {'path': path,
                 'saltenv': saltenv,
@@ -1156,6 +1412,7 @@ class RemoteClient(Client):
             load['gzip'] = gzip
 
         fn_ = None
+        in_cache = not dest
         if dest:
             destdir = os.path.dirname(dest)
             if not os.path.isdir(destdir):
@@ -1167,6 +1424,9 @@ class RemoteClient(Client):
                             raise
                 else:
                     return False
+            if store_loc and self._fetch_store(
+                    store_loc, dest, hash_server, link=False):
+                return dest
             # We need an open filehandle here, that's why we're not using a
             # with clause:
             fn_ = salt.utils.files.fopen(dest, 'wb+')  # pylint: disable=resource-leakage
@@ -1227,6 +1487,17 @@ class RemoteClient(Client):
                 if six.PY3 and isinstance(data, str):
                     data = data.encode()
                 fn_.write(data)
+                if not window_done:
+                    # Fetch the rest of the file with several chunk requests
+                    # in flight, the chunks being the size of the first one
+                    window_done = True
+                    chunk = fn_.tell()
+                    if 0 < chunk < size_server:
+                        if self._get_file_window(load, fn_, chunk, size_server, hash_server):
+                            fn_.seek(size_server)
+                        else:
+                            fn_.seek(chunk)
+                            fn_.truncate()
             except (TypeError, KeyError) as exc:
                 try:
                     data_type = type(data).__name__
@@ -1254,6 +1525,8 @@ class RemoteClient(Client):
                 'Fetching file from saltenv \'%s\', ** done ** \'%s\'',
                 saltenv, path
             )
+            if store_loc and in_cache and os.path.isfile(dest):
+                self._add_store(store_loc, dest, hash_server)
         else:
             log.debug(
                 'In saltenv \'%s\', we are ** missing ** the file \'%s\'',
@@ -1332,6 +1605,9 @@ class RemoteClient(Client):
         master file server prepend the path with salt://<file on server>
         otherwise, prepend the file with / for a local file.
         '''
+        entry = self._manifest_entry(path, saltenv)
+        if entry:
+            return entry[0]
         return self.__hash_and_stat_file(path, saltenv)
 
     def hash_and_stat_file(self, path, saltenv='base'):
@@ -1339,6 +1615,12 @@ class RemoteClient(Client):
         The same as hash_file, but also return the file's mode, or None if no
         mode data is present.
         '''
+        entry = self._manifest_entry(path, saltenv)
+        if entry:
+            # The manifest only carries the mode and size of the stat result
+            stat_result = [None] * 10
+            stat_result[0], stat_result[6] = entry[1], entry[2]
+            return entry[0], stat_result
         hash_result = self.hash_file(path, saltenv)
         try:
             path = self._check_proto(path)
@@ -1360,6 +1642,21 @@ class RemoteClient(Client):
             stat_result = None
         return hash_result, stat_result
 
+    def _file_manifest(self, saltenv, prefix, paths):
+        '''
+        Get the manifest of file_manifest from the master in one request
+        '''
+        load = {'saltenv': saltenv,
+                'prefix': prefix,
+                'cmd': '_file_manifest'}
+        if paths is not None:
+            load['paths'] = list(paths)
+        ret = self.channel.send(load)
+        if not isinstance(ret, dict):
+            # The master predates _file_manifest
+            return super(RemoteClient, self)._file_manifest(saltenv, prefix, paths)
+        return salt.utils.data.decode(ret) if six.PY2 else ret
+
     def list_env(self, saltenv='base'):
         '''
         Return a list of the files in the file server's specified environment
@@ -1415,6 +1712,9 @@ class FSClient(RemoteClient):
         Client.__init__(self, opts)  # pylint: disable=W0233
         self.channel = salt.fileserver.FSChan(opts)
         self.auth = DumbAuth()
+        # The files are local, there is no latency to hide
+        self.transfer_window = 1
+        self.transfer_channels = []
 
 
 class DumbAuth(object):
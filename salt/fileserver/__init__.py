@@ -657,6 +657,40 @@ class Fileserver(object):
         except (IndexError, TypeError):
             return '', None
 
+    @ensure_unicode_args
+    def file_manifest(self, load):
+        '''
+        Return the hash, mode and size of the files under a prefix, or of a
+        list of files, as a dict of ``{path: [hash, mode, size]}``
+        '''
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if 'saltenv' not in load:
+            return {}
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        paths = load.get('paths')
+        if paths is None:
+            paths = self.file_list({'saltenv': load['saltenv'],
+                                    'prefix': load.get('prefix', '')})
+        ret = {}
+        for path in paths:
+            try:
+                hash_, stat_result = self.__file_hash_and_stat(
+                    {'path': path, 'saltenv': load['saltenv']})
+            except (IndexError, TypeError):
+                continue
+            if not hash_:
+                continue
+            try:
+                ret[path] = [hash_, stat_result[0], stat_result[6]]
+            except (IndexError, TypeError):
+                ret[path] = [hash_, None, None]
+        return ret
+
     def clear_file_list_cache(self, load):
         '''
         Deletes the file_lists cache files
@@ -19,11 +19,15 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 # Import python libs
 import os
-import errno
 import logging
+import stat
+import time
 
 # Import salt libs
 import salt.fileserver
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.data
 import salt.utils.event
 import salt.utils.files
 import salt.utils.gzip_util
@@ -32,10 +36,95 @@ import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.versions
+from salt.config import DEFAULT_INTERVAL
 from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# The hashes of the files of file_roots by path, as [hash, mtime, size], read
+# from the index written by update(), along with the mtime of the index file
+# and when it was last checked
+_HASH_INDEX = {'hashes': {}, 'mtime': None, 'checked': 0}
+
+
+def _hash_index_path():
+    '''
+    Return the path of the hash index file
+    '''
+    return os.path.join(__opts__['cachedir'], 'roots', 'hash_index')
+
+
+def _read_hash_index():
+    '''
+    Read the hash index file, return an empty index if it is missing, is
+    unreadable or was written for another hash_type
+    '''
+    try:
+        with salt.utils.files.fopen(_hash_index_path(), 'rb') as fp_:
+            index = salt.utils.data.decode(
+                salt.payload.Serial(__opts__).load(fp_))
+    except (IOError, OSError):
+        return {}
+    except Exception as exc:
+        log.warning(
+            'Ignoring invalid hash index %s: %s', _hash_index_path(), exc
+        )
+        return {}
+    if not isinstance(index, dict) \
+            or index.get('hash_type') != __opts__['hash_type']:
+        return {}
+    return index.get('hashes') or {}
+
+
+def _hash_index():
+    '''
+    Return the hash index, reloading it when update() rewrote the index file.
+    The file is checked at most every roots_update_interval seconds, so that
+    lookups need no filesystem access in between.
+    '''
+    now = time.time()
+    interval = __opts__.get('roots_update_interval', DEFAULT_INTERVAL)
+    if now - _HASH_INDEX['checked'] >= interval:
+        _HASH_INDEX['checked'] = now
+        try:
+            mtime = os.path.getmtime(_hash_index_path())
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != _HASH_INDEX['mtime']:
+            _HASH_INDEX['hashes'] = _read_hash_index()
+            _HASH_INDEX['mtime'] = mtime
+    return _HASH_INDEX['hashes']
+
+
+def _update_hash_index(mtime_map):
+    '''
+    Bring the hash index in line with the mtime map of file_roots, hashing
+    the files which are new or changed, and persist it
+    '''
+    index = _read_hash_index()
+    hashes = {}
+    for path, mtime in six.iteritems(mtime_map):
+        entry = index.get(path)
+        if entry and entry[1] == mtime:
+            hashes[path] = entry
+            continue
+        try:
+            hashes[path] = [
+                salt.utils.hashutils.get_hash(path, __opts__['hash_type']),
+                mtime,
+                os.path.getsize(path)
+            ]
+        except (IOError, OSError):
+            continue
+    index_path = _hash_index_path()
+    if hashes != index or not os.path.isfile(index_path):
+        with salt.utils.atomicfile.atomic_open(index_path, 'wb') as fp_:
+            salt.payload.Serial(__opts__).dump(
+                {'hash_type': __opts__['hash_type'], 'hashes': hashes}, fp_)
+    _HASH_INDEX['hashes'] = hashes
+    _HASH_INDEX['mtime'] = os.path.getmtime(index_path)
+    _HASH_INDEX['checked'] = time.time()
+
 
 def find_file(path, saltenv='base', **kwargs):
     '''
@@ -138,16 +227,13 @@ def serve_file(load, fnd):
 
 def update():
     '''
-    When we are asked to update (regular interval) lets reap the cache
+    When we are asked to update (regular interval) lets refresh the mtime map
+    and the hash index
     '''
-    try:
-        salt.fileserver.reap_fileserver_cache_dir(
-            os.path.join(__opts__['cachedir'], 'roots', 'hash'),
-            find_file
-        )
-    except (IOError, OSError):
-        # Hash file won't exist if no files have yet been served up
-        pass
+    # The hashes used to be cached in one file per served file
+    legacy_hash_dir = os.path.join(__opts__['cachedir'], 'roots', 'hash')
+    if os.path.isdir(legacy_hash_dir):
+        salt.utils.files.rm_rf(legacy_hash_dir)
 
     mtime_map_path = os.path.join(__opts__['cachedir'], 'roots', 'mtime_map')
     # data to send on event
@@ -197,6 +283,8 @@ def update():
                 )
             )
 
+    _update_hash_index(new_mtime_map)
+
     if __opts__.get('fileserver_events', False):
         # if there is a change, fire an event
         event = salt.utils.event.get_event(
@@ -223,65 +311,32 @@ def file_hash(load, fnd):
     ret = {}
 
     # if the file doesn't exist, we can't get a hash
-    if not path or not os.path.isfile(path):
+    if not path:
+        return ret
+    # The float mtime is needed to tell apart the edits made within a second,
+    # the stat of find_file only holds whole seconds
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return ret
+    if not stat.S_ISREG(stat_result.st_mode):
         return ret
 
     # set the hash_type as it is determined by config-- so mechanism won't change that
     ret['hash_type'] = __opts__['hash_type']
 
-    # check if the hash is cached
-    # cache file's contents should be "hash:mtime"
-    cache_path = os.path.join(__opts__['cachedir'],
-                              'roots',
-                              'hash',
-                              load['saltenv'],
-                              '{0}.hash.{1}'.format(fnd['rel'],
-                              __opts__['hash_type']))
-    # if we have a cache, serve that if the mtime hasn't changed
-    if os.path.exists(cache_path):
-        try:
-            with salt.utils.files.fopen(cache_path, 'r') as fp_:
-                try:
-                    hsum, mtime = salt.utils.stringutils.to_unicode(fp_.read()).split(':')
-                except ValueError:
-                    log.debug('Fileserver attempted to read incomplete cache file. Retrying.')
-                    # Delete the file since its incomplete (either corrupted or incomplete)
-                    try:
-                        os.unlink(cache_path)
-                    except OSError:
-                        pass
-                    return file_hash(load, fnd)
-                if str(os.path.getmtime(path)) == mtime:
-                    # check if mtime changed
-                    ret['hsum'] = hsum
-                    return ret
-        except (os.error, IOError):  # Can't use Python select() because we need Windows support
-            log.debug("Fileserver encountered lock when reading cache file. Retrying.")
-            # Delete the file since its incomplete (either corrupted or incomplete)
-            try:
-                os.unlink(cache_path)
-            except OSError:
-                pass
-            return file_hash(load, fnd)
+    # serve the hash from the index if the file hasn't changed
+    hashes = _hash_index()
+    entry = hashes.get(path)
+    if entry and entry[1] == stat_result.st_mtime \
+            and entry[2] == stat_result.st_size:
+        ret['hsum'] = entry[0]
+        return ret
 
-    # if we don't have a cache entry-- lets make one
+    # if we don't have an index entry-- lets make one, it is persisted by the
+    # next update()
     ret['hsum'] = salt.utils.hashutils.get_hash(path, __opts__['hash_type'])
-    cache_dir = os.path.dirname(cache_path)
-    # make cache directory if it doesn't exist
-    if not os.path.exists(cache_dir):
-        try:
-            os.makedirs(cache_dir)
-        except OSError as err:
-            if err.errno == errno.EEXIST:
-                # rarely, the directory can be already concurrently created between
-                # the os.path.exists and the os.makedirs lines above
-                pass
-            else:
-                raise
-    # save the cache object "hash:mtime"
-    cache_object = '{0}:{1}'.format(ret['hsum'], os.path.getmtime(path))
-    with salt.utils.files.flopen(cache_path, 'w') as fp_:
-        fp_.write(cache_object)
+    hashes[path] = [ret['hsum'], stat_result.st_mtime, stat_result.st_size]
     return ret
 
 
@@ -29,6 +29,7 @@ import salt.utils.files
 import salt.utils.json
 import salt.utils.kinds
 import salt.utils.master
+import salt.utils.minions
 import salt.utils.sdb
 import salt.utils.stringutils
 import salt.utils.user
@@ -614,12 +615,10 @@ class Key(object):
                 continue
             ret[os.path.basename(dir_)] = []
             try:
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(dir_)):
-                    if not fn_.startswith('.'):
-                        if os.path.isfile(os.path.join(dir_, fn_)):
-                            ret[os.path.basename(dir_)].append(
-                                salt.utils.stringutils.to_unicode(fn_)
-                            )
+                for fn_ in salt.utils.minions.pki_dir_minions(dir_):
+                    ret[os.path.basename(dir_)].append(
+                        salt.utils.stringutils.to_unicode(fn_)
+                    )
             except (OSError, IOError):
                 # key dir kind is not created yet, just skip
                 continue
@@ -640,29 +639,13 @@ class Key(object):
         acc, pre, rej, den = self._check_minions_directories()
         ret = {}
         if match.startswith('acc'):
-            ret[os.path.basename(acc)] = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(acc)):
-                if not fn_.startswith('.'):
-                    if os.path.isfile(os.path.join(acc, fn_)):
-                        ret[os.path.basename(acc)].append(fn_)
+            ret[os.path.basename(acc)] = salt.utils.minions.pki_dir_minions(acc)
         elif match.startswith('pre') or match.startswith('un'):
-            ret[os.path.basename(pre)] = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(pre)):
-                if not fn_.startswith('.'):
-                    if os.path.isfile(os.path.join(pre, fn_)):
-                        ret[os.path.basename(pre)].append(fn_)
+            ret[os.path.basename(pre)] = salt.utils.minions.pki_dir_minions(pre)
         elif match.startswith('rej'):
-            ret[os.path.basename(rej)] = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(rej)):
-                if not fn_.startswith('.'):
-                    if os.path.isfile(os.path.join(rej, fn_)):
-                        ret[os.path.basename(rej)].append(fn_)
+            ret[os.path.basename(rej)] = salt.utils.minions.pki_dir_minions(rej)
         elif match.startswith('den') and den is not None:
-            ret[os.path.basename(den)] = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(den)):
-                if not fn_.startswith('.'):
-                    if os.path.isfile(os.path.join(den, fn_)):
-                        ret[os.path.basename(den)].append(fn_)
+            ret[os.path.basename(den)] = salt.utils.minions.pki_dir_minions(den)
         elif match.startswith('all'):
             return self.all_keys()
         return ret
@@ -362,6 +362,14 @@ def pillars(opts, functions, context=None):
     return FilterDictWrapper(ret, '.ext_pillar')
 
 
+def pillar_revisions(opts, functions=None, context=None):
+    '''
+    Returns the revision functions of the pillars modules
+    '''
+    ret = pillars(opts, functions or {}, context=context)
+    return FilterDictWrapper(ret._dict, '.revision')
+
+
 def tops(opts):
     '''
     Returns the tops modules
@@ -249,16 +249,13 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
         which contains a list
         '''
         if self.opts['key_cache'] == 'sched':
-            keys = []
             #TODO DRY from CKMinions
             if self.opts['transport'] in ('zeromq', 'tcp'):
                 acc = 'minions'
             else:
                 acc = 'accepted'
 
-            for fn_ in os.listdir(os.path.join(self.opts['pki_dir'], acc)):
-                if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], acc, fn_)):
-                    keys.append(fn_)
+            keys = salt.utils.minions.pki_dir_minions(os.path.join(self.opts['pki_dir'], acc))
             log.debug('Writing master key cache')
             # Write a temporary file securely
             with salt.utils.atomicfile.atomic_open(os.path.join(self.opts['pki_dir'], acc, '.key_cache')) as cache_file:
@@ -570,6 +567,15 @@ class Master(SMaster):
                 'Cannot change to root directory ({0})'.format(err)
             )
 
+        if self.opts['session_cipher'] not in salt.crypt.Crypticle.supported_ciphers():
+            errors.append(
+                'The session_cipher {0} is not supported, the supported '
+                'ciphers are: {1}'.format(
+                    self.opts['session_cipher'],
+                    ', '.join(salt.crypt.Crypticle.supported_ciphers())
+                )
+            )
+
         if self.opts.get('fileserver_verify_config', True):
             # Avoid circular import
             import salt.fileserver
@@ -661,10 +667,15 @@ class Master(SMaster):
                 'secret': multiprocessing.Array(
                     ctypes.c_char,
                     salt.utils.stringutils.to_bytes(
-                        salt.crypt.Crypticle.generate_key_string()
+                        salt.crypt.Crypticle.generate_key_string(
+                            cipher=self.opts['session_cipher']
+                        )
                     )
                 ),
-                'reload': salt.crypt.Crypticle.generate_key_string
+                'reload': functools.partial(
+                    salt.crypt.Crypticle.generate_key_string,
+                    cipher=self.opts['session_cipher']
+                )
             }
             log.info('Creating master process manager')
             # Since there are children having their own ProcessManager we should wait for kill more time.
@@ -677,7 +688,11 @@ class Master(SMaster):
                 pub_channels.append(chan)
 
             log.info('Creating master event publisher process')
-            self.process_manager.add_process(salt.utils.event.EventPublisher, args=(self.opts,))
+            for shard in range(self.opts['event_publisher_shards']):
+                self.process_manager.add_process(
+                    salt.utils.event.EventPublisher,
+                    args=(self.opts,),
+                    kwargs={'shard': shard})
 
             if self.opts.get('reactor'):
                 if isinstance(self.opts['engines'], list):
@@ -1180,6 +1195,7 @@ class AESFuncs(object):
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
+        self._file_manifest = self.fs_.file_manifest
         self._file_list = self.fs_.file_list
         self._file_list_emptydirs = self.fs_.file_list_emptydirs
         self._dir_list = self.fs_.dir_list
@@ -1538,10 +1554,11 @@ class AESFuncs(object):
         data = pillar.compile_pillar()
         self.fs_.update_opts()
         if self.opts.get('minion_data_cache', False):
+            mdata = {'grains': load['grains'], 'pillar': data}
             self.masterapi.cache.store('minions/{0}'.format(load['id']),
                                        'data',
-                                       {'grains': load['grains'],
-                                        'pillar': data})
+                                       mdata)
+            self.ckminions.update_data_index(load['id'], mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'Minion data cache refresh': load['id']}, tagify(load['id'], 'refresh', 'minion'))
         return data
@@ -2191,10 +2208,23 @@ class ClearFuncs(object):
         '''
         Take a load and send it across the network to connected minions
         '''
-        for transport, opts in iter_transport_opts(self.opts):
-            chan = salt.transport.server.PubServerChannel.factory(opts)
+        for chan in self.channels:
             chan.publish(load)
 
+    @property
+    def channels(self):
+        '''
+        The publisher channels for every configured transport. These are built
+        once per worker so the channels can keep their connection to the
+        publish daemon open between jobs.
+        '''
+        if not hasattr(self, '_channels'):
+            self._channels = [
+                salt.transport.server.PubServerChannel.factory(opts)
+                for transport, opts in iter_transport_opts(self.opts)
+            ]
+        return self._channels
+
     @property
     def ssh_client(self):
         if not hasattr(self, '_ssh_client'):
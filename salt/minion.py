@@ -18,6 +18,7 @@ import logging
 import threading
 import traceback
 import contextlib
+import collections
 import multiprocessing
 from random import randint, shuffle
 from stat import S_IMODE
@@ -127,6 +128,7 @@ from salt.exceptions import (
 
 import tornado.gen  # pylint: disable=F0401
 import tornado.ioloop  # pylint: disable=F0401
+import tornado.locks  # pylint: disable=F0401
 
 log = logging.getLogger(__name__)
 
@@ -1062,6 +1064,201 @@ class MinionManager(MinionBase):
             minion.destroy()
 
 
+class JobWorker(SignalHandlingMultiprocessingProcess):
+    '''
+    A pre-forked process running the jobs of a minion one after the other,
+    with the loaders of the minion it was forked from
+    '''
+    def __init__(self, minion, conn, **kwargs):
+        '''
+        :param Minion minion: The minion to run the jobs of
+        :param Connection conn: The end of the pipe to receive the jobs from
+                                and to tell the minion they finished
+        '''
+        super(JobWorker, self).__init__(**kwargs)
+        self.minion = minion
+        self.conn = conn
+
+    def _recv(self, parent):
+        '''
+        Return the next job, or None once the worker should exit
+        '''
+        while not self.conn.poll(1):
+            if os.getppid() != parent:
+                # The minion is gone
+                return None
+        try:
+            return self.conn.recv()
+        except EOFError:
+            return None
+
+    def _contexts(self):
+        '''
+        Return the __context__ dicts of the loaders of the minion
+        '''
+        contexts = {}
+        for loader in ('functions', 'returners', 'executors'):
+            context = getattr(getattr(self.minion, loader, None), 'pack', {}).get('__context__')
+            if isinstance(context, dict):
+                contexts[id(context)] = context
+        return list(contexts.values())
+
+    def run(self):
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        # The pipes to the other workers belong to the minion
+        pool, self.minion.job_pool = self.minion.job_pool, None
+        if pool is not None:
+            for worker in six.itervalues(pool.workers):
+                worker['conn'].close()
+        if salt.utils.process.HAS_SETPROCTITLE:
+            title = salt.utils.process.setproctitle.getproctitle()
+        parent = os.getppid()
+        # Each job starts with the __context__ of the minion, as it would in
+        # a process forked for it
+        contexts = [(context, copy.copy(context)) for context in self._contexts()]
+        while True:
+            job = self._recv(parent)
+            if job is None:
+                break
+            data, connected = job
+            for context, saved in contexts:
+                context.clear()
+                context.update(saved)
+            self.minion.connected = connected
+            # The worker is the process of the job already, it must not be
+            # daemonized
+            opts = dict(self.minion.opts, multiprocessing=False)
+            try:
+                self.minion._target(self.minion, opts, data, connected)
+            except Exception:
+                log.exception('The job %s failed in the job worker', data['jid'])
+            finally:
+                try:
+                    os.remove(os.path.join(self.minion.proc_dir, data['jid']))
+                except (OSError, IOError):
+                    # The file is gone already
+                    pass
+                if salt.utils.process.HAS_SETPROCTITLE:
+                    salt.utils.process.setproctitle.setproctitle(title)
+            try:
+                self.conn.send(data['jid'])
+            except (OSError, IOError):
+                # The pool was stopped while the job ran
+                break
+
+
+class JobWorkerPool(object):
+    '''
+    Run the jobs of a minion in a pool of pre-forked job workers
+
+    The jobs wait for a free worker on a semaphore. The workers are replaced
+    after running max_jobs jobs, when they die, and when the modules of the
+    minion are refreshed so that the jobs run with the new modules and pillar.
+    '''
+    def __init__(self, minion, size, max_jobs=0):
+        self.minion = minion
+        self.io_loop = minion.io_loop
+        self.size = size
+        self.max_jobs = max_jobs
+        # fd of the pipe to the worker -> worker
+        self.workers = {}
+        self.idle = collections.deque()
+        self.generation = 0
+        self.semaphore = tornado.locks.Semaphore(size)
+
+    def start(self):
+        '''
+        Fork the workers
+        '''
+        log.info('Starting %s job workers', self.size)
+        for _ in range(self.size):
+            self.idle.append(self._spawn())
+
+    def _spawn(self):
+        conn, child_conn = multiprocessing.Pipe()
+        process = JobWorker(self.minion, child_conn, name='JobWorker')
+        process.start()
+        child_conn.close()
+        worker = {'process': process,
+                  'conn': conn,
+                  'generation': self.generation,
+                  'jobs': 0,
+                  'jid': None}
+        self.workers[conn.fileno()] = worker
+        self.io_loop.add_handler(conn.fileno(), self._handle_worker, self.io_loop.READ)
+        return worker
+
+    def _retire(self, worker):
+        fd = worker['conn'].fileno()
+        self.io_loop.remove_handler(fd)
+        del self.workers[fd]
+        try:
+            worker['conn'].send(None)
+        except (OSError, IOError):
+            # The worker is gone already
+            pass
+        # The process is reaped with the other children of the minion
+        worker['conn'].close()
+
+    def _handle_worker(self, fd, events):
+        '''
+        A worker finished its job, or died
+        '''
+        worker = self.workers[fd]
+        try:
+            worker['conn'].recv()
+            dead = False
+        except (EOFError, OSError, IOError):
+            log.warning('The job worker %s died, running job %s',
+                        worker['process'].pid, worker['jid'])
+            dead = True
+        busy = worker['jid'] is not None
+        worker['jid'] = None
+        if not busy:
+            self.idle.remove(worker)
+        if dead or worker['generation'] != self.generation or \
+                (self.max_jobs and worker['jobs'] >= self.max_jobs):
+            self._retire(worker)
+            worker = self._spawn()
+        self.idle.append(worker)
+        if busy:
+            self.semaphore.release()
+
+    @tornado.gen.coroutine
+    def run(self, data, connected):
+        '''
+        Send a job to the next free worker
+        '''
+        if not self.idle:
+            log.debug('All the job workers are busy, job %s waits for one', data['jid'])
+        yield self.semaphore.acquire()
+        worker = self.idle.popleft()
+        worker['jid'] = data['jid']
+        worker['jobs'] += 1
+        try:
+            worker['conn'].send((data, connected))
+        except (OSError, IOError) as exc:
+            # The worker died, it is replaced once its pipe is closed
+            log.error('Unable to send job %s to a job worker: %s', data['jid'], exc)
+
+    def recycle(self):
+        '''
+        Replace the workers, the busy ones once their job is over
+        '''
+        self.generation += 1
+        for _ in range(len(self.idle)):
+            self._retire(self.idle.popleft())
+            self.idle.append(self._spawn())
+
+    def stop(self):
+        '''
+        Stop the workers, the busy ones once their job is over
+        '''
+        for worker in list(self.workers.values()):
+            self._retire(worker)
+        self.idle.clear()
+
+
 class Minion(MinionBase):
     '''
     This class instantiates a minion, runs connections for a minion,
@@ -1085,6 +1282,10 @@ class Minion(MinionBase):
         # True means the Minion is fully functional and ready to handle events.
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
+        # The jobs to send heartbeats for, jid -> time they were acknowledged
+        self.job_heartbeats = {}
+        # The pre-forked job workers, if job_worker_pool is set
+        self.job_pool = None
         self.periodic_callbacks = {}
 
         if io_loop is None:
@@ -1462,51 +1663,97 @@ class Minion(MinionBase):
                 self.functions, self.returners, self.function_errors, self.executors = self._load_modules()
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
+                if self.job_pool is not None:
+                    self.job_pool.recycle()
 
-        process_count_max = self.opts.get('process_count_max')
-        if process_count_max > 0:
-            process_count = len(salt.utils.minion.running(self.opts))
-            while process_count >= process_count_max:
-                log.warning("Maximum number of processes reached while executing jid {0}, waiting...".format(data['jid']))
-                yield tornado.gen.sleep(10)
+        if self.job_pool is not None:
+            yield self.job_pool.run(data, self.connected)
+        else:
+            process_count_max = self.opts.get('process_count_max')
+            if process_count_max > 0:
                 process_count = len(salt.utils.minion.running(self.opts))
-
-        # We stash an instance references to allow for the socket
-        # communication in Windows. You can't pickle functions, and thus
-        # python needs to be able to reconstruct the reference on the other
-        # side.
-        instance = self
-        multiprocessing_enabled = self.opts.get('multiprocessing', True)
-        if multiprocessing_enabled:
-            if sys.platform.startswith('win'):
-                # let python reconstruct the minion on the other side if we're
-                # running on windows
-                instance = None
-            with default_signals(signal.SIGINT, signal.SIGTERM):
-                process = SignalHandlingMultiprocessingProcess(
-                    target=self._target, args=(instance, self.opts, data, self.connected)
+                while process_count >= process_count_max:
+                    log.warning("Maximum number of processes reached while executing jid {0}, waiting...".format(data['jid']))
+                    yield tornado.gen.sleep(10)
+                    process_count = len(salt.utils.minion.running(self.opts))
+
+            # We stash an instance references to allow for the socket
+            # communication in Windows. You can't pickle functions, and thus
+            # python needs to be able to reconstruct the reference on the other
+            # side.
+            instance = self
+            multiprocessing_enabled = self.opts.get('multiprocessing', True)
+            if multiprocessing_enabled:
+                if sys.platform.startswith('win'):
+                    # let python reconstruct the minion on the other side if we're
+                    # running on windows
+                    instance = None
+                with default_signals(signal.SIGINT, signal.SIGTERM):
+                    process = SignalHandlingMultiprocessingProcess(
+                        target=self._target, args=(instance, self.opts, data, self.connected)
+                    )
+            else:
+                process = threading.Thread(
+                    target=self._target,
+                    args=(instance, self.opts, data, self.connected),
+                    name=data['jid']
                 )
-        else:
-            process = threading.Thread(
-                target=self._target,
-                args=(instance, self.opts, data, self.connected),
-                name=data['jid']
-            )
 
-        if multiprocessing_enabled:
-            with default_signals(signal.SIGINT, signal.SIGTERM):
-                # Reset current signals before starting the process in
-                # order not to inherit the current signal handlers
+            if multiprocessing_enabled:
+                with default_signals(signal.SIGINT, signal.SIGTERM):
+                    # Reset current signals before starting the process in
+                    # order not to inherit the current signal handlers
+                    process.start()
+            else:
                 process.start()
-        else:
-            process.start()
 
-        # TODO: remove the windows specific check?
-        if multiprocessing_enabled and not salt.utils.platform.is_windows():
-            # we only want to join() immediately if we are daemonizing a process
-            process.join()
-        else:
-            self.win_proc.append(process)
+            # TODO: remove the windows specific check?
+            if multiprocessing_enabled and not salt.utils.platform.is_windows():
+                # we only want to join() immediately if we are daemonizing a process
+                process.join()
+            else:
+                self.win_proc.append(process)
+
+        if self.opts.get('job_heartbeat_interval', 0) > 0 and self.connected:
+            self._fire_job_heartbeat(data['jid'])
+
+    def _job_heartbeat_event(self, jid, state):
+        '''
+        Return the heartbeat event of a job
+        '''
+        return {'tag': tagify([jid, 'ack', self.opts['id']], 'job'),
+                'data': {'id': self.opts['id'],
+                         'jid': jid,
+                         'state': state,
+                         'interval': self.opts['job_heartbeat_interval']}}
+
+    def _fire_job_heartbeat(self, jid):
+        '''
+        Acknowledge a job received from the master
+        '''
+        self.job_heartbeats[jid] = time.time()
+        self._fire_master(events=[self._job_heartbeat_event(jid, 'started')],
+                          sync=False)
+
+    def _fire_job_heartbeats(self):
+        '''
+        Tell the master which of the jobs it published still run, and which
+        finished
+        '''
+        if not self.job_heartbeats:
+            return
+        running = set(job.get('jid') for job in salt.utils.minion.running(self.opts))
+        started_before = time.time() - self.opts['job_heartbeat_interval']
+        events = []
+        for jid, started in list(self.job_heartbeats.items()):
+            if jid in running:
+                events.append(self._job_heartbeat_event(jid, 'alive'))
+            elif started < started_before:
+                # A job which just started may not be found running yet
+                del self.job_heartbeats[jid]
+                events.append(self._job_heartbeat_event(jid, 'finished'))
+        if events and self.connected:
+            self._fire_master(events=events, sync=False)
 
     def ctx(self):
         '''
@@ -2143,6 +2390,8 @@ class Minion(MinionBase):
 
         self.schedule.functions = self.functions
         self.schedule.returners = self.returners
+        if self.job_pool is not None:
+            self.job_pool.recycle()
 
     def beacons_refresh(self):
         '''
@@ -2683,6 +2932,23 @@ class Minion(MinionBase):
             self.periodic_callbacks['ping'] = tornado.ioloop.PeriodicCallback(ping_master, ping_interval * 1000)
             self.periodic_callbacks['ping'].start()
 
+        job_heartbeat_interval = self.opts.get('job_heartbeat_interval', 0)
+        if job_heartbeat_interval > 0:
+            self.periodic_callbacks['job_heartbeat'] = tornado.ioloop.PeriodicCallback(
+                self._fire_job_heartbeats, job_heartbeat_interval * 1000)
+            self.periodic_callbacks['job_heartbeat'].start()
+
+        job_worker_pool = self.opts.get('job_worker_pool', 0)
+        if job_worker_pool > 0 and self.job_pool is None:
+            if self.opts['multiprocessing'] and not salt.utils.platform.is_windows():
+                self.job_pool = JobWorkerPool(self,
+                                              job_worker_pool,
+                                              self.opts.get('job_worker_max_jobs', 0))
+                self.job_pool.start()
+            else:
+                log.warning('job_worker_pool is only supported with multiprocessing, '
+                            'and not on Windows. The jobs run in processes of their own.')
+
         # add handler to subscriber
         if hasattr(self, 'pub_channel') and self.pub_channel is not None:
             self.pub_channel.on_recv(self._handle_payload)
@@ -2756,6 +3022,9 @@ class Minion(MinionBase):
         if hasattr(self, 'periodic_callbacks'):
             for cb in six.itervalues(self.periodic_callbacks):
                 cb.stop()
+        if getattr(self, 'job_pool', None) is not None:
+            self.job_pool.stop()
+            self.job_pool = None
 
     def __del__(self):
         self.destroy()
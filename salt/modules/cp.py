@@ -725,6 +725,46 @@ def hash_file(path, saltenv='base'):
     return _client().hash_file(path, saltenv)
 
 
+def file_manifest(path='', saltenv='base', remember=False):
+    '''
+    Return the hash, mode and size of all of the files under a directory of
+    the salt master file server, in a single request to the master
+
+    remember : False
+        Serve the hashes and stats of these files from the manifest for the
+        rest of the job, instead of requesting them from the master once per
+        file, until :py:func:`cp.forget_manifest
+        <salt.modules.cp.forget_manifest>` is called
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.file_manifest salt://path/to/dir
+    '''
+    path, senv = salt.utils.url.split_env(path)
+    if senv:
+        saltenv = senv
+    if path.startswith('salt://'):
+        path = salt.utils.url.parse(path)[0]
+
+    return _client().file_manifest(saltenv, path, remember=remember)
+
+
+def forget_manifest(saltenv=None):
+    '''
+    Drop the manifests remembered by :py:func:`cp.file_manifest
+    <salt.modules.cp.file_manifest>`, for a single saltenv or for all of them
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' cp.forget_manifest
+    '''
+    _client().forget_manifest(saltenv)
+
+
 def stat_file(path, saltenv='base', octal=True):
     '''
     Return the permissions of a file, to get the permissions of a file on the
@@ -1454,17 +1454,23 @@ def top(topfn, test=None, queue=False, **kwargs):
     return ret
 
 
-def show_highstate(queue=False, **kwargs):
+def show_highstate(queue=False, timing=False, **kwargs):
     '''
     Retrieve the highstate data from the salt master and display it
 
     Custom Pillar data can be passed with the ``pillar`` kwarg.
 
+    timing : False
+        Return the highstate along with the time spent compiling the top file
+        and rendering each SLS, in milliseconds, and the hits and misses of
+        the :conf_minion:`state_render_cache`.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt '*' state.show_highstate
+        salt '*' state.show_highstate timing=True
     '''
     conflict = _check_queue(queue, kwargs)
     if conflict is not None:
@@ -1503,6 +1509,13 @@ def show_highstate(queue=False, **kwargs):
     finally:
         st_.pop_active()
     _set_retcode(ret)
+    if timing:
+        lookups = st_.render_stats['hits'] + st_.render_stats['misses']
+        stats = dict(st_.render_stats)
+        stats['hit_rate'] = float(stats['hits']) / lookups if lookups else 0.0
+        return {'highstate': ret,
+                'timing': st_.timing,
+                'render_cache': stats}
     return ret
 
 
@@ -1414,7 +1414,7 @@ class Jobs(LowDataAdapter):
         'tools.salt_auth.on': True,
     })
 
-    def GET(self, jid=None, timeout=''):
+    def GET(self, jid=None, timeout='', limit=None, cursor=None):
         '''
         A convenience URL for getting lists of previously run jobs or getting
         the return from a single job
@@ -1426,6 +1426,10 @@ class Jobs(LowDataAdapter):
             :reqheader X-Auth-Token: |req_token|
             :reqheader Accept: |req_accept|
 
+            :query limit: list at most this many of the most recent jobs
+            :query cursor: only list the jobs older than this jid, pass the
+                oldest jid of the previous page to get the next one
+
             :status 200: |200|
             :status 401: |401|
             :status 406: |406|
@@ -1503,6 +1507,10 @@ class Jobs(LowDataAdapter):
             lowstate.update({'fun': 'jobs.list_job', 'jid': jid})
         else:
             lowstate.update({'fun': 'jobs.list_jobs'})
+            if limit is not None:
+                lowstate['limit'] = limit
+            if cursor is not None:
+                lowstate['cursor'] = cursor
 
         cherrypy.request.lowstate = [lowstate]
         job_ret_info = list(self.exec_lowstate(
@@ -1273,6 +1273,10 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
 
             List jobs or show a single job from the job cache.
 
+            :query limit: list at most this many of the most recent jobs
+            :query cursor: only list the jobs older than this jid, pass the
+                oldest jid of the previous page to get the next one
+
             :status 200: |200|
             :status 401: |401|
             :status 406: |406|
@@ -1361,6 +1365,10 @@ class JobsSaltAPIHandler(SaltAPIHandler):  # pylint: disable=W0223
                 'fun': 'jobs.list_jobs',
                 'client': 'runner',
             }]
+            for arg in ('limit', 'cursor'):
+                value = self.get_argument(arg, None)
+                if value is not None:
+                    self.lowstate[0][arg] = value
 
         self.disbatch()
 
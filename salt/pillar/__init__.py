@@ -12,8 +12,11 @@ import collections
 import logging
 import tornado.gen
 import sys
+import time
+import multiprocessing
 import traceback
 import inspect
+from multiprocessing.pool import ThreadPool
 
 # Import salt libs
 import salt.loader
@@ -21,11 +24,15 @@ import salt.fileclient
 import salt.minion
 import salt.crypt
 import salt.transport
+import salt.payload
 import salt.utils.args
-import salt.utils.cache
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.path
 import salt.utils.url
 from salt.exceptions import SaltClientError
 from salt.template import compile_template
@@ -60,7 +67,8 @@ def get_pillar(opts, grains, minion_id, saltenv=None, ext=None, funcs=None,
         log.info('Compiling pillar from cache')
         log.debug('get_pillar using pillar cache with ext: %s', ext)
         return PillarCache(opts, grains, minion_id, saltenv, ext=ext, functions=funcs,
-                pillar_override=pillar_override, pillarenv=pillarenv)
+                pillar_override=pillar_override, pillarenv=pillarenv,
+                extra_minion_data=extra_minion_data)
     return ptype(opts, grains, minion_id, saltenv, ext, functions=funcs,
                  pillar_override=pillar_override, pillarenv=pillarenv,
                  extra_minion_data=extra_minion_data)
@@ -245,19 +253,42 @@ class RemotePillar(RemotePillarMixin):
         return ret_pillar
 
 
+# The revisions of the pillar sources checked by this process, by sources
+_PILLAR_SOURCE_REVISIONS = {}
+
+# The cached pillars of the memory backend of the pillar cache, by minion
+_PILLAR_MEMORY_CACHE = {}
+
+# The options changing the pillar compiled from the same sources
+PILLAR_CACHE_OPTS = ('ext_pillar', 'pillar_roots', 'pillarenv_from_saltenv',
+                     'top_file_merging_strategy', 'pillar_source_merging_strategy',
+                     'pillar_merge_lists', 'renderer', 'ext_pillar_first',
+                     'pillar_opts', 'decrypt_pillar')
+
+
 class PillarCache(object):
     '''
     Return a cached pillar if it exists, otherwise cache it.
 
     Pillar caches are structed in two diminensions: minion_id with a dict of
-    saltenvs. Each saltenv contains a pillar dict
+    saltenvs and pillarenvs. Each entry contains a pillar dict, the time it
+    was compiled at and the fingerprint of what it was compiled from: the
+    grains of the minion, the revisions of the pillar_roots and of the
+    external pillars and the pillar options. An entry is only used while its
+    fingerprint matches and its TTL has not expired.
 
     Example data structure:
 
     ```
     {'minion_1':
-        {'base': {'pilar_key_1' 'pillar_val_1'}
+        {'base:': {'fingerprint': '5d2f...',
+                   'time': 1541416234.8,
+                   'pillar': {'pilar_key_1' 'pillar_val_1'}}}
     }
+    ```
+
+    The disk backend stores the entries of each minion in its own file,
+    written atomically, which all the processes of the master share.
     '''
     # TODO ABC?
     def __init__(self, opts, grains, minion_id, saltenv, ext=None, functions=None,
@@ -273,17 +304,14 @@ class PillarCache(object):
         self.functions = functions
         self.pillar_override = pillar_override
         self.pillarenv = pillarenv
+        self.extra_minion_data = extra_minion_data
 
         if saltenv is None:
             self.saltenv = 'base'
         else:
             self.saltenv = saltenv
 
-        # Determine caching backend
-        self.cache = salt.utils.cache.CacheFactory.factory(
-                self.opts['pillar_cache_backend'],
-                self.opts['pillar_cache_ttl'],
-                minion_cache_path=self._minion_cache_path(minion_id))
+        self.serial = salt.payload.Serial(self.opts)
 
     def _minion_cache_path(self, minion_id):
         '''
@@ -293,6 +321,138 @@ class PillarCache(object):
         '''
         return os.path.join(self.opts['cachedir'], 'pillar_cache', minion_id)
 
+    def _entry_key(self):
+        '''
+        Return the key of the cached pillar in the entries of the minion
+        '''
+        return '{0}:{1}'.format(self.saltenv, self.pillarenv or '')
+
+    def _roots_revision(self):
+        '''
+        Return the paths, modification times and sizes of the files in the
+        pillar_roots
+        '''
+        ret = []
+        for env, roots in sorted(six.iteritems(self.opts.get('pillar_roots') or {})):
+            for root in roots:
+                for dirpath, dirnames, filenames in salt.utils.path.os_walk(root, followlinks=True):
+                    dirnames.sort()
+                    for name in sorted(filenames):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        ret.append((env, path, stat.st_mtime, stat.st_size))
+        return ret
+
+    def _ext_pillar_revisions(self):
+        '''
+        Return the revisions of the external pillars having a revision
+        function, called with the arguments of the ext_pillar function
+        '''
+        ret = []
+        if not isinstance(self.opts.get('ext_pillar'), list):
+            return ret
+        revisions = salt.loader.pillar_revisions(self.opts)
+        for run in self.opts['ext_pillar']:
+            if not isinstance(run, dict):
+                continue
+            for key, val in six.iteritems(run):
+                if key not in revisions:
+                    continue
+                try:
+                    if isinstance(val, dict):
+                        revision = revisions[key](**val)
+                    elif isinstance(val, list):
+                        revision = revisions[key](*val)
+                    else:
+                        revision = revisions[key](val)
+                except Exception as exc:
+                    log.error(
+                        'Failed to get the revision of external pillar %s: %s',
+                        key, exc, exc_info_on_loglevel=logging.DEBUG
+                    )
+                    # A revision which never matches
+                    revision = salt.utils.hashutils.random_hash()
+                ret.append((key, revision))
+        return ret
+
+    def source_revision(self):
+        '''
+        Return the revision of the pillar_roots and of the external pillars,
+        checked at most every ``pillar_cache_revision_interval`` seconds
+        '''
+        sources = salt.utils.hashutils.data_digest(
+            [self.opts.get('pillar_roots'), self.opts.get('ext_pillar')])
+        now = time.time()
+        checked, revision = _PILLAR_SOURCE_REVISIONS.get(sources, (0, None))
+        if now - checked < self.opts.get('pillar_cache_revision_interval', 5):
+            return revision
+        revision = salt.utils.hashutils.data_digest(
+            [self._roots_revision(), self._ext_pillar_revisions()])
+        _PILLAR_SOURCE_REVISIONS[sources] = (now, revision)
+        return revision
+
+    def fingerprint(self):
+        '''
+        Return the fingerprint of what the pillar of the minion is compiled
+        from
+        '''
+        return salt.utils.hashutils.data_digest([
+            __version__,
+            self.grains,
+            self.saltenv,
+            self.pillarenv,
+            self.ext or {},
+            self.extra_minion_data or {},
+            [self.opts.get(opt) for opt in PILLAR_CACHE_OPTS],
+            self.source_revision()])
+
+    def _read_entries(self):
+        '''
+        Return the cached pillars of the minion
+        '''
+        if self.opts['pillar_cache_backend'] == 'memory':
+            return _PILLAR_MEMORY_CACHE.get(self.minion_id, {})
+        try:
+            with salt.utils.files.fopen(self._minion_cache_path(self.minion_id), 'rb') as fp_:
+                entries = self.serial.load(fp_)
+        except (IOError, OSError):
+            return {}
+        except Exception as exc:
+            log.warning(
+                'Unable to read the pillar cache of minion %s: %s',
+                self.minion_id, exc
+            )
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        # Drop the entries written by older releases
+        return dict((key, entry) for key, entry in six.iteritems(entries)
+                    if isinstance(entry, dict) and 'fingerprint' in entry)
+
+    def _write_entry(self, key, entry):
+        '''
+        Store a cached pillar of the minion
+        '''
+        if self.opts['pillar_cache_backend'] == 'memory':
+            _PILLAR_MEMORY_CACHE.setdefault(self.minion_id, {})[key] = entry
+            return
+        entries = self._read_entries()
+        entries[key] = entry
+        path = self._minion_cache_path(self.minion_id)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                self.serial.dump(entries, fp_)
+        except (IOError, OSError) as exc:
+            log.warning(
+                'Unable to write the pillar cache of minion %s: %s',
+                self.minion_id, exc
+            )
+
     def fetch_pillar(self):
         '''
         In the event of a cache miss, we need to incur the overhead of caching
@@ -306,32 +466,41 @@ class PillarCache(object):
                               ext=self.ext,
                               functions=self.functions,
                               pillar_override=self.pillar_override,
-                              pillarenv=self.pillarenv)
+                              pillarenv=self.pillarenv,
+                              extra_minion_data=self.extra_minion_data)
         return fresh_pillar.compile_pillar()
 
     def compile_pillar(self, *args, **kwargs):  # Will likely just be pillar_dirs
+        if self.pillar_override:
+            # The pillar overrides are not part of the cached pillar
+            log.debug('Pillar cache bypassed for minion %s, pillar_override is set', self.minion_id)
+            return self.fetch_pillar()
         log.debug('Scanning pillar cache for information about minion %s and pillarenv %s', self.minion_id, self.pillarenv)
-        log.debug('Scanning cache: %s', self.cache._dict)
-        # Check the cache!
-        if self.minion_id in self.cache:  # Keyed by minion_id
-            # TODO Compare grains, etc?
-            if self.pillarenv in self.cache[self.minion_id]:
-                # We have a cache hit! Send it back.
-                log.debug('Pillar cache hit for minion %s and pillarenv %s', self.minion_id, self.pillarenv)
-                return self.cache[self.minion_id][self.pillarenv]
-            else:
-                # We found the minion but not the env. Store it.
-                fresh_pillar = self.fetch_pillar()
-                self.cache[self.minion_id][self.pillarenv] = fresh_pillar
-                log.debug('Pillar cache miss for pillarenv %s for minion %s', self.pillarenv, self.minion_id)
-                return fresh_pillar
-        else:
-            # We haven't seen this minion yet in the cache. Store it.
-            fresh_pillar = self.fetch_pillar()
-            self.cache[self.minion_id] = {self.pillarenv: fresh_pillar}
-            log.debug('Pillar cache miss for minion %s', self.minion_id)
-            log.debug('Current pillar cache: %s', self.cache._dict)  # FIXME hack!
-            return fresh_pillar
+        key = self._entry_key()
+        fingerprint = self.fingerprint()
+        entry = self._read_entries().get(key)
+        if entry is not None \
+                and entry['fingerprint'] == fingerprint \
+                and time.time() - entry.get('time', 0) < self.opts['pillar_cache_ttl']:
+            # We have a cache hit! Send it back.
+            log.debug('Pillar cache hit for minion %s and pillarenv %s', self.minion_id, self.pillarenv)
+            return entry['pillar']
+        log.debug('Pillar cache miss for pillarenv %s for minion %s', self.pillarenv, self.minion_id)
+        fresh_pillar = self.fetch_pillar()
+        self.store_pillar(fresh_pillar, fingerprint=fingerprint)
+        return fresh_pillar
+
+    def store_pillar(self, pillar, fingerprint=None):
+        '''
+        Store a pillar compiled for the minion in the cache, the pillars with
+        errors are compiled again on the next request
+        '''
+        if pillar.get('_errors'):
+            return
+        self._write_entry(self._entry_key(),
+                          {'fingerprint': fingerprint or self.fingerprint(),
+                           'time': time.time(),
+                           'pillar': pillar})
 
 
 class Pillar(object):
@@ -380,6 +549,8 @@ class Pillar(object):
             self.merge_strategy = opts['pillar_source_merging_strategy']
 
         self.ext_pillars = salt.loader.pillars(ext_pillar_opts, self.functions)
+        # The time each ext_pillar took to evaluate, in the configured order
+        self.ext_pillar_timing = []
         self.ignored_pillars = {}
         self.pillar_override = pillar_override or {}
         if not isinstance(self.pillar_override, dict):
@@ -924,7 +1095,6 @@ class Pillar(object):
             errors.append('The "ext_pillar" option is malformed')
             log.critical(errors[-1])
             return pillar, errors
-        ext = None
         # Bring in CLI pillar data
         if self.pillar_override:
             pillar = merge(
@@ -934,6 +1104,7 @@ class Pillar(object):
                 self.opts.get('renderer', 'yaml'),
                 self.opts.get('pillar_merge_lists', False))
 
+        sources = []
         for run in self.opts['ext_pillar']:
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
@@ -948,30 +1119,95 @@ class Pillar(object):
                         key
                     )
                     continue
+                sources.append((key, val))
+
+        # Group the sources evaluated together, the ones listed in
+        # ext_pillar_serial are evaluated alone with the pillar merged so far
+        concurrency = self.opts.get('ext_pillar_concurrency', 0)
+        serial = self.opts.get('ext_pillar_serial') or []
+        batches = []
+        for key, val in sources:
+            concurrent = concurrency > 1 and key not in serial
+            if concurrent and batches and batches[-1][0]:
+                batches[-1][1].append((key, val))
+            else:
+                batches.append((concurrent, [(key, val)]))
+
+        for concurrent, batch in batches:
+            if concurrent and len(batch) > 1:
+                results = self._call_ext_pillars(pillar, batch, concurrency)
+            else:
+                results = [self._call_ext_pillar(pillar, val, key)
+                           for key, val in batch]
+            # Merge in the configured order whatever order they returned in
+            for (key, _), (ext, error, duration) in zip(batch, results):
+                self.ext_pillar_timing.append((key, duration))
+                log.debug('ext_pillar %s took %.3f seconds', key, duration)
+                if error:
+                    errors.append(error)
+                if ext:
+                    pillar = merge(
+                        pillar,
+                        ext,
+                        self.merge_strategy,
+                        self.opts.get('renderer', 'yaml'),
+                        self.opts.get('pillar_merge_lists', False))
+        return pillar, errors
+
+    def _call_ext_pillar(self, pillar, val, key):
+        '''
+        Call an external pillar, return its data, the error it raised and the
+        time it took
+        '''
+        start = time.time()
+        ext = error = None
+        try:
+            ext = self._external_pillar_data(pillar,
+                                             val,
+                                             key)
+        except Exception as exc:
+            error = 'Failed to load ext_pillar {0}: {1}'.format(
+                key,
+                exc.__str__(),
+            )
+            log.error(
+                'Exception caught loading ext_pillar \'%s\':\n%s',
+                key, ''.join(traceback.format_tb(sys.exc_info()[2]))
+            )
+        return ext, error, time.time() - start
+
+    def _call_ext_pillars(self, pillar, sources, concurrency):
+        '''
+        Call external pillars on a pool of threads, all with the same pillar,
+        and return their results in the order of the sources. The sources
+        still running after their ext_pillar_timeout are given up on.
+        '''
+        timeouts = self.opts.get('ext_pillar_timeout')
+        pool = ThreadPool(min(concurrency, len(sources)))
+        try:
+            start = time.time()
+            calls = [pool.apply_async(self._call_ext_pillar, (pillar, val, key))
+                     for key, val in sources]
+            ret = []
+            for (key, _), call in zip(sources, calls):
+                timeout = timeouts.get(key) if isinstance(timeouts, dict) else timeouts
                 try:
-                    ext = self._external_pillar_data(pillar,
-                                                     val,
-                                                     key)
-                except Exception as exc:
-                    errors.append(
-                        'Failed to load ext_pillar {0}: {1}'.format(
-                            key,
-                            exc.__str__(),
-                        )
-                    )
+                    if timeout:
+                        ret.append(call.get(max(0, start + timeout - time.time())))
+                    else:
+                        ret.append(call.get())
+                except multiprocessing.TimeoutError:
                     log.error(
-                        'Exception caught loading ext_pillar \'%s\':\n%s',
-                        key, ''.join(traceback.format_tb(sys.exc_info()[2]))
+                        'ext_pillar %s did not return within %s seconds',
+                        key, timeout
                     )
-            if ext:
-                pillar = merge(
-                    pillar,
-                    ext,
-                    self.merge_strategy,
-                    self.opts.get('renderer', 'yaml'),
-                    self.opts.get('pillar_merge_lists', False))
-                ext = None
-        return pillar, errors
+                    ret.append((None,
+                                'ext_pillar {0} timed out after {1} seconds'.format(key, timeout),
+                                time.time() - start))
+        finally:
+            # The threads of the sources timed out exit once they return
+            pool.close()
+        return ret
 
     def compile_pillar(self, ext=True):
         '''
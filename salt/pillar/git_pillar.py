@@ -333,10 +333,14 @@ from __future__ import absolute_import, print_function, unicode_literals
 # Import python libs
 import copy
 import logging
+import os
 
 # Import salt libs
 import salt.utils.gitfs
 import salt.utils.dictupdate
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.path
 import salt.utils.stringutils
 import salt.utils.versions
 from salt.exceptions import FileserverConfigError
@@ -455,6 +459,47 @@ def ext_pillar(minion_id, pillar, *repos):  # pylint: disable=unused-argument
     return ret
 
 
+def revision(*repos):
+    '''
+    Return the revision of the git_pillar remotes, used by the master's
+    :conf_master:`pillar_cache` to invalidate the cached pillars. It changes
+    when the refs of a remote change after a fetch.
+    '''
+    opts = copy.deepcopy(__opts__)
+    opts['pillar_roots'] = {}
+    opts['__git_pillar'] = True
+    git_pillar = salt.utils.gitfs.GitPillar(
+        opts,
+        repos,
+        per_remote_overrides=PER_REMOTE_OVERRIDES,
+        per_remote_only=PER_REMOTE_ONLY,
+        global_only=GLOBAL_ONLY)
+    ret = []
+    for repo in git_pillar.remotes:
+        refs = []
+        for name in ('HEAD', 'FETCH_HEAD', 'packed-refs'):
+            refs.append(_read_ref(os.path.join(repo.gitdir, name)))
+        refs_dir = os.path.join(repo.gitdir, 'refs')
+        for root, dirs, files in salt.utils.path.os_walk(refs_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                refs.append((os.path.relpath(path, refs_dir), _read_ref(path)))
+        ret.append([repo.id, refs])
+    return salt.utils.hashutils.data_digest(ret)
+
+
+def _read_ref(path):
+    '''
+    Return the contents of a ref file, or None if it does not exist
+    '''
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            return fp_.read()
+    except (IOError, OSError):
+        return None
+
+
 def _extract_key_val(kv, delimiter='='):
     '''Extract key and value from key=val string.
 
@@ -11,8 +11,9 @@ import glob
 import logging
 import os
 import shutil
+import heapq
+import itertools
 import time
-import bisect
 
 # Import salt libs
 import salt.payload
@@ -81,6 +82,36 @@ def _walk_through(job_dir):
                 yield jid, job, t_path, final
 
 
+def _walk_jids(job_dir):
+    '''
+    Walk though the jid dir and yield the jid and the directory of every job.
+    Only the small jid file of each job is read, the load is only read for
+    jobs which have none.
+    '''
+    if not os.path.isdir(job_dir):
+        return
+    serial = salt.payload.Serial(__opts__)
+
+    for top in os.listdir(job_dir):
+        t_path = os.path.join(job_dir, top)
+
+        if not os.path.isdir(t_path):
+            continue
+
+        for final in os.listdir(t_path):
+            f_path = os.path.join(t_path, final)
+            try:
+                with salt.utils.files.fopen(os.path.join(f_path, 'jid'), 'rb') as rfh:
+                    jid = salt.utils.stringutils.to_unicode(rfh.read())
+            except (IOError, OSError):
+                try:
+                    with salt.utils.files.fopen(os.path.join(f_path, LOAD_P), 'rb') as rfh:
+                        jid = serial.load(rfh)['jid']
+                except Exception:
+                    continue
+            yield jid, f_path
+
+
 #TODO: add to returner docs-- this is a new one
 def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
     '''
@@ -384,26 +415,61 @@ def get_jids():
     return ret
 
 
+def iter_jids(cursor=None, filter_find_job=False, batch_size=100):
+    '''
+    Yield the jid and load of the cached jobs, newest first.
+
+    Every page of jobs is picked from one walk through the job cache which
+    keeps only the newest jids older than the cursor, so memory does not grow
+    with the size of the job cache. The pages double in size, reading many
+    pages takes a logarithmic number of walks.
+
+    :param str cursor: only yield the jobs older than this jid, pass the last
+        jid of a page to get the next one
+    :param bool filter_find_job: skip 'saltutil.find_job' jobs
+    :param int batch_size: the number of jobs picked from the first walk
+        through the job cache
+
+    .. versionadded:: Fluorine
+    '''
+    serial = salt.payload.Serial(__opts__)
+    job_dir = _job_dir()
+    batch_size = max(batch_size, 1)
+    while True:
+        batch = heapq.nlargest(
+            batch_size,
+            (job for job in _walk_jids(job_dir) if cursor is None or job[0] < cursor)
+        )
+        for jid, jid_dir in batch:
+            try:
+                with salt.utils.files.fopen(os.path.join(jid_dir, LOAD_P), 'rb') as rfh:
+                    job = serial.load(rfh)
+            except (IOError, OSError):
+                continue
+            except Exception:
+                log.exception('Failed to deserialize %s', os.path.join(jid_dir, LOAD_P))
+                continue
+            if filter_find_job and job.get('fun') == 'saltutil.find_job':
+                continue
+            yield jid, job
+        if len(batch) < batch_size:
+            return
+        cursor = batch[-1][0]
+        batch_size *= 2
+
+
 def get_jids_filter(count, filter_find_job=True):
     '''
     Return a list of all jobs information filtered by the given criteria.
     :param int count: show not more than the count of most recent jobs
     :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
     '''
-    keys = []
-    ret = []
-    for jid, job, _, _ in _walk_through(_job_dir()):
-        job = salt.utils.jid.format_jid_instance_ext(jid, job)
-        if filter_find_job and job['Function'] == 'saltutil.find_job':
-            continue
-        i = bisect.bisect(keys, jid)
-        if len(keys) == count and i == 0:
-            continue
-        keys.insert(i, jid)
-        ret.insert(i, job)
-        if len(keys) > count:
-            del keys[0]
-            del ret[0]
+    ret = [salt.utils.jid.format_jid_instance_ext(jid, job)
+           for jid, job in itertools.islice(
+               iter_jids(filter_find_job=filter_find_job,
+                         batch_size=max(count, 1)),
+               count)]
+    ret.reverse()
     return ret
 
 
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+'''
+Use an embedded SQLite database for the master job cache.
+
+The default :mod:`local_cache <salt.returners.local_cache>` stores every job as
+a tree of small files, listing or expiring jobs means walking that whole tree.
+This job cache keeps the same data in a single SQLite database indexed by jid,
+minion, function and start time, so looking up a job or the most recent jobs
+does not depend on how many jobs are cached and old jobs are expired with one
+range delete.
+
+The database runs in write-ahead-log mode, every MWorker keeps its connection
+open and the writes of concurrent MWorkers are committed in groups to the log.
+
+.. versionadded:: Fluorine
+
+:depends: sqlite3 (part of the Python standard library)
+:platform: all
+
+To use it set the following in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: sqlite3_local_cache
+
+The database is created in the master cachedir as ``jobs.sqlite3``, the path
+and the time in seconds a writer waits for the database lock can be changed:
+
+.. code-block:: yaml
+
+    master_job_cache.sqlite3.database: /var/cache/salt/master/jobs.sqlite3
+    master_job_cache.sqlite3.timeout: 30
+
+Jobs are removed after :conf_master:`keep_jobs` hours like with the
+local_cache. The thorium register is kept in the same database when
+``register_returner`` is set to ``sqlite3_local_cache``.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import logging
+import os
+import time
+
+# Import salt libs
+import salt.exceptions
+import salt.payload
+import salt.utils.jid
+import salt.utils.minions
+
+# Import 3rd-party libs
+from salt.ext import six
+
+# Better safe than sorry here. Even though sqlite3 is included in python
+try:
+    import sqlite3
+    HAS_SQLITE3 = True
+except ImportError:
+    HAS_SQLITE3 = False
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = 'sqlite3_local_cache'
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS jids (
+        jid TEXT PRIMARY KEY,
+        started REAL NOT NULL,
+        fun TEXT,
+        nocache INTEGER NOT NULL DEFAULT 0,
+        load BLOB,
+        endtime TEXT
+    )''',
+    'CREATE INDEX IF NOT EXISTS jids_started ON jids (started)',
+    'CREATE INDEX IF NOT EXISTS jids_fun ON jids (fun, jid)',
+    '''CREATE TABLE IF NOT EXISTS minions (
+        jid TEXT NOT NULL,
+        syndic_id TEXT NOT NULL,
+        minions BLOB NOT NULL,
+        PRIMARY KEY (jid, syndic_id)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS returns (
+        jid TEXT NOT NULL,
+        id TEXT NOT NULL,
+        ret BLOB NOT NULL,
+        out BLOB,
+        PRIMARY KEY (jid, id)
+    )''',
+    'CREATE INDEX IF NOT EXISTS returns_id ON returns (id, jid)',
+    '''CREATE TABLE IF NOT EXISTS register (
+        name TEXT PRIMARY KEY,
+        data BLOB NOT NULL
+    )''',
+)
+
+# The connection of this process, a forked MWorker must not reuse the
+# connection of its parent
+_CONN = {}
+
+
+def __virtual__():
+    if not HAS_SQLITE3:
+        return (False, 'Could not import sqlite3; sqlite3_local_cache disabled')
+    return __virtualname__
+
+
+def _get_conn():
+    '''
+    Return the sqlite3 connection of this process, creating the database when
+    it does not exist yet
+    '''
+    pid = os.getpid()
+    database = __opts__.get(
+        'master_job_cache.sqlite3.database',
+        os.path.join(__opts__['cachedir'], 'jobs.sqlite3')
+    )
+    if _CONN.get('pid') == pid and _CONN.get('database') == database:
+        return _CONN['conn']
+    timeout = float(__opts__.get('master_job_cache.sqlite3.timeout', 30))
+    log.debug('Connecting the sqlite3 job cache: %s', database)
+    conn = sqlite3.connect(database, timeout=timeout)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # In WAL mode the database can not be corrupted by a crash with this
+    # setting, the last transactions may only be rolled back
+    conn.execute('PRAGMA synchronous=NORMAL')
+    with conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    _CONN.clear()
+    _CONN.update({'pid': pid, 'conn': conn, 'database': database})
+    return conn
+
+
+def _dumps(data):
+    return sqlite3.Binary(salt.payload.Serial(__opts__).dumps(data))
+
+
+def _loads(data):
+    return salt.payload.Serial(__opts__).loads(bytes(data))
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    '''
+    Return a job id and record it in the job cache
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    '''
+    if recurse_count >= 5:
+        err = 'prep_jid could not store a jid after {0} tries.'.format(recurse_count)
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    conn = _get_conn()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO jids (jid, started, nocache) VALUES (?, ?, ?)',
+                (jid, time.time(), int(bool(nocache)))
+            )
+    except sqlite3.IntegrityError:
+        if passed_jid is None:
+            # Someone else is using this jid, get a new one
+            return prep_jid(nocache=nocache, recurse_count=recurse_count+1)
+        if nocache:
+            with conn:
+                conn.execute('UPDATE jids SET nocache = 1 WHERE jid = ?', (jid,))
+    except sqlite3.OperationalError as exc:
+        log.warning('Could not store jid %s: %s. Retrying.', jid, exc)
+        time.sleep(0.1)
+        return prep_jid(passed_jid=jid, nocache=nocache,
+                        recurse_count=recurse_count+1)
+    return jid
+
+
+def returner(load):
+    '''
+    Return data to the job cache
+    '''
+    # if a minion is returning a standalone job, get a jobid
+    if load['jid'] == 'req':
+        load['jid'] = prep_jid(nocache=load.get('nocache', False))
+
+    conn = _get_conn()
+    row = conn.execute(
+        'SELECT nocache FROM jids WHERE jid = ?', (load['jid'],)
+    ).fetchone()
+    if row is None:
+        log.error(
+            'An inconsistency occurred, a job was received with a job id '
+            '(%s) that is not present in the local cache', load['jid']
+        )
+        return False
+    if row[0]:
+        return
+
+    ret = dict((key, load[key]) for key in ['return', 'retcode', 'success'] if key in load)
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO returns (jid, id, ret, out) VALUES (?, ?, ?, ?)',
+                (load['jid'],
+                 load['id'],
+                 _dumps(ret),
+                 _dumps(load['out']) if 'out' in load else None)
+            )
+    except sqlite3.IntegrityError:
+        # Minion has already returned this jid and it should be dropped
+        log.error(
+            'An extra return was detected from minion %s, please verify '
+            'the minion, this could be a replay attack', load['id']
+        )
+        return False
+
+
+def save_load(jid, clear_load, minions=None):
+    '''
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    '''
+    conn = _get_conn()
+    load = _dumps(clear_load)
+    with conn:
+        cur = conn.execute(
+            'UPDATE jids SET load = ?, fun = ? WHERE jid = ?',
+            (load, clear_load.get('fun'), jid)
+        )
+        if not cur.rowcount:
+            conn.execute(
+                'INSERT INTO jids (jid, started, fun, load) VALUES (?, ?, ?, ?)',
+                (jid, time.time(), clear_load.get('fun'), load)
+            )
+
+    # if you have a tgt, save that for the UI etc
+    if 'tgt' in clear_load and clear_load['tgt'] != '':
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                    clear_load['tgt'],
+                    clear_load.get('tgt_type', 'glob')
+                    )
+            minions = _res['minions']
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    '''
+    Save/update the list of minions for a given job
+    '''
+    # Ensure we have a list for Python 3 compatability
+    minions = list(minions)
+
+    log.debug(
+        'Adding minions for job %s%s: %s',
+        jid,
+        ' from syndic master \'{0}\''.format(syndic_id) if syndic_id else '',
+        minions
+    )
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO minions (jid, syndic_id, minions) VALUES (?, ?, ?)',
+            (jid, syndic_id or '', _dumps(minions))
+        )
+
+
+def get_load(jid):
+    '''
+    Return the load data that marks a specified jid
+    '''
+    conn = _get_conn()
+    row = conn.execute('SELECT load FROM jids WHERE jid = ?', (jid,)).fetchone()
+    if row is None or row[0] is None:
+        return {}
+    ret = _loads(row[0]) or {}
+    all_minions = set()
+    for minions, in conn.execute('SELECT minions FROM minions WHERE jid = ?', (jid,)):
+        all_minions.update(_loads(minions))
+    if all_minions:
+        ret['Minions'] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    '''
+    Return the information returned when the specified job id was executed
+    '''
+    conn = _get_conn()
+    ret = {}
+    for minion, ret_data, out in conn.execute(
+            'SELECT id, ret, out FROM returns WHERE jid = ?', (jid,)):
+        ret[minion] = _loads(ret_data)
+        if out is not None:
+            ret[minion]['out'] = _loads(out)
+    return ret
+
+
+def get_jids():
+    '''
+    Return a dict mapping all job ids to job information
+    '''
+    conn = _get_conn()
+    ret = {}
+    for jid, load, endtime in conn.execute(
+            'SELECT jid, load, endtime FROM jids WHERE load IS NOT NULL'):
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, _loads(load))
+        if __opts__.get('job_cache_store_endtime') and endtime:
+            ret[jid]['EndTime'] = endtime
+    return ret
+
+
+def iter_jids(cursor=None, filter_find_job=False, batch_size=100):
+    '''
+    Yield the jid and load of the cached jobs, newest first.
+
+    :param str cursor: only yield the jobs older than this jid, pass the last
+        jid of a page to get the next one
+    :param bool filter_find_job: skip 'saltutil.find_job' jobs
+    :param int batch_size: the number of jobs read from the database at once
+    '''
+    sql = 'SELECT jid, load FROM jids WHERE load IS NOT NULL'
+    if filter_find_job:
+        sql += ' AND fun IS NOT \'saltutil.find_job\''
+    sql += ' AND jid < ? ORDER BY jid DESC LIMIT ?'
+    while True:
+        # Jids are digits, anything sorts after them
+        rows = _get_conn().execute(sql, (cursor or '~', batch_size)).fetchall()
+        for jid, load in rows:
+            yield jid, _loads(load)
+        if len(rows) < batch_size:
+            return
+        cursor = rows[-1][0]
+
+
+def get_jids_filter(count, filter_find_job=True):
+    '''
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    '''
+    sql = 'SELECT jid, load FROM jids WHERE load IS NOT NULL'
+    if filter_find_job:
+        sql += ' AND fun IS NOT \'saltutil.find_job\''
+    sql += ' ORDER BY jid DESC LIMIT ?'
+    rows = _get_conn().execute(sql, (count,)).fetchall()
+    return [salt.utils.jid.format_jid_instance_ext(jid, _loads(load))
+            for jid, load in reversed(rows)]
+
+
+def clean_old_jobs():
+    '''
+    Clean out the old jobs from the job cache
+    '''
+    if __opts__['keep_jobs'] != 0:
+        cutoff = time.time() - __opts__['keep_jobs'] * 3600
+        conn = _get_conn()
+        with conn:
+            old = 'SELECT jid FROM jids WHERE started < ?'
+            conn.execute('DELETE FROM returns WHERE jid IN ({0})'.format(old), (cutoff,))
+            conn.execute('DELETE FROM minions WHERE jid IN ({0})'.format(old), (cutoff,))
+            conn.execute('DELETE FROM jids WHERE started < ?', (cutoff,))
+
+
+def update_endtime(jid, time):
+    '''
+    Update (or store) the end time for a given job
+    '''
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            'UPDATE jids SET endtime = ? WHERE jid = ?',
+            (six.text_type(time), jid)
+        )
+
+
+def get_endtime(jid):
+    '''
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    '''
+    row = _get_conn().execute(
+        'SELECT endtime FROM jids WHERE jid = ?', (jid,)
+    ).fetchone()
+    if row is None or not row[0]:
+        return False
+    return row[0]
+
+
+def save_reg(data):
+    '''
+    Save the thorium register
+    '''
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO register (name, data) VALUES (?, ?)',
+            ('register', _dumps(data))
+        )
+
+
+def load_reg():
+    '''
+    Load the thorium register, an empty dict if none was saved
+    '''
+    row = _get_conn().execute(
+        'SELECT data FROM register WHERE name = ?', ('register',)
+    ).fetchone()
+    if row is None:
+        return {}
+    return _loads(row[0])
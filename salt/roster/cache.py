@@ -127,6 +127,11 @@ def targets(tgt, tgt_type='glob', **kwargs):  # pylint: disable=W0613
     # log.debug(minions)
 
     cache = salt.cache.Cache(__opts__)
+    if __opts__.get('minion_data_cache', False):
+        cached_data = salt.utils.minions.fetch_minions_cache(cache, minions)
+    else:
+        cached_data = {}
+    cached_mine = salt.utils.minions.fetch_minions_cache(cache, minions, 'mine')
 
     roster_order = __opts__.get('roster_order', {
         'host': ('ipv6-private', 'ipv6-global', 'ipv4-private', 'ipv4-public')
@@ -134,10 +139,9 @@ def targets(tgt, tgt_type='glob', **kwargs):  # pylint: disable=W0613
 
     ret = {}
     for minion_id in minions:
-        try:
-            minion = _load_minion(minion_id, cache)
-        except LookupError:
-            continue
+        minion = _load_minion(minion_id,
+                              cached_data.get(minion_id),
+                              cached_mine.get(minion_id))
 
         minion_res = copy.deepcopy(__opts__.get('roster_defaults', {}))
         for param, order in roster_order.items():
@@ -159,12 +163,11 @@ def targets(tgt, tgt_type='glob', **kwargs):  # pylint: disable=W0613
     return ret
 
 
-def _load_minion(minion_id, cache):
-    data_minion, grains, pillar = salt.utils.minions.get_minion_data(minion_id, __opts__)
-
-    if minion_id != data_minion:
-        log.error('Asked for minion %s, got %s', minion_id, data_minion)
-        raise LookupError
+def _load_minion(minion_id, mdata, mine):
+    if not isinstance(mdata, dict):
+        mdata = {}
+    grains = mdata.get('grains')
+    pillar = mdata.get('pillar')
 
     if not grains:
         log.warning('No grain data for minion id %s', minion_id)
@@ -179,8 +182,6 @@ def _load_minion(minion_id, cache):
         6: sorted([ipaddress.IPv6Address(addr) for addr in grains.get('ipv6', [])])
     }
 
-    mine = cache.fetch('minions/{0}'.format(minion_id), 'mine')
-
     return grains, pillar, addrs, mine
 
 
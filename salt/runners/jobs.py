@@ -216,13 +216,34 @@ def list_jobs(ext_source=None,
               search_target=None,
               start_time=None,
               end_time=None,
-              display_progress=False):
+              display_progress=False,
+              limit=None,
+              cursor=None):
     '''
     List all detectable jobs and associated functions
 
     ext_source
         If provided, specifies which external job cache to use.
 
+    limit
+        .. versionadded:: Fluorine
+
+        Return at most this many jobs, the most recent jobs which match the
+        filters are returned. The job cache is read newest first and only
+        until enough jobs matched, with the ``local_cache`` and
+        ``sqlite3_local_cache`` job caches the jobs are not all loaded.
+
+    cursor
+        .. versionadded:: Fluorine
+
+        Only list the jobs older than this jid. To page through the job cache
+        pass the oldest jid of the previous page. Example:
+
+        .. code-block:: bash
+
+            salt-run jobs.list_jobs limit=100
+            salt-run jobs.list_jobs limit=100 cursor=20181016102312345678
+
     **FILTER OPTIONS**
 
     .. note::
@@ -305,26 +326,31 @@ def list_jobs(ext_source=None,
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners['{0}.get_jids'.format(returner)]()
+    if limit is None and cursor is None:
+        ret = mminion.returners['{0}.get_jids'.format(returner)]()
+        jobs = six.iteritems(ret)
+    else:
+        limit = int(limit) if limit is not None else None
+        jobs = _iter_jobs(mminion, returner, cursor and six.text_type(cursor))
 
     mret = {}
-    for item in ret:
+    for item, job in jobs:
         _match = True
         if search_metadata:
             _match = False
-            if 'Metadata' in ret[item]:
+            if 'Metadata' in job:
                 if isinstance(search_metadata, dict):
                     for key in search_metadata:
-                        if key in ret[item]['Metadata']:
-                            if ret[item]['Metadata'][key] == search_metadata[key]:
+                        if key in job['Metadata']:
+                            if job['Metadata'][key] == search_metadata[key]:
                                 _match = True
                 else:
                     log.info('The search_metadata parameter must be specified'
                              ' as a dictionary.  Ignoring.')
         if search_target and _match:
             _match = False
-            if 'Target' in ret[item]:
-                targets = ret[item]['Target']
+            if 'Target' in job:
+                targets = job['Target']
                 if isinstance(targets, six.string_types):
                     targets = [targets]
                 for target in targets:
@@ -334,16 +360,16 @@ def list_jobs(ext_source=None,
 
         if search_function and _match:
             _match = False
-            if 'Function' in ret[item]:
+            if 'Function' in job:
                 for key in salt.utils.args.split_input(search_function):
-                    if fnmatch.fnmatch(ret[item]['Function'], key):
+                    if fnmatch.fnmatch(job['Function'], key):
                         _match = True
 
         if start_time and _match:
             _match = False
             if DATEUTIL_SUPPORT:
                 parsed_start_time = dateutil_parser.parse(start_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
+                _start_time = dateutil_parser.parse(job['StartTime'])
                 if _start_time >= parsed_start_time:
                     _match = True
             else:
@@ -356,7 +382,7 @@ def list_jobs(ext_source=None,
             _match = False
             if DATEUTIL_SUPPORT:
                 parsed_end_time = dateutil_parser.parse(end_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
+                _start_time = dateutil_parser.parse(job['StartTime'])
                 if _start_time <= parsed_end_time:
                     _match = True
             else:
@@ -366,7 +392,9 @@ def list_jobs(ext_source=None,
                 )
 
         if _match:
-            mret[item] = ret[item]
+            mret[item] = job
+            if limit and len(mret) >= limit:
+                break
 
     if outputter:
         return {'outputter': outputter, 'data': mret}
@@ -534,6 +562,31 @@ def last_run(ext_source=None,
         return False
 
 
+def _iter_jobs(mminion, returner, cursor=None):
+    '''
+    Helper to yield the jid and job information of the cached jobs older than
+    the jid cursor, newest first
+    '''
+    fun = '{0}.iter_jids'.format(returner)
+    if fun not in mminion.returners:
+        # The returner can only return all jobs at once
+        ret = mminion.returners['{0}.get_jids'.format(returner)]()
+        for jid in sorted(ret, reverse=True):
+            if cursor is None or jid < cursor:
+                yield jid, ret[jid]
+        return
+    get_endtime = None
+    if __opts__.get('job_cache_store_endtime'):
+        get_endtime = mminion.returners.get('{0}.get_endtime'.format(returner))
+    for jid, load in mminion.returners[fun](cursor=cursor):
+        job = salt.utils.jid.format_jid_instance(jid, load)
+        if get_endtime is not None:
+            endtime = get_endtime(jid)
+            if endtime:
+                job['EndTime'] = endtime
+        yield jid, job
+
+
 def _get_returner(returner_types):
     '''
     Helper to iterate over returner_types and pick the first one
@@ -6,6 +6,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 # Import salt libs
 import salt.pillar
+import salt.utils.master
 import salt.utils.minions
 
 
@@ -106,3 +107,38 @@ def show_pillar(minion='*', **kwargs):
 
     compiled_pillar = pillar.compile_pillar()
     return compiled_pillar
+
+
+def compile_bulk(tgt='*', tgt_type='glob', saltenv=None, pillarenv=None,
+                 processes=None):
+    '''
+    Compile the pillar of the targeted minions from their cached grains and
+    store it in the minion data cache, and in the pillar cache if
+    :conf_master:`pillar_cache` is enabled. Use it to prewarm the caches or to
+    check the pillar of the whole fleet for errors.
+
+    The pillar top file is rendered once for all the minions, and the pillar
+    SLS files once per group of minions matching the same SLS files, as long
+    as the SLS files do not use the grains, the pillar, the options or the
+    execution functions. The minions are compiled on ``processes`` processes,
+    one per CPU by default.
+
+    Returns the number of minions compiled, the minions without cached
+    grains, the number of groups of minions and of SLS renderings, and the
+    pillar errors by minion.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run pillar.compile_bulk
+        salt-run pillar.compile_bulk 'web*' processes=8
+        salt-run pillar.compile_bulk 'G@os:Ubuntu' tgt_type=compound pillarenv=dev
+    '''
+    pillar_util = salt.utils.master.MasterPillarUtil(tgt, tgt_type,
+                                                     saltenv=saltenv,
+                                                     use_cached_grains=True,
+                                                     grains_fallback=False,
+                                                     opts=__opts__)
+    return pillar_util.compile_minion_pillars(pillarenv=pillarenv,
+                                              processes=processes)
@@ -24,24 +24,32 @@ import datetime
 import traceback
 import re
 import time
+import heapq
 import random
+import multiprocessing
 
 # Import salt libs
 import salt.loader
 import salt.minion
 import salt.pillar
 import salt.fileclient
+import salt.serializers.msgpack
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.decorators.state
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.immutabletypes as immutabletypes
+import salt.utils.jinja
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.stringutils
 import salt.utils.url
+import salt.version
 import salt.syspaths as syspaths
 from salt.serializers.msgpack import serialize as msgpack_serialize, deserialize as msgpack_deserialize
 from salt.template import compile_template, compile_template_str
@@ -57,7 +65,7 @@ import salt.utils.yamlloader as yamlloader
 import msgpack
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
 from salt.ext import six
-from salt.ext.six.moves import map, range, reload_module
+from salt.ext.six.moves import map, range, reload_module, queue
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 
 log = logging.getLogger(__name__)
@@ -279,6 +287,236 @@ def find_sls_ids(sls, high):
     return ret
 
 
+def _is_glob(pattern):
+    '''
+    Return True if the pattern uses the fnmatch wildcards
+    '''
+    return '*' in pattern or '?' in pattern or '[' in pattern
+
+
+class RequisiteIndex(object):
+    '''
+    Index of a list of low chunks by ``__id__``, ``name`` and ``__sls__``,
+    used to resolve the requisites referencing the chunks without matching
+    every requisite against every chunk.
+
+    The chunks matching a requisite are returned in the order of the list,
+    exactly as the fnmatch based scan does. Requisites using wildcards are
+    still resolved with that scan.
+    '''
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.size = len(chunks)
+        self.position = {}
+        self.by_id = {}
+        self.by_name = {}
+        self.by_sls = {}
+        for pos, chunk in enumerate(chunks):
+            self.position[id(chunk)] = pos
+            for index, field in ((self.by_id, '__id__'),
+                                 (self.by_name, 'name'),
+                                 (self.by_sls, '__sls__')):
+                try:
+                    index.setdefault(self._key(chunk[field]), []).append(chunk)
+                except (KeyError, TypeError):
+                    # Missing or unhashable, only the scan can match it
+                    pass
+
+    @staticmethod
+    def _key(value):
+        # fnmatch.fnmatch normalizes the case on case insensitive platforms
+        if isinstance(value, six.string_types):
+            return os.path.normcase(value)
+        return value
+
+    def covers(self, chunks):
+        '''
+        Return True if the index was built for this list of chunks
+        '''
+        return chunks is self.chunks and len(chunks) == self.size
+
+    def scan(self, req_key, req_val):
+        '''
+        Match the requisite against every chunk
+        '''
+        ret = []
+        for chunk in self.chunks:
+            if req_key == 'sls':
+                if fnmatch.fnmatch(chunk['__sls__'], req_val):
+                    ret.append(chunk)
+            elif fnmatch.fnmatch(chunk['name'], req_val) \
+                    or fnmatch.fnmatch(chunk['__id__'], req_val):
+                if req_key == 'id' or chunk['state'] == req_key:
+                    ret.append(chunk)
+        return ret
+
+    def match(self, req_key, req_val):
+        '''
+        Return the chunks matching the requisite ``{req_key: req_val}``, i.e.
+        ``{'sls': 'apache'}``, ``{'id': 'vim'}`` or ``{'pkg': 'vim'}``
+        '''
+        if not isinstance(req_val, six.string_types) or _is_glob(req_val):
+            return self.scan(req_key, req_val)
+        key = self._key(req_val)
+        if req_key == 'sls':
+            return list(self.by_sls.get(key, ()))
+        by_name = self.by_name.get(key, ())
+        by_id = self.by_id.get(key, ())
+        if not by_id:
+            ret = list(by_name)
+        elif not by_name:
+            ret = list(by_id)
+        else:
+            # A chunk can match by both its name and its id
+            ret = list(dict((id(chunk), chunk) for chunk in by_name + by_id).values())
+            ret.sort(key=lambda chunk: self.position[id(chunk)])
+        if req_key != 'id':
+            ret = [chunk for chunk in ret if chunk['state'] == req_key]
+        return ret
+
+
+class HighIndex(object):
+    '''
+    Index of the high data used by requisite_in to look the referenced states
+    up, it answers the same questions as find_name and find_sls_ids.
+    '''
+    def __init__(self, high):
+        self.high = high
+        # {sls: [(id, state), ...]}
+        self.sls_ids = {}
+        # {sls: [(id, first state), ...]}
+        self.sls_first = {}
+        # {(state, arg value): [id, ...]}
+        self.args = {}
+        # {name: {state: id}}, the first state declaring the name
+        self.names = {}
+        for nid, item in six.iteritems(high):
+            if not isinstance(item, dict):
+                continue
+            sls = item.get('__sls__')
+            for st_, args in six.iteritems(item):
+                if st_.startswith('__'):
+                    continue
+                try:
+                    self.sls_ids.setdefault(sls, []).append((nid, st_))
+                except TypeError:
+                    pass
+                if not isinstance(args, list):
+                    continue
+                for arg in args:
+                    if not isinstance(arg, dict):
+                        continue
+                    try:
+                        if 'name' in arg:
+                            self.names.setdefault(arg['name'], {st_: nid})
+                        if len(arg) == 1:
+                            self.args.setdefault((st_, next(six.itervalues(arg))), []).append(nid)
+                    except TypeError:
+                        # Unhashable argument values can't be referenced
+                        pass
+            try:
+                self.sls_first.setdefault(sls, []).append((nid, next(iter(item))))
+            except (TypeError, StopIteration):
+                pass
+
+    def find_name(self, name, state):
+        '''
+        Same as :py:func:`find_name` for the indexed high data
+        '''
+        if name in self.high:
+            return [(name, state)]
+        if state == 'sls':
+            return list(self.sls_first.get(name, ()))
+        return [(nid, state) for nid in self.args.get((state, name), ())]
+
+    def find_sls_ids(self, sls):
+        '''
+        Same as :py:func:`find_sls_ids` for the indexed high data
+        '''
+        return list(self.sls_ids.get(sls, ()))
+
+
+# The requisites a chunk has to wait for when the chunks are run by the
+# state workers, the prereqs are resolved by call_chunk itself
+ORDERING_REQUISITES = (
+    'require',
+    'require_any',
+    'watch',
+    'watch_any',
+    'onfail',
+    'onfail_any',
+    'onchanges',
+    'onchanges_any',
+    'prerequired',
+)
+
+# The State the state worker processes were forked from
+_STATE_WORKER = None
+
+
+def _init_state_worker(state):
+    '''
+    Initialize a state worker process, the State is inherited from the forked
+    process and never serialized
+    '''
+    global _STATE_WORKER
+    state._worker = True
+    _STATE_WORKER = state
+
+
+def _call_state_worker(low, status, reqs, running):
+    '''
+    Run a low chunk whose requisites are met in a state worker process
+    '''
+    return _STATE_WORKER.call_ready(
+        low, status, reqs, _STATE_WORKER._req_index.chunks, running)
+
+
+def state_workers(opts):
+    '''
+    Return the number of state workers to run the chunks on, 0 if they run
+    in turn in the current process
+    '''
+    workers = opts.get('state_workers') or 0
+    # Daemonic processes, like the state workers, can't fork a pool
+    if workers < 2 or salt.utils.platform.is_windows() \
+            or multiprocessing.current_process().daemon:
+        return 0
+    return workers
+
+
+# The renderers whose output only depends on the files rendered, the grains
+# and the pillar, the SLS files rendered otherwise are never cached
+RENDER_CACHE_RENDERERS = frozenset(['jinja', 'yaml', 'yamlex', 'json'])
+
+# The execution functions called in a template, i.e. salt['pillar.get'] or
+# salt.pillar.get
+SALT_FUNCTION_RE = re.compile(r'''\bsalt(?:\[\s*['"]([\w.]+)['"]\s*\]|\.(\w+\.\w+))''')
+
+# The jinja expressions and statements of a template
+JINJA_BLOCK_RE = re.compile(r'{[{%](.*?)[%}]}', re.S)
+
+# The uses of salt in a jinja block, which must all be function calls
+SALT_NAME_RE = re.compile(r'\bsalt\b(?!://)')
+
+# The names whose use in a jinja block make its output depend on more than
+# the files rendered, the grains and the pillar
+RENDER_UNCACHEABLE_RE = re.compile(
+    r'\b(?:opts|__opts__|random|shuffle|random_hash|random_sample|rand_str|'
+    r'uuid|strftime|date_format|now)\b')
+
+
+def _order_level(low):
+    '''
+    Return the order level of a chunk, the names of a state all share the
+    level of the state
+    '''
+    try:
+        return int(low.get('order', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
 def format_log(ret):
     '''
     Format the state into a log message
@@ -754,6 +992,8 @@ class State(object):
         self.instance_id = six.text_type(id(self))
         self.inject_globals = {}
         self.mocked = mocked
+        self._req_index = None
+        self._worker = False
 
     def _gather_pillar(self):
         '''
@@ -1016,6 +1256,10 @@ class State(object):
         possible module type, e.g. a python, pyx, or .so. Always refresh if the
         function is recurse, since that can lay down anything.
         '''
+        if self._worker:
+            # The process which started the state worker refreshes once the
+            # result is returned
+            return
         _reload_modules = False
         if data.get('reload_grains', False):
             log.debug('Refreshing grains...')
@@ -1521,6 +1765,7 @@ class State(object):
         req_in_all = req_in.union({'require', 'watch', 'onfail', 'onfail_stop', 'onchanges'})
         extend = {}
         errors = []
+        index = None
         for id_, body in six.iteritems(high):
             if not isinstance(body, dict):
                 continue
@@ -1585,6 +1830,8 @@ class State(object):
                         if isinstance(items, list):
                             # Formed as a list of requisite additions
                             hinges = []
+                            if index is None:
+                                index = HighIndex(high)
                             for ind in items:
                                 if not isinstance(ind, dict):
                                     # Malformed req_in
@@ -1593,26 +1840,17 @@ class State(object):
                                                      in high[ind]
                                                      if not x.startswith('__')]
                                         ind = {_ind_high[0]: ind}
+                                    elif ind in index.names:
+                                        ind = index.names[ind]
                                     else:
-                                        found = False
-                                        for _id in iter(high):
-                                            for state in [state for state
-                                                          in iter(high[_id])
-                                                          if not state.startswith('__')]:
-                                                for j in iter(high[_id][state]):
-                                                    if isinstance(j, dict) and 'name' in j:
-                                                        if j['name'] == ind:
-                                                            ind = {state: _id}
-                                                            found = True
-                                        if not found:
-                                            continue
+                                        continue
                                 if len(ind) < 1:
                                     continue
                                 pstate = next(iter(ind))
                                 pname = ind[pstate]
                                 if pstate == 'sls':
                                     # Expand hinges here
-                                    hinges = find_sls_ids(pname, high)
+                                    hinges = index.find_sls_ids(pname)
                                 else:
                                     hinges.append((pname, pstate))
                                 if '.' in pstate:
@@ -1642,7 +1880,7 @@ class State(object):
                                                 )
                                     if key == 'prereq':
                                         # Add prerequired to prereqs
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if ext_id not in extend:
                                                 extend[ext_id] = OrderedDict()
@@ -1655,7 +1893,7 @@ class State(object):
                                     if key == 'use_in':
                                         # Add the running states args to the
                                         # use_in states
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1682,7 +1920,7 @@ class State(object):
                                     if key == 'use':
                                         # Add the use state's args to the
                                         # running state
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = index.find_name(name, _state)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -2130,20 +2368,25 @@ class State(object):
                         chunks.remove(low)
                         break
         running = {}
-        for low in chunks:
-            if '__FAILHARD__' in running:
-                running.pop('__FAILHARD__')
-                return running
-            tag = _gen_tag(low)
-            if tag not in running:
-                # Check if this low chunk is paused
-                action = self.check_pause(low)
-                if action == 'kill':
-                    break
-                running = self.call_chunk(low, running, chunks)
-                if self.check_failhard(low, running):
+        self._req_index = RequisiteIndex(chunks)
+        workers = min(state_workers(self.opts), len(chunks))
+        if workers > 1:
+            running = self._call_chunks_workers(chunks, running, workers)
+        else:
+            for low in chunks:
+                if '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__')
                     return running
-            self.active = set()
+                tag = _gen_tag(low)
+                if tag not in running:
+                    # Check if this low chunk is paused
+                    action = self.check_pause(low)
+                    if action == 'kill':
+                        break
+                    running = self.call_chunk(low, running, chunks)
+                    if self.check_failhard(low, running):
+                        return running
+                self.active = set()
         while True:
             if self.reconcile_procs(running):
                 break
@@ -2151,6 +2394,204 @@ class State(object):
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _state_pool(self, workers):
+        '''
+        Fork the pool of state worker processes
+        '''
+        if hasattr(multiprocessing, 'get_context'):
+            # The workers inherit this State, they have to be forked
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing
+        return context.Pool(workers, _init_state_worker, (self,))
+
+    def _chunk_requisites(self, low, index):
+        '''
+        Return the chunks the low chunk has to wait for
+        '''
+        ret = []
+        for requisite in ORDERING_REQUISITES:
+            for req in low.get(requisite) or ():
+                if isinstance(req, six.string_types):
+                    req = {'id': req}
+                if not isinstance(req, dict) or not req:
+                    continue
+                req = trim_req(req)
+                req_key = next(iter(req))
+                req_val = req[req_key]
+                if req_val is None:
+                    continue
+                if req_key != 'sls' and not isinstance(req_val, six.string_types):
+                    # check_requisite reports it
+                    continue
+                ret.extend(index.match(req_key, req_val))
+        return ret
+
+    def _call_chunks_workers(self, chunks, running, workers):
+        '''
+        Run the chunks on a pool of worker processes. A chunk is started as
+        soon as the chunks it requires are done and no chunk with a lower
+        order is left. The chunks with prereqs and the parallel chunks are
+        run in this process, while the pool is idle.
+        '''
+        index = self._req_index
+        serial = set(self.opts.get('state_workers_serial') or ())
+        lows = OrderedDict()
+        for low in chunks:
+            lows.setdefault(_gen_tag(low), low)
+        position = dict((tag, pos) for pos, tag in enumerate(lows))
+        dependents = {}
+        waiting = {}
+        levels = {}
+        for tag, low in six.iteritems(lows):
+            deps = set(_gen_tag(chunk) for chunk in self._chunk_requisites(low, index))
+            deps.discard(tag)
+            deps.intersection_update(lows)
+            waiting[tag] = len(deps)
+            for dep in deps:
+                dependents.setdefault(dep, []).append(tag)
+            level = _order_level(low)
+            levels[level] = levels.get(level, 0) + 1
+        ready = [(position[tag], tag) for tag in lows if not waiting[tag]]
+        heapq.heapify(ready)
+        finished = set()
+        inflight = {}
+        busy = set()
+        done = queue.Queue()
+
+        def finish(tag):
+            if tag in finished:
+                return
+            finished.add(tag)
+            levels[_order_level(lows[tag])] -= 1
+            for dependent in dependents.get(tag, ()):
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    heapq.heappush(ready, (position[dependent], dependent))
+
+        def run_inline(low):
+            states = self.states
+            self.call_chunk(low, running, chunks)
+            self.active = set()
+            finish(_gen_tag(low))
+            for tag in lows:
+                if tag not in finished and tag in running:
+                    finish(tag)
+            return self.states is not states
+
+        stop = False
+        restart = False
+        pool = self._state_pool(workers)
+        try:
+            while inflight or not stop:
+                if restart and not inflight:
+                    # The modules were refreshed, fork fresh workers
+                    pool.close()
+                    pool.join()
+                    pool = self._state_pool(workers)
+                    restart = False
+                if not stop and not restart:
+                    current = min([level for level, count in six.iteritems(levels) if count] or [0])
+                    progress = False
+                    deferred = []
+                    while ready and len(inflight) < workers and not stop and not restart:
+                        pos, tag = heapq.heappop(ready)
+                        low = lows[tag]
+                        if tag in running:
+                            finish(tag)
+                            continue
+                        if _order_level(low) > current \
+                                or low['state'] in serial and low['state'] in busy:
+                            deferred.append((pos, tag))
+                            continue
+                        inline = low.get('parallel') or low.get('__prereq__') \
+                            or 'prereq' in low or 'prerequired' in low
+                        if inline and inflight:
+                            deferred.append((pos, tag))
+                            break
+                        if self.check_pause(low) == 'kill':
+                            stop = True
+                            break
+                        progress = True
+                        if not inline:
+                            low = self._mod_aggregate(low, running, chunks)
+                            self._mod_init(low)
+                            status, reqs = self.check_requisite(low, running, chunks, pre=True)
+                            if status in ('met', 'change'):
+                                req_tags = set(_gen_tag(chunk)
+                                               for req_chunks in six.itervalues(reqs or {})
+                                               for chunk in req_chunks)
+                                # Only the requisites are passed as __running__
+                                req_running = dict((req_tag, running[req_tag])
+                                                   for req_tag in req_tags
+                                                   if req_tag in running)
+                                inflight[tag] = pool.apply_async(
+                                    _call_state_worker,
+                                    (low, status, reqs, req_running),
+                                    callback=done.put)
+                                busy.add(low['state'])
+                                continue
+                        # Run here, or let call_chunk record why it won't run
+                        restart = run_inline(low)
+                        if running.pop('__FAILHARD__', False) or self.check_failhard(low, running):
+                            stop = True
+                    for item in deferred:
+                        heapq.heappush(ready, item)
+                    if not inflight and not stop and not restart:
+                        if len(finished) == len(lows):
+                            break
+                        if not progress:
+                            # A chunk requires a chunk with a higher order or
+                            # the requisites loop, call_chunk resolves the
+                            # first chunk left as the serial run does
+                            low = lows[min((tag for tag in lows if tag not in finished),
+                                           key=position.get)]
+                            restart = run_inline(low)
+                            if running.pop('__FAILHARD__', False) or self.check_failhard(low, running):
+                                stop = True
+                if not inflight:
+                    continue
+                try:
+                    done.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                for tag, result in list(six.iteritems(inflight)):
+                    if not result.ready():
+                        continue
+                    inflight.pop(tag)
+                    low = lows[tag]
+                    busy.discard(low['state'])
+                    try:
+                        ret = result.get()
+                    except Exception as exc:
+                        start_time, duration = _calculate_fake_duration()
+                        ret = {'name': low['name'],
+                               'result': False,
+                               'changes': {},
+                               'comment': 'The state worker failed to return: {0}'.format(exc),
+                               'duration': duration,
+                               'start_time': start_time,
+                               '__sls__': low['__sls__'],
+                               '__id__': low['__id__']}
+                    ret['__run_num__'] = self.__run_num
+                    self.__run_num += 1
+                    states = self.states
+                    self.check_refresh(low, ret)
+                    restart = restart or self.states is not states
+                    running[tag] = ret
+                    self.event(ret, len(chunks), fire_event=low.get('fire_event'))
+                    finish(tag)
+                    if self.check_failhard(low, running):
+                        stop = True
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        pool.join()
+        running.pop('__FAILHARD__', None)
+        return running
+
     def check_failhard(self, low, running):
         '''
         Check if the low data chunk should send a failhard signal
@@ -2238,6 +2679,15 @@ class State(object):
                     retset.add(False)
         return False not in retset
 
+    def _requisite_index(self, chunks):
+        '''
+        Return the requisite index of the chunks, reusing the one built for
+        the current call_chunks run
+        '''
+        if self._req_index is None or not self._req_index.covers(chunks):
+            self._req_index = RequisiteIndex(chunks)
+        return self._req_index
+
     def check_requisite(self, low, running, chunks, pre=False):
         '''
         Look into the running data to check the status of all requisite
@@ -2292,46 +2742,26 @@ class State(object):
                 'onchanges_any': []}
         if pre:
             reqs['prerequired'] = []
+        index = self._requisite_index(chunks)
         for r_state in reqs:
             if r_state in low and low[r_state] is not None:
                 for req in low[r_state]:
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, six.string_types):
-                                if (fnmatch.fnmatch(chunk['name'], req_val) or
-                                    fnmatch.fnmatch(chunk['__id__'], req_val)):
-                                    if req_key == 'id' or chunk['state'] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None or not chunks:
+                        return 'unmet', ()
+                    if req_key != 'sls' and not isinstance(req_val, six.string_types):
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, chunks[0]['name']))
+                    # Allow requisite tracking of entire sls files
+                    found = index.match(req_key, req_val)
                     if not found:
                         return 'unmet', ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in six.iteritems(reqs):
             req_stats = set()
@@ -2449,6 +2879,20 @@ class State(object):
             preload = {'jid': self.jid}
             ev_func(ret, tag, preload=preload)
 
+    def call_ready(self, low, status, reqs, chunks, running):
+        '''
+        Call a chunk whose requisites are met, with the ``mod_watch`` of the
+        state if a watched requisite changed and the chunk did not
+        '''
+        ret = self.call(low, chunks, running)
+        if status == 'change' and not ret['changes'] and not ret.get('skip_watch', False):
+            low = low.copy()
+            low['sfun'] = low['fun']
+            low['fun'] = 'mod_watch'
+            low['__reqs__'] = reqs
+            ret = self.call(low, chunks, running)
+        return ret
+
     def call_chunk(self, low, running, chunks):
         '''
         Check if a chunk has any requires, execute the requires and then
@@ -2476,6 +2920,7 @@ class State(object):
         if status == 'unmet':
             lost = {}
             reqs = []
+            index = self._requisite_index(chunks)
             for requisite in requisites:
                 lost[requisite] = []
                 if requisite not in low:
@@ -2484,29 +2929,18 @@ class State(object):
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if (fnmatch.fnmatch(chunk['name'], req_val) or
-                            fnmatch.fnmatch(chunk['__id__'], req_val)):
-                            if req_key == 'id' or chunk['state'] == req_key:
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                elif requisite == 'prerequired':
-                                    chunk['__prerequired__'] = True
-                                reqs.append(chunk)
-                                found = True
+                    if req_val is None:
+                        lost[requisite].append(req)
+                        continue
+                    found = index.match(req_key, req_val)
+                    for chunk in found:
+                        if requisite == 'prereq':
+                            chunk['__prereq__'] = True
+                        elif requisite == 'prerequired' and req_key != 'sls':
+                            chunk['__prerequired__'] = True
+                    reqs.extend(found)
                     if not found:
                         lost[requisite].append(req)
             if lost['require'] or lost['watch'] or lost['prereq'] \
@@ -2627,14 +3061,7 @@ class State(object):
                 self.pre[tag] = running[tag]
             self.__run_num += 1
         elif status == 'change' and not low.get('__prereq__'):
-            ret = self.call(low, chunks, running)
-            if not ret['changes'] and not ret.get('skip_watch', False):
-                low = low.copy()
-                low['sfun'] = low['fun']
-                low['fun'] = 'mod_watch'
-                low['__reqs__'] = reqs
-                ret = self.call(low, chunks, running)
-            running[tag] = ret
+            running[tag] = self.call_ready(low, status, reqs, chunks, running)
         elif status == 'pre':
             start_time, duration = _calculate_fake_duration()
             pre_ret = {'changes': {},
@@ -2926,6 +3353,9 @@ class BaseHighState(object):
         self.avail = self.__gather_avail()
         self.serial = salt.payload.Serial(self.opts)
         self.building_highstate = OrderedDict()
+        self.render_stats = {'hits': 0, 'misses': 0, 'uncached': 0}
+        self.timing = {'top': 0, 'render': 0, 'sls': OrderedDict()}
+        self._render_fingerprint = None
 
     def __gather_avail(self):
         '''
@@ -3436,6 +3866,145 @@ class BaseHighState(object):
             self.state.opts['pillar'] = self.state._gather_pillar()
         self.state.module_refresh()
 
+    def _sls_cache_key(self, fn_, sls, saltenv):
+        '''
+        Return the key of the compiled SLS in the render cache, derived from
+        the contents of the file, the grains, the pillar and the options the
+        renderers use
+        '''
+        if self._render_fingerprint is None:
+            self._render_fingerprint = salt.utils.hashutils.data_digest([
+                salt.version.__version__,
+                self.state.opts['grains'],
+                self.state.opts['pillar'],
+                [self.state.opts.get(opt) for opt in (
+                    'id', 'test', 'saltenv', 'pillarenv',
+                    'renderer', 'renderer_blacklist',
+                    'renderer_whitelist', 'jinja_env',
+                    'jinja_sls_env', 'state_render_cache_functions')]])
+        return salt.utils.hashutils.sha256_digest('{0}|{1}|{2}|{3}'.format(
+            self._render_fingerprint, saltenv, sls,
+            salt.utils.hashutils.get_hash(fn_)))
+
+    def _sls_cacheable(self, fn_, templates):
+        '''
+        Return True if the output of the renderers only depends on the SLS
+        file, the templates it imports, the grains and the pillar
+        '''
+        allowed = set(self.opts.get('state_render_cache_functions') or ())
+        for path in [fn_] + [tpl[2] for tpl in templates]:
+            try:
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    data = salt.utils.stringutils.to_unicode(fp_.read(), errors='replace')
+            except (IOError, OSError):
+                return False
+            if path == fn_:
+                first = data.split('\n', 1)[0].strip()
+                if first.startswith('#!') and not first.startswith('#!/'):
+                    pipe = first[2:]
+                else:
+                    pipe = self.state.opts['renderer']
+                renderers = set(comp.split()[0] for comp in pipe.split('|') if comp.strip())
+                if not renderers.issubset(RENDER_CACHE_RENDERERS):
+                    return False
+            for match in SALT_FUNCTION_RE.finditer(data):
+                if (match.group(1) or match.group(2)) not in allowed:
+                    return False
+            for block in JINJA_BLOCK_RE.findall(data):
+                if RENDER_UNCACHEABLE_RE.search(block):
+                    return False
+                # salt passed around under another name
+                if len(SALT_NAME_RE.findall(block)) != len(SALT_FUNCTION_RE.findall(block)):
+                    return False
+        return True
+
+    def _sls_cache_fetch(self, cfn, key):
+        '''
+        Return the compiled SLS cached under the key, if the templates it
+        imported did not change
+        '''
+        try:
+            with salt.utils.files.fopen(cfn, 'rb') as fp_:
+                # Keep the order the states are defined in
+                entry = salt.serializers.msgpack.deserialize(
+                    fp_.read(), object_pairs_hook=OrderedDict)
+        except (IOError, OSError):
+            return None
+        except Exception as exc:
+            log.debug('Unable to read the render cache file %s: %s', cfn, exc)
+            return None
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+        for saltenv, template, hash_ in entry.get('templates', ()):
+            path = self.client.cache_file(salt.utils.url.create(template), saltenv)
+            if not path or salt.utils.hashutils.get_hash(path) != hash_:
+                return None
+        return entry.get('state')
+
+    def _sls_cache_store(self, cfn, key, fn_, templates, state):
+        '''
+        Cache the compiled SLS, if it can be reused
+        '''
+        if not isinstance(state, dict) or not self._sls_cacheable(fn_, templates):
+            self.render_stats['uncached'] += 1
+            return
+        self.render_stats['misses'] += 1
+        try:
+            data = self.serial.dumps({
+                'key': key,
+                'templates': [[saltenv, template, salt.utils.hashutils.get_hash(path)]
+                              for saltenv, template, path in templates],
+                'state': state})
+        except Exception as exc:
+            log.debug('Unable to serialize the compiled SLS for %s: %s', cfn, exc)
+            return
+        cdir = os.path.dirname(cfn)
+        with salt.utils.files.set_umask(0o077):
+            try:
+                if not os.path.isdir(cdir):
+                    os.makedirs(cdir)
+                with salt.utils.atomicfile.atomic_open(cfn, 'wb') as fp_:
+                    fp_.write(data)
+            except (IOError, OSError):
+                log.error('Unable to write to the render cache file %s', cfn)
+
+    def _render_sls(self, fn_, sls, saltenv, mods):
+        '''
+        Render an SLS file. With ``state_render_cache``, the compiled SLS is
+        reused as long as the file, the templates it imports, the grains and
+        the pillar did not change.
+        '''
+        start = time.time()
+        cached = False
+        use_cache = self.opts.get('state_render_cache', False)
+        if use_cache:
+            cfn = os.path.join(
+                self.opts['cachedir'],
+                'sls_cache',
+                salt.utils.hashutils.sha256_digest('{0}:{1}'.format(saltenv, sls)))
+            key = self._sls_cache_key(fn_, sls, saltenv)
+            state = self._sls_cache_fetch(cfn, key)
+            cached = state is not None
+        if cached:
+            self.render_stats['hits'] += 1
+        else:
+            with salt.utils.jinja.record_templates() as templates:
+                state = compile_template(fn_,
+                                         self.state.rend,
+                                         self.state.opts['renderer'],
+                                         self.state.opts['renderer_blacklist'],
+                                         self.state.opts['renderer_whitelist'],
+                                         saltenv,
+                                         sls,
+                                         rendered_sls=mods
+                                         )
+            if use_cache:
+                self._sls_cache_store(cfn, key, fn_, templates, state)
+        self.timing['sls']['{0}:{1}'.format(saltenv, sls)] = {
+            'duration': (time.time() - start) * 1000.0,
+            'cached': cached}
+        return state
+
     def render_state(self, sls, saltenv, mods, matches, local=False):
         '''
         Render a state file and retrieve all of the include states
@@ -3460,15 +4029,7 @@ class BaseHighState(object):
             )
         else:
             try:
-                state = compile_template(fn_,
-                                         self.state.rend,
-                                         self.state.opts['renderer'],
-                                         self.state.opts['renderer_blacklist'],
-                                         self.state.opts['renderer_whitelist'],
-                                         saltenv,
-                                         sls,
-                                         rendered_sls=mods
-                                         )
+                state = self._render_sls(fn_, sls, saltenv, mods)
             except SaltRenderError as exc:
                 msg = 'Rendering SLS \'{0}:{1}\' failed: {2}'.format(
                     saltenv, sls, exc
@@ -3625,7 +4186,8 @@ class BaseHighState(object):
         '''
         Take a state and apply the iorder system
         '''
-        if self.opts['state_auto_order']:
+        # The state workers only honor explicit orders
+        if self.opts['state_auto_order'] and not state_workers(self.opts):
             for name in state:
                 for s_dec in state[name]:
                     if not isinstance(s_dec, six.string_types):
@@ -3959,11 +4521,15 @@ class BaseHighState(object):
         Return just the highstate or the errors
         '''
         err = []
+        start = time.time()
         top = self.get_top()
         err += self.verify_tops(top)
         matches = self.top_matches(top)
+        rendered = time.time()
         high, errors = self.render_highstate(matches)
         err += errors
+        self.timing['top'] = (rendered - start) * 1000.0
+        self.timing['render'] = (time.time() - rendered) * 1000.0
 
         if err:
             return err
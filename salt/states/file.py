@@ -3899,8 +3899,16 @@ def recurse(name,
         merge_ret(os.path.join(name, srelpath), _ret)
     for dirname in mng_dirs:
         manage_directory(dirname)
-    for dest, src in mng_files:
-        manage_file(dest, src, replace)
+    if mng_files:
+        # Get the hashes and modes of all of the files from the master in one
+        # request, rather than once per file
+        __salt__['cp.file_manifest'](srcpath, saltenv=senv, remember=True)
+    try:
+        for dest, src in mng_files:
+            manage_file(dest, src, replace)
+    finally:
+        if mng_files:
+            __salt__['cp.forget_manifest'](senv)
 
     if clean:
         # TODO: Use directory(clean=True) instead
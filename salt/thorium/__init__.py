@@ -21,6 +21,7 @@ import salt.cache
 import salt.state
 import salt.loader
 import salt.payload
+import salt.utils.minions
 from salt.exceptions import SaltRenderError
 
 # Import 3rd-party libs
@@ -77,9 +78,8 @@ class ThorState(salt.state.HighState):
                 minions = self.cache.list('minions')
                 if not minions:
                     return cache
-                for minion in minions:
-                    total = self.cache.fetch('minions/{0}'.format(minion), 'data')
-
+                cached = salt.utils.minions.fetch_minions_cache(self.cache, minions)
+                for minion, total in six.iteritems(cached):
                     if 'pillar' in total:
                         if self.pillar_keys:
                             for key in self.pillar_keys:
@@ -468,7 +468,7 @@ class IPCMessagePublisher(object):
     A Tornado IPC Publisher similar to Tornado's TCPServer class
     but using either UNIX domain sockets or TCP sockets
     '''
-    def __init__(self, opts, socket_path, io_loop=None):
+    def __init__(self, opts, socket_path, io_loop=None, tag_match=None):
         '''
         Create a new Tornado IPC server
         :param dict opts: Salt options
@@ -481,6 +481,11 @@ class IPCMessagePublisher(object):
                                     which case it is used as the port
                                     for a tcp localhost connection.
         :param IOLoop io_loop: A Tornado ioloop to handle scheduling
+        :param func tag_match: A function taking the tag of a message and
+                               the filters sent by a subscriber, returning
+                               whether the message is to be forwarded to
+                               that subscriber. Without it, subscribers
+                               get every message.
         '''
         self.opts = opts
         self.socket_path = socket_path
@@ -491,6 +496,9 @@ class IPCMessagePublisher(object):
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        self.tag_match = tag_match
+        # The filters sent by the subscribers, by stream
+        self.filters = {}
 
     def start(self):
         '''
@@ -530,9 +538,36 @@ class IPCMessagePublisher(object):
                 stream.close()
             self.streams.discard(stream)
 
-    def publish(self, msg):
+    @tornado.gen.coroutine
+    def _read_filters(self, stream):
         '''
-        Send message to all connected sockets
+        Read the filters a subscriber sends to only get the messages with
+        matching tags
+        '''
+        if six.PY2:
+            encoding = None
+        else:
+            encoding = 'utf-8'
+        unpacker = msgpack.Unpacker(encoding=encoding)
+        while not stream.closed():
+            try:
+                wire_bytes = yield stream.read_bytes(4096, partial=True)
+                unpacker.feed(wire_bytes)
+                for framed_msg in unpacker:
+                    if framed_msg['head'].get('filters'):
+                        self.filters[stream] = framed_msg['body']
+            except tornado.iostream.StreamClosedError:
+                break
+            except Exception as exc:
+                log.error('Exception occurred while reading subscriber '
+                          'filters: %s', exc)
+                break
+        self.filters.pop(stream, None)
+
+    def publish(self, msg, tag=None):
+        '''
+        Send message to all connected sockets, or, given the tag of the
+        message, to the sockets whose filters match it
         '''
         if not len(self.streams):
             return
@@ -540,6 +575,10 @@ class IPCMessagePublisher(object):
         pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
 
         for stream in self.streams:
+            if tag is not None and self.tag_match is not None:
+                filters = self.filters.get(stream)
+                if filters is not None and not self.tag_match(tag, filters):
+                    continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
     def handle_connection(self, connection, address):
@@ -558,8 +597,11 @@ class IPCMessagePublisher(object):
 
             def discard_after_closed():
                 self.streams.discard(stream)
+                self.filters.pop(stream, None)
 
             stream.set_close_callback(discard_after_closed)
+            if self.tag_match is not None:
+                self.io_loop.spawn_callback(self._read_filters, stream)
         except Exception as exc:
             log.error('IPC streaming error: %s', exc)
 
@@ -575,6 +617,7 @@ class IPCMessagePublisher(object):
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.filters.clear()
         if hasattr(self.sock, 'close'):
             self.sock.close()
 
@@ -705,6 +748,19 @@ class IPCMessageSubscriber(IPCClient):
         self._read_sync_future = None
         return ret_future.result()
 
+    @tornado.gen.coroutine
+    def send_filters(self, filters):
+        '''
+        Ask the publisher to only send the messages whose tag matches filters,
+        or every message if filters is None
+
+        :param list filters: The filters, understood by the tag_match function
+                             of the publisher
+        '''
+        pack = salt.transport.frame.frame_msg_ipc(
+            filters, header={'filters': True})
+        yield self.stream.write(pack)
+
     @tornado.gen.coroutine
     def _read_async(self, callback):
         while not self.stream.closed():
@@ -759,3 +815,133 @@ class IPCMessageSubscriber(IPCClient):
     def __del__(self):
         if IPCMessageSubscriber in globals():
             self.close()
+
+
+class IPCMessageSubscriberGroup(object):
+    '''
+    Salt IPC message subscriber reading the messages of several publishers as
+    one stream, e.g. the shards of the master event bus
+
+    The messages of each publisher are read in the order they were published,
+    the messages of different publishers in the order they arrive.
+
+    .. code-block:: python
+
+        io_loop = tornado.ioloop.IOLoop()
+        ipc_subscriber = salt.transport.ipc.IPCMessageSubscriberGroup(
+            ['/var/run/ipc_publisher_0.ipc', '/var/run/ipc_publisher_1.ipc'],
+            io_loop=io_loop)
+        io_loop.run_sync(ipc_subscriber.connect)
+        package = ipc_subscriber.read_sync()
+    '''
+    def __init__(self, socket_paths, io_loop=None):
+        self.io_loop = io_loop or IOLoop.current()
+        self.socket_paths = socket_paths
+        self.subscribers = [
+            IPCMessageSubscriber(socket_path, io_loop=self.io_loop)
+            for socket_path in socket_paths]
+        self.saved_data = []
+        self._closing = False
+        self._reads = None
+        self._data_future = None
+
+    def connected(self):
+        return all(subscriber.connected() for subscriber in self.subscribers)
+
+    @tornado.gen.coroutine
+    def connect(self, callback=None, timeout=None):
+        '''
+        Connect to all the publishers
+        '''
+        yield [subscriber.connect(timeout=timeout)
+               for subscriber in self.subscribers]
+        if callback is not None:
+            self.io_loop.add_callback(callback, True)
+
+    def _save_data(self, body):
+        self.saved_data.append(body)
+        self._wake()
+
+    def _wake(self, *args):
+        if self._data_future is not None and not self._data_future.done():
+            self._data_future.set_result(None)
+
+    def _closed(self):
+        return any(read.done() for read in self._reads)
+
+    def read_sync(self, timeout=None):
+        '''
+        Read a message from any of the publishers
+
+        The sockets must already be connected.
+        The associated IO Loop must NOT be running.
+        :param int timeout: Timeout when receiving message
+        :return: message data if successful. None if timed out. Will raise an
+                 exception for all other error conditions.
+        '''
+        if self.saved_data:
+            return self.saved_data.pop(0)
+
+        if self._reads is None:
+            # The reads go on, in the background of the next calls, until
+            # one of the streams is closed
+            self._reads = [subscriber._read_async(self._save_data)
+                           for subscriber in self.subscribers]
+            for read in self._reads:
+                read.add_done_callback(self._wake)
+        if not self._closed():
+            self._data_future = tornado.concurrent.Future()
+            try:
+                self.io_loop.run_sync(lambda: self._data_future,
+                                      timeout=timeout)
+            except TornadoTimeoutError:
+                pass
+            finally:
+                self._data_future = None
+
+        if self.saved_data:
+            return self.saved_data.pop(0)
+        if self._closed():
+            raise tornado.iostream.StreamClosedError()
+        return None
+
+    @tornado.gen.coroutine
+    def send_filters(self, filters):
+        '''
+        Ask all the publishers to only send the messages whose tag matches
+        filters, see IPCMessageSubscriber.send_filters
+        '''
+        yield [subscriber.send_filters(filters)
+               for subscriber in self.subscribers]
+
+    @tornado.gen.coroutine
+    def read_async(self, callback):
+        '''
+        Asynchronously read messages from all the publishers and invoke a
+        callback when they are ready.
+
+        :param callback: A callback with the received data
+        '''
+        yield [subscriber.read_async(callback)
+               for subscriber in self.subscribers]
+
+    def close(self):
+        '''
+        Close the connections to all the publishers
+        '''
+        if self._closing:
+            return
+        self._closing = True
+        for subscriber in self.subscribers:
+            subscriber.close()
+        self.subscribers = []
+        reads, self._reads = self._reads, None
+        if reads is not None:
+            # Let the reads see their streams are closed
+            try:
+                self.io_loop.run_sync(lambda: reads, timeout=1)
+            except Exception:
+                pass
+
+    def __del__(self):
+        self.close()
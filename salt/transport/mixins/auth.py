@@ -9,6 +9,7 @@ import os
 import hashlib
 import shutil
 import binascii
+import functools
 
 # Import Salt Libs
 import salt.crypt
@@ -83,9 +84,14 @@ class AESReqServerMixin(object):
             salt.master.SMaster.secrets['aes'] = {
                 'secret': multiprocessing.Array(
                     ctypes.c_char,
-                    salt.utils.stringutils.to_bytes(salt.crypt.Crypticle.generate_key_string())
+                    salt.utils.stringutils.to_bytes(salt.crypt.Crypticle.generate_key_string(
+                        cipher=self.opts.get('session_cipher')
+                    ))
                 ),
-                'reload': salt.crypt.Crypticle.generate_key_string
+                'reload': functools.partial(
+                    salt.crypt.Crypticle.generate_key_string,
+                    cipher=self.opts.get('session_cipher')
+                )
             }
 
     def post_fork(self, _, __):
@@ -115,7 +121,9 @@ class AESReqServerMixin(object):
         pubfn = os.path.join(self.opts['pki_dir'],
                              'minions',
                              target)
-        key = salt.crypt.Crypticle.generate_key_string()
+        key = salt.crypt.Crypticle.generate_key_string(
+            cipher=self.opts.get('session_cipher')
+        )
         pcrypt = salt.crypt.Crypticle(
             self.opts,
             key)
@@ -439,6 +447,16 @@ class AESReqServerMixin(object):
             return {'enc': 'clear',
                     'load': {'ret': False}}
 
+        # Older minions do not announce their ciphers and only know the default
+        session_cipher = self.opts.get('session_cipher', salt.crypt.Crypticle.DEFAULT_CIPHER)
+        if session_cipher not in load.get('session_ciphers', [salt.crypt.Crypticle.DEFAULT_CIPHER]):
+            log.error(
+                'Minion %s does not support the %s session cipher',
+                load['id'], session_cipher
+            )
+            return {'enc': 'clear',
+                    'load': {'ret': False}}
+
         if not HAS_M2:
             cipher = PKCS1_OAEP.new(pub)
         ret = {'enc': 'pub',
@@ -1363,6 +1363,7 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         self.serial = salt.payload.Serial(self.opts)  # TODO: in init?
         self.ckminions = salt.utils.minions.CkMinions(opts)
         self.io_loop = None
+        self._signer = None
 
     def __setstate__(self, state):
         salt.master.SMaster.secrets = state['secrets']
@@ -1372,6 +1373,18 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         return {'opts': self.opts,
                 'secrets': salt.master.SMaster.secrets}
 
+    @property
+    def signer(self):
+        '''
+        The signer for sign_pub_messages, it keeps the master key loaded
+        between publishes
+        '''
+        if self._signer is None:
+            self._signer = salt.crypt.MessageSigner(
+                os.path.join(self.opts['pki_dir'], 'master.pem')
+            )
+        return self._signer
+
     def _publish_daemon(self, **kwargs):
         '''
         Bind to the interface specified in the configuration file
@@ -1450,9 +1463,8 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
         payload['load'] = crypticle.dumps(load)
         if self.opts['sign_pub_messages']:
-            master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
-            payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
+            payload['sig'] = self.signer.sign(payload['load'])
         # Use the Salt IPC server
         if self.opts.get('ipc_mode', '') == 'tcp':
             pull_uri = int(self.opts.get('tcp_master_publish_pull', 4514))
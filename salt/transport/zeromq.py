@@ -13,6 +13,7 @@ import signal
 import hashlib
 import logging
 import weakref
+import threading
 from random import randint
 
 # Import Salt Libs
@@ -770,10 +771,37 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
     '''
     Encapsulate synchronous operations for a publisher channel
     '''
+
+    # The publisher socket and crypticle are kept per thread and shared by
+    # every instance of this class so that each MWorker keeps one long-lived
+    # connection to the publish daemon instead of building a new context and
+    # socket for every job it publishes.
+    _sock_data = threading.local()
+
     def __init__(self, opts):
         self.opts = opts
         self.serial = salt.payload.Serial(self.opts)  # TODO: in init?
         self.ckminions = salt.utils.minions.CkMinions(self.opts)
+        self._topic_hashes = {}
+        self._signer = None
+
+    def __setstate__(self, state):
+        self.__init__(state['opts'])
+
+    def __getstate__(self):
+        return {'opts': self.opts}
+
+    @property
+    def signer(self):
+        '''
+        The signer for sign_pub_messages, it keeps the master key loaded
+        between publishes
+        '''
+        if self._signer is None:
+            self._signer = salt.crypt.MessageSigner(
+                os.path.join(self.opts['pki_dir'], 'master.pem')
+            )
+        return self._signer
 
     def connect(self):
         return tornado.gen.sleep(5)
@@ -839,21 +867,9 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
                     if self.opts['zmq_filtering']:
                         # if you have a specific topic list, use that
                         if 'topic_lst' in unpacked_package:
-                            for topic in unpacked_package['topic_lst']:
-                                log.trace('Sending filtered data over publisher %s', pub_uri)
-                                # zmq filters are substring match, hash the topic
-                                # to avoid collisions
-                                htopic = salt.utils.stringutils.to_bytes(hashlib.sha1(topic).hexdigest())
-                                pub_sock.send(htopic, flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace('Filtered data has been sent')
-
-                            # Syndic broadcast
-                            if self.opts.get('order_masters'):
-                                log.trace('Sending filtered data to syndic')
-                                pub_sock.send(b'syndic', flags=zmq.SNDMORE)
-                                pub_sock.send(payload)
-                                log.trace('Filtered data has been sent to syndic')
+                            log.trace('Sending filtered data over publisher %s', pub_uri)
+                            self._publish_filtered(pub_sock, payload, unpacked_package['topic_lst'])
+                            log.trace('Filtered data has been sent')
                         # otherwise its a broadcast
                         else:
                             # TODO: constants file for "broadcast"
@@ -881,6 +897,41 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             if context.closed is False:
                 context.term()
 
+    def _topic_hash(self, topic):
+        '''
+        Return the zmq topic for a minion id. zmq filters are substring
+        match, so the topic is hashed to avoid collisions. The hashes are
+        memoized since the same minions are targeted over and over.
+        '''
+        try:
+            return self._topic_hashes[topic]
+        except KeyError:
+            htopic = salt.utils.stringutils.to_bytes(
+                hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+            )
+            self._topic_hashes[topic] = htopic
+            return htopic
+
+    def _publish_filtered(self, pub_sock, payload, topic_lst):
+        '''
+        Send one already encrypted and serialized payload to every minion in
+        topic_lst. The payload is wrapped in a single zmq Frame which is then
+        sent without copying, so every targeted minion shares the same buffer
+        and the cost of a publish does not grow with the payload size times
+        the number of targets.
+        '''
+        frame = zmq.Frame(payload)
+        for topic in topic_lst:
+            pub_sock.send(self._topic_hash(topic), flags=zmq.SNDMORE)
+            pub_sock.send(frame, copy=False)
+
+        # Syndic broadcast
+        if self.opts.get('order_masters'):
+            log.trace('Sending filtered data to syndic')
+            pub_sock.send(b'syndic', flags=zmq.SNDMORE)
+            pub_sock.send(frame, copy=False)
+            log.trace('Filtered data has been sent to syndic')
+
     def pre_fork(self, process_manager):
         '''
         Do anything necessary pre-fork. Since this is on the master side this will
@@ -891,23 +942,29 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         '''
         process_manager.add_process(self._publish_daemon)
 
-    def publish(self, load):
+    @property
+    def pub_sock(self):
         '''
-        Publish "load" to minions
-
-        :param dict load: A load to be sent across the wire to minions
+        This thread's zmq publisher socket. This socket is stored on the class
+        so that multiple instantiations in the same thread will re-use a single
+        zmq socket.
         '''
-        payload = {'enc': 'aes'}
+        try:
+            return self._sock_data.sock
+        except AttributeError:
+            pass
 
-        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
-        if self.opts['sign_pub_messages']:
-            master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
-            log.debug("Signing data packet")
-            payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
-        # Send 0MQ to the publisher
-        context = zmq.Context(1)
-        pub_sock = context.socket(zmq.PUSH)
+    def pub_connect(self):
+        '''
+        Create and connect this thread's zmq socket. If a publisher socket
+        already exists "pub_close" is called before creating and connecting a
+        new socket.
+        '''
+        if self.pub_sock:
+            self.pub_close()
+        ctx = zmq.Context.instance()
+        self._sock_data.sock = ctx.socket(zmq.PUSH)
+        self.pub_sock.setsockopt(zmq.LINGER, -1)
         if self.opts.get('ipc_mode', '') == 'tcp':
             pull_uri = 'tcp://127.0.0.1:{0}'.format(
                 self.opts.get('tcp_master_publish_pull', 4514)
@@ -916,7 +973,41 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             pull_uri = 'ipc://{0}'.format(
                 os.path.join(self.opts['sock_dir'], 'publish_pull.ipc')
                 )
-        pub_sock.connect(pull_uri)
+        log.debug('Connecting to pub server: %s', pull_uri)
+        self.pub_sock.connect(pull_uri)
+        return self._sock_data.sock
+
+    def pub_close(self):
+        '''
+        Disconnect an existing publisher socket and remove it from the local
+        thread's cache.
+        '''
+        if hasattr(self._sock_data, 'sock'):
+            self._sock_data.sock.close()
+            delattr(self._sock_data, 'sock')
+
+    @property
+    def crypticle(self):
+        '''
+        This thread's Crypticle for the current AES session key. It is rebuilt
+        only when the master rotates the key.
+        '''
+        key = salt.master.SMaster.secrets['aes']['secret'].value
+        if getattr(self._sock_data, 'aes_key', None) != key:
+            self._sock_data.crypticle = salt.crypt.Crypticle(self.opts, key)
+            self._sock_data.aes_key = key
+        return self._sock_data.crypticle
+
+    def _build_int_payload(self, load):
+        '''
+        Encrypt, optionally sign, and wrap "load" into the package the
+        publish daemon expects on its pull socket
+        '''
+        payload = {'enc': 'aes'}
+        payload['load'] = self.crypticle.dumps(load)
+        if self.opts['sign_pub_messages']:
+            log.debug("Signing data packet")
+            payload['sig'] = self.signer.sign(payload['load'])
         int_payload = {'payload': self.serial.dumps(payload)}
 
         # add some targeting stuff for lists only (for now)
@@ -934,10 +1025,18 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             log.debug("Publish Side Match: %s", match_ids)
             # Send list of miions thru so zmq can target them
             int_payload['topic_lst'] = match_ids
+        return self.serial.dumps(int_payload)
 
-        pub_sock.send(self.serial.dumps(int_payload))
-        pub_sock.close()
-        context.term()
+    def publish(self, load):
+        '''
+        Publish "load" to minions
+
+        :param dict load: A load to be sent across the wire to minions
+        '''
+        package = self._build_int_payload(load)
+        if not self.pub_sock:
+            self.pub_connect()
+        self.pub_sock.send(package)
 
 
 class AsyncReqMessageClientPool(salt.transport.MessageClientPool):
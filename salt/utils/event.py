@@ -60,6 +60,7 @@ import hashlib
 import logging
 import datetime
 import sys
+import zlib
 from collections import MutableMapping
 from multiprocessing.util import Finalize
 from salt.ext.six.moves import range
@@ -107,9 +108,86 @@ TAGS = {
     'cloud': 'cloud',  # prefix for all salt/cloud events
     'fileserver': 'fileserver',  # prefix for all salt/fileserver events
     'queue': 'queue',  # prefix for all salt/queue events
+    'cache': 'cache',  # prefix for all salt/cache events
 }
 
 
+# The regex cache of the tag filters of subscribers
+_FILTER_REGEX = salt.utils.cache.CacheRegex(prepend='^')
+
+# The functions matching event tags for each match_type
+TAG_MATCHERS = {
+    'startswith': lambda tag, search_tag: tag.startswith(search_tag),
+    'endswith': lambda tag, search_tag: tag.endswith(search_tag),
+    'find': lambda tag, search_tag: tag.find(search_tag) >= 0,
+    'regex': lambda tag, search_tag: _FILTER_REGEX.get(search_tag).search(tag) is not None,
+    'fnmatch': fnmatch.fnmatch,
+}
+
+
+def match_tag_filters(tag, filters):
+    '''
+    Return True if the event tag matches one of the ``[match_type, tag]``
+    filters sent by a subscriber to the event publisher
+    '''
+    for match_type, search_tag in filters:
+        matcher = TAG_MATCHERS.get(match_type)
+        if matcher is None:
+            return True
+        try:
+            if matcher(tag, search_tag):
+                return True
+        except Exception:
+            # Let the subscriber deal with a filter it got wrong
+            return True
+    return False
+
+
+def _package_tag(package):
+    '''
+    Return the tag of a packed event, read from the bytes preceding TAGEND so
+    that the event data is not unpacked, or None if it has no tag delimiter
+    '''
+    mtag, sep, _ = package.partition(salt.utils.stringutils.to_bytes(TAGEND))
+    if not sep:
+        return None
+    try:
+        return salt.utils.stringutils.to_str(mtag)
+    except UnicodeDecodeError:
+        return None
+
+
+def master_event_uris(opts, shard=0):
+    '''
+    Return the URIs of the pub and pull sockets of a shard of the master event
+    bus. The first shard uses the sockets of the unsharded event bus, the
+    ports of the others follow tcp_master_publish_pull and tcp_master_workers.
+    '''
+    if opts['ipc_mode'] == 'tcp':
+        offset = 2 * shard + 2 if shard else 0
+        return (int(opts['tcp_master_pub_port']) + offset,
+                int(opts['tcp_master_pull_port']) + offset)
+    suffix = '_{0}'.format(shard) if shard else ''
+    return (os.path.join(opts['sock_dir'],
+                         'master_event_pub{0}.ipc'.format(suffix)),
+            os.path.join(opts['sock_dir'],
+                         'master_event_pull{0}.ipc'.format(suffix)))
+
+
+def event_shard(tag, shards):
+    '''
+    Return the shard of the event bus the events with the given tag go
+    through. The events of a job, tagged ``salt/job/<jid>/...`` or with the
+    bare jid, all go through the shard of the jid and are kept in order.
+    '''
+    if shards < 2:
+        return 0
+    key = tag
+    if tag.startswith('salt/job/'):
+        key = tag.split(TAGPARTER, 3)[2]
+    return (zlib.crc32(salt.utils.stringutils.to_bytes(key)) & 0xffffffff) % shards
+
+
 def get_event(
         node, sock_dir=None, transport='zeromq',
         opts=None, listen=True, io_loop=None, keep_loop=False, raise_errors=False):
@@ -239,6 +317,7 @@ class SaltEvent(object):
         self.cpush = False
         self.subscriber = None
         self.pusher = None
+        self.pushers = []
         self.raise_errors = raise_errors
 
         if opts is None:
@@ -257,8 +336,19 @@ class SaltEvent(object):
         if salt.utils.platform.is_windows() and 'ipc_mode' not in opts:
             self.opts['ipc_mode'] = 'tcp'
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
+        self.shard_uris = [(self.puburi, self.pulluri)]
+        if node == 'master':
+            self.shard_uris.extend(
+                master_event_uris(self.opts, shard)
+                for shard in range(1, self.opts['event_publisher_shards']))
         self.pending_tags = []
         self.pending_events = []
+        # Whether the publisher is asked to filter the events, and the
+        # filters last sent to it
+        self.filter_pub = False
+        self.pub_filters = None
+        self._pub_tag = None
+        self._pub_extra = []
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -285,18 +375,7 @@ class SaltEvent(object):
         use for firing and listening to events
         '''
         if node == 'master':
-            if self.opts['ipc_mode'] == 'tcp':
-                puburi = int(self.opts['tcp_master_pub_port'])
-                pulluri = int(self.opts['tcp_master_pull_port'])
-            else:
-                puburi = os.path.join(
-                    sock_dir,
-                    'master_event_pub.ipc'
-                )
-                pulluri = os.path.join(
-                    sock_dir,
-                    'master_event_pull.ipc'
-                )
+            puburi, pulluri = master_event_uris(self.opts)
         else:
             if self.opts['ipc_mode'] == 'tcp':
                 puburi = int(self.opts['tcp_pub_port'])
@@ -336,6 +415,7 @@ class SaltEvent(object):
             return
         match_func = self._get_match_func(match_type)
         self.pending_tags.append([tag, match_func])
+        self._send_pub_filters()
 
     def unsubscribe(self, tag, match_type=None):
         '''
@@ -346,6 +426,7 @@ class SaltEvent(object):
         match_func = self._get_match_func(match_type)
 
         self.pending_tags.remove([tag, match_func])
+        self._send_pub_filters()
 
         old_events = self.pending_events
         self.pending_events = []
@@ -353,6 +434,58 @@ class SaltEvent(object):
             if any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
                 self.pending_events.append(evt)
 
+    def filter_events(self, enable=True, tags=None):
+        '''
+        Ask the publisher to only send the events matching the tags subscribed
+        to with subscribe(), and the tag of the last call to get_event, rather
+        than every event, which would be unpacked only to be discarded. The
+        events fired for other tags before get_event is called for them are
+        then lost, so the tags of interest should be subscribed to first.
+
+        tags is a list of additional ``[match_type, tag]`` filters, for the
+        events which are wanted without being kept pending like the events of
+        subscribed tags.
+
+        Only synchronous listeners can filter their events. Return whether
+        the events are filtered.
+        '''
+        self.filter_pub = bool(enable) and self._run_io_loop_sync
+        self._pub_extra = [list(filter_) for filter_ in tags or []]
+        self._send_pub_filters()
+        return self.filter_pub
+
+    @staticmethod
+    def _pub_filter(tag, match_func):
+        '''
+        Return the filter of the publisher for a tag and match function
+        '''
+        match_type = getattr(match_func, '__name__', '')[len('_match_tag_'):]
+        return [match_type, tag]
+
+    def _send_pub_filters(self):
+        '''
+        Send the filters to the publisher if they changed
+        '''
+        if not self.cpub or not self._run_io_loop_sync:
+            return
+        if self.filter_pub:
+            filters = [self._pub_filter(tag, match_func)
+                       for tag, match_func in self.pending_tags]
+            filters.extend(self._pub_extra)
+            if self._pub_tag is not None:
+                filters.append(self._pub_tag)
+        else:
+            filters = None
+        if filters == self.pub_filters:
+            return
+        with salt.utils.asynchronous.current_ioloop(self.io_loop):
+            try:
+                self.io_loop.run_sync(
+                    lambda: self.subscriber.send_filters(filters))
+                self.pub_filters = filters
+            except Exception as exc:
+                log.debug('Unable to send the event filters: %s', exc)
+
     def connect_pub(self, timeout=None):
         '''
         Establish the publish connection
@@ -363,28 +496,53 @@ class SaltEvent(object):
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 if self.subscriber is None:
-                    self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
-                    self.puburi,
-                    io_loop=self.io_loop
-                )
+                    self.subscriber = self._subscriber()
                 try:
                     self.io_loop.run_sync(
                         lambda: self.subscriber.connect(timeout=timeout))
                     self.cpub = True
                 except Exception:
                     pass
+            if self.cpub and self.filter_pub:
+                self._send_pub_filters()
         else:
             if self.subscriber is None:
-                self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
-                self.puburi,
-                io_loop=self.io_loop
-            )
+                self.subscriber = self._subscriber()
 
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
             self.cpub = True
         return self.cpub
 
+    def _subscriber(self):
+        '''
+        Return the subscriber to the publisher, or to all the shards of the
+        event bus
+        '''
+        if len(self.shard_uris) == 1:
+            return salt.transport.ipc.IPCMessageSubscriber(
+                self.puburi,
+                io_loop=self.io_loop
+            )
+        return salt.transport.ipc.IPCMessageSubscriberGroup(
+            [puburi for puburi, _ in self.shard_uris],
+            io_loop=self.io_loop
+        )
+
+    def _connect_pushers(self):
+        '''
+        Create the clients of the pull sockets of all the shards of the event
+        bus, the first one being self.pusher
+        '''
+        if self.pusher is None:
+            self.pushers = [
+                salt.transport.ipc.IPCMessageClient(
+                    pulluri,
+                    io_loop=self.io_loop
+                )
+                for _, pulluri in self.shard_uris]
+            self.pusher = self.pushers[0]
+
     def close_pub(self):
         '''
         Close the publish connection (if established)
@@ -395,6 +553,7 @@ class SaltEvent(object):
         self.subscriber.close()
         self.subscriber = None
         self.pending_events = []
+        self.pub_filters = None
         self.cpub = False
 
     def connect_pull(self, timeout=1):
@@ -407,23 +566,16 @@ class SaltEvent(object):
 
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
-                if self.pusher is None:
-                    self.pusher = salt.transport.ipc.IPCMessageClient(
-                        self.pulluri,
-                        io_loop=self.io_loop
-                    )
+                self._connect_pushers()
                 try:
                     self.io_loop.run_sync(
-                        lambda: self.pusher.connect(timeout=timeout))
+                        lambda: [pusher.connect(timeout=timeout)
+                                 for pusher in self.pushers])
                     self.cpush = True
                 except Exception:
                     pass
         else:
-            if self.pusher is None:
-                self.pusher = salt.transport.ipc.IPCMessageClient(
-                    self.pulluri,
-                    io_loop=self.io_loop
-                )
+            self._connect_pushers()
             # For the asynchronous case, the connect will be deferred to when
             # fire_event() is invoked.
             self.cpush = True
@@ -626,6 +778,11 @@ class SaltEvent(object):
         assert self._run_io_loop_sync
 
         match_func = self._get_match_func(match_type)
+        if self.filter_pub and \
+                [tag, match_func] not in self.pending_tags:
+            # Also get the events for the tag waited on
+            self._pub_tag = self._pub_filter(tag, match_func)
+            self._send_pub_filters()
 
         ret = self._check_pending(tag, match_func)
         if ret is None:
@@ -739,15 +896,16 @@ class SaltEvent(object):
             salt.utils.stringutils.to_bytes(tagend),
             serialized_data])
         msg = salt.utils.stringutils.to_bytes(event, 'utf-8')
+        pusher = self.pushers[event_shard(tag, len(self.pushers))]
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 try:
-                    self.io_loop.run_sync(lambda: self.pusher.send(msg))
+                    self.io_loop.run_sync(lambda: pusher.send(msg))
                 except Exception as ex:
                     log.debug(ex)
                     raise
         else:
-            self.io_loop.spawn_callback(self.pusher.send, msg)
+            self.io_loop.spawn_callback(pusher.send, msg)
         return True
 
     def fire_master(self, data, tag, timeout=1000):
@@ -768,8 +926,8 @@ class SaltEvent(object):
     def destroy(self):
         if self.subscriber is not None:
             self.subscriber.close()
-        if self.pusher is not None:
-            self.pusher.close()
+        for pusher in self.pushers:
+            pusher.close()
         if self._run_io_loop_sync and not self.keep_loop:
             self.io_loop.close()
 
@@ -1012,7 +1170,8 @@ class AsyncEventPublisher(object):
         self.publisher = salt.transport.ipc.IPCMessagePublisher(
             self.opts,
             epub_uri,
-            io_loop=self.io_loop
+            io_loop=self.io_loop,
+            tag_match=match_tag_filters
         )
 
         self.puller = salt.transport.ipc.IPCMessageServer(
@@ -1031,7 +1190,7 @@ class AsyncEventPublisher(object):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:
@@ -1055,12 +1214,13 @@ class AsyncEventPublisher(object):
 class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
     '''
     The interface that takes master events and republishes them out to anyone
-    who wants to listen
+    who wants to listen, or the events of one shard of the event bus
     '''
-    def __init__(self, opts, **kwargs):
+    def __init__(self, opts, shard=0, **kwargs):
         super(EventPublisher, self).__init__(**kwargs)
         self.opts = salt.config.DEFAULT_MASTER_OPTS.copy()
         self.opts.update(opts)
+        self.shard = shard
         self._closing = False
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -1070,6 +1230,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self._is_child = True
         self.__init__(
             state['opts'],
+            shard=state['shard'],
             log_queue=state['log_queue'],
             log_queue_level=state['log_queue_level']
         )
@@ -1077,6 +1238,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
     def __getstate__(self):
         return {
             'opts': self.opts,
+            'shard': self.shard,
             'log_queue': self.log_queue,
             'log_queue_level': self.log_queue_level
         }
@@ -1085,26 +1247,20 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         '''
         Bind the pub and pull sockets for events
         '''
-        salt.utils.process.appendproctitle(self.__class__.__name__)
+        if self.shard:
+            salt.utils.process.appendproctitle(
+                '{0}-{1}'.format(self.__class__.__name__, self.shard))
+        else:
+            salt.utils.process.appendproctitle(self.__class__.__name__)
         self.io_loop = tornado.ioloop.IOLoop()
         with salt.utils.asynchronous.current_ioloop(self.io_loop):
-            if self.opts['ipc_mode'] == 'tcp':
-                epub_uri = int(self.opts['tcp_master_pub_port'])
-                epull_uri = int(self.opts['tcp_master_pull_port'])
-            else:
-                epub_uri = os.path.join(
-                    self.opts['sock_dir'],
-                    'master_event_pub.ipc'
-                )
-                epull_uri = os.path.join(
-                    self.opts['sock_dir'],
-                    'master_event_pull.ipc'
-                )
+            epub_uri, epull_uri = master_event_uris(self.opts, self.shard)
 
             self.publisher = salt.transport.ipc.IPCMessagePublisher(
                 self.opts,
                 epub_uri,
-                io_loop=self.io_loop
+                io_loop=self.io_loop,
+                tag_match=match_tag_filters
             )
 
             self.puller = salt.transport.ipc.IPCMessageServer(
@@ -1120,8 +1276,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
                 if (self.opts['ipc_mode'] != 'tcp' and (
                         self.opts['publisher_acl'] or
                         self.opts['external_auth'])):
-                    os.chmod(os.path.join(
-                        self.opts['sock_dir'], 'master_event_pub.ipc'), 0o666)
+                    os.chmod(epub_uri, 0o666)
 
             # Make sure the IO loop and respective sockets are closed and
             # destroyed
@@ -1134,7 +1289,7 @@ class EventPublisher(salt.utils.process.SignalHandlingMultiprocessingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_package_tag(package))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:
@@ -196,3 +196,36 @@ class DigestCollector(object):
         '''
 
         return salt.utils.stringutils.to_str(self.__digest.hexdigest() + os.linesep)
+
+
+def _feed_data(data, digest):
+    '''
+    Feed a data structure to the hash object
+    '''
+    if isinstance(data, dict):
+        digest.update(b'{')
+        for key, val in sorted(six.iteritems(data), key=lambda item: repr(item[0])):
+            _feed_data(key, digest)
+            _feed_data(val, digest)
+        digest.update(b'}')
+    elif isinstance(data, (list, tuple)):
+        digest.update(b'[')
+        for item in data:
+            _feed_data(item, digest)
+        digest.update(b']')
+    else:
+        digest.update(salt.utils.stringutils.to_bytes(repr(data)))
+        digest.update(b'\0')
+
+
+def data_digest(data, form='sha256'):
+    '''
+    Get the hash sum of a data structure made of dicts, lists and scalars, the
+    order of the dict keys does not change it
+    '''
+    hash_type = hasattr(hashlib, form) and getattr(hashlib, form) or None
+    if hash_type is None:
+        raise ValueError('Invalid hash type: {0}'.format(form))
+    hash_obj = hash_type()
+    _feed_data(data, hash_obj)
+    return hash_obj.hexdigest()
@@ -6,6 +6,7 @@ Jinja loading utils to enable a more powerful backend for jinja templates
 # Import python libs
 from __future__ import absolute_import, unicode_literals
 import collections
+import contextlib
 import logging
 import os.path
 import pipes
@@ -40,7 +41,8 @@ log = logging.getLogger(__name__)
 
 __all__ = [
     'SaltCacheLoader',
-    'SerializerExtension'
+    'SerializerExtension',
+    'record_templates'
 ]
 
 GLOBAL_UUID = uuid.UUID('91633EBF-1C86-5E33-935A-28061F4B480E')
@@ -54,6 +56,9 @@ class SaltCacheLoader(BaseLoader):
     Templates are cached like regular salt states
     and only loaded once per loader instance.
     '''
+    # The lists the loaded templates are recorded in, see record_templates
+    _recorders = []
+
     def __init__(self, opts, saltenv='base', encoding='utf-8',
                  pillar_rend=False):
         self.opts = opts
@@ -155,6 +160,8 @@ class SaltCacheLoader(BaseLoader):
                 with salt.utils.files.fopen(filepath, 'rb') as ifile:
                     contents = ifile.read().decode(self.encoding)
                     mtime = os.path.getmtime(filepath)
+                    for loaded in self._recorders:
+                        loaded.append((self.saltenv, _template, filepath))
 
                     def uptodate():
                         try:
@@ -171,6 +178,21 @@ class SaltCacheLoader(BaseLoader):
         raise TemplateNotFound(template)
 
 
+@contextlib.contextmanager
+def record_templates():
+    '''
+    Record the templates loaded by the SaltCacheLoaders in the block, i.e.
+    the files imported by the templates rendered. Yields the list of the
+    ``(saltenv, template, path)`` of the templates.
+    '''
+    loaded = []
+    SaltCacheLoader._recorders.append(loaded)
+    try:
+        yield loaded
+    finally:
+        SaltCacheLoader._recorders.remove(loaded)
+
+
 class PrintableDict(OrderedDict):
     '''
     Ensures that dict str() and repr() are YAML friendly.
@@ -9,19 +9,26 @@
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals
+import copy
 import os
 import logging
+import multiprocessing
 import signal
+import time
 from threading import Thread, Event
 
 # Import salt libs
 import salt.log
 import salt.cache
 import salt.client
+import salt.minion
 import salt.pillar
+import salt.state
 import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.jinja
 import salt.utils.minions
+import salt.utils.path
 import salt.utils.platform
 import salt.utils.stringutils
 import salt.utils.verify
@@ -31,8 +38,13 @@ import salt.config
 from salt.utils.cache import CacheCli as cache_cli
 from salt.utils.process import MultiprocessingProcess
 
+from salt.utils.odict import OrderedDict
+
 # Import third party libs
+import jinja2
+import jinja2.meta
 from salt.ext import six
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
 from salt.utils.zeromq import zmq
 
 log = logging.getLogger(__name__)
@@ -109,10 +121,10 @@ class MasterPillarUtil(object):
             return mine_data
         if not minion_ids:
             minion_ids = self.cache.list('minions')
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'mine')
+        minion_ids = [minion_id for minion_id in minion_ids
+                      if salt.utils.verify.valid_id(self.opts, minion_id)]
+        cached = salt.utils.minions.fetch_minions_cache(self.cache, minion_ids, 'mine')
+        for minion_id, mdata in six.iteritems(cached):
             if isinstance(mdata, dict):
                 mine_data[minion_id] = mdata
         return mine_data
@@ -128,10 +140,10 @@ class MasterPillarUtil(object):
             return grains, pillars
         if not minion_ids:
             minion_ids = self.cache.list('minions')
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'data')
+        minion_ids = [minion_id for minion_id in minion_ids
+                      if salt.utils.verify.valid_id(self.opts, minion_id)]
+        cached = salt.utils.minions.fetch_minions_cache(self.cache, minion_ids)
+        for minion_id, mdata in six.iteritems(cached):
             if not isinstance(mdata, dict):
                 log.warning(
                     'cache.fetch should always return a dict. ReturnedType: %s, MinionId: %s',
@@ -277,6 +289,95 @@ class MasterPillarUtil(object):
                                         cached_pillar=cached_minion_pillars)
         return minion_pillars
 
+    def compile_minion_pillars(self, pillarenv=None, processes=None):
+        '''
+        Compile the pillar of the targeted minions from their grains and store
+        it in the minion data cache and, if enabled, in the pillar cache.
+
+        The pillar top file is rendered once for all the minions and the
+        minions matching the same SLS files are compiled together, rendering
+        them once, as long as the pillar SLS files do not depend on the minion
+        (see ``_static_pillar_envs``). The minions are compiled on a pool of
+        ``processes`` processes, one per CPU by default.
+
+        Returns a summary of the compilation, the pillars themselves are only
+        stored in the caches.
+        '''
+        start = time.time()
+        minion_ids = self._tgt_to_list()
+        cached_grains = {}
+        if minion_ids and (self.use_cached_grains or self.grains_fallback):
+            cached_grains, _ = self._get_cached_minion_data(*minion_ids)
+        minion_grains = self._get_minion_grains(*minion_ids,
+                                                cached_grains=cached_grains) if minion_ids else {}
+        minions = [(minion_id, minion_grains[minion_id])
+                   for minion_id in sorted(minion_grains)
+                   if minion_grains[minion_id]]
+        ret = {'minions': len(minions),
+               'missing': sorted(minion_id for minion_id in minion_ids
+                                 if not minion_grains.get(minion_id)),
+               'groups': 0,
+               'renders': 0,
+               'shared_top': False,
+               'errors': {}}
+        if not minions:
+            ret['time'] = time.time() - start
+            return ret
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes are not allowed to have children
+            processes = 1
+
+        static_envs = _static_pillar_envs(self.opts)
+        groups = OrderedDict()
+        top = None
+        if set(self.opts['pillar_roots']) <= static_envs:
+            # The top file renders the same for all the minions
+            base = salt.pillar.Pillar(self.opts, minions[0][1], minions[0][0],
+                                      self.saltenv, pillarenv=pillarenv)
+            top, errors = base.get_top()
+            if errors:
+                top = None
+        if top is None:
+            for minion_id, grains in minions:
+                groups[minion_id] = (False, [(minion_id, grains)])
+        else:
+            ret['shared_top'] = True
+            for minion_id, grains in minions:
+                base.matcher = salt.minion.Matcher(
+                    dict(base.opts, grains=grains, id=minion_id), base.functions)
+                matches = base.top_matches(top)
+                key = repr(sorted(six.iteritems(matches)))
+                if key not in groups:
+                    groups[key] = (set(matches) <= static_envs, [])
+                groups[key][1].append((minion_id, grains))
+        ret['groups'] = len(groups)
+
+        # Split the groups between the processes, each chunk of a group
+        # renders its SLS files once
+        tasks = []
+        for shared, group in six.itervalues(groups):
+            size = -(-len(group) // processes) if shared else 1
+            for idx in range(0, len(group), size):
+                tasks.append((self.opts, self.saltenv, pillarenv, top, shared,
+                              group[idx:idx + size]))
+        if processes > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(processes, len(tasks)))
+            try:
+                results = pool.map(_compile_minion_pillars, tasks, 1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_compile_minion_pillars(task) for task in tasks]
+        for renders, errors in results:
+            ret['renders'] += renders
+            ret['errors'].update(errors)
+        ret['time'] = time.time() - start
+        return ret
+
     def get_minion_grains(self):
         '''
         Get grains data for the targeted minions, either by fetching the
@@ -385,6 +486,132 @@ class MasterPillarUtil(object):
         return True
 
 
+# The variables of the pillar SLS templates which are the same for all the
+# minions
+PILLAR_STATIC_VARIABLES = frozenset([
+    'saltenv', 'env', 'sls', 'slspath', 'sls_path', 'slsdotpath',
+    'slscolonpath', 'tplpath', 'tplfile', 'tpldir', 'tpldot', 'tplroot'])
+
+
+def _static_pillar_sls(jinja_env, path, renderer):
+    '''
+    Return True if the pillar SLS file renders the same for all the minions
+    '''
+    try:
+        with salt.utils.files.fopen(path, 'r') as fp_:
+            source = salt.utils.stringutils.to_unicode(fp_.read())
+    except (IOError, OSError):
+        return False
+    first = source.split('\n', 1)[0]
+    if first.startswith('#!'):
+        renderer = first[2:]
+    renderers = [rend.strip() for rend in renderer.split('|')]
+    if not set(renderers) <= salt.state.RENDER_CACHE_RENDERERS:
+        return False
+    if 'jinja' not in renderers:
+        return True
+    try:
+        ast = jinja_env.parse(source)
+    except Exception:
+        return False
+    if list(jinja2.meta.find_referenced_templates(ast)):
+        return False
+    allowed = PILLAR_STATIC_VARIABLES | set(jinja_env.globals)
+    return jinja2.meta.find_undeclared_variables(ast) <= allowed
+
+
+def _static_pillar_envs(opts):
+    '''
+    Return the pillar environments whose SLS files render the same for all
+    the minions: they only use the renderers of the state render cache and
+    their templates neither use the grains, the pillar, the options or the
+    execution functions, nor import other templates.
+    '''
+    if opts.get('jinja_env') or opts.get('jinja_sls_env') \
+            or opts.get('ext_pillar_first') \
+            or '__env__' in opts['pillar_roots']:
+        return set()
+    jinja_env = jinja2.Environment(
+        extensions=['jinja2.ext.do', salt.utils.jinja.SerializerExtension])
+    ret = set()
+    for saltenv, roots in six.iteritems(opts['pillar_roots']):
+        static = True
+        for root in roots:
+            for dirpath, _, filenames in salt.utils.path.os_walk(root, followlinks=True):
+                for name in filenames:
+                    if not name.endswith('.sls'):
+                        continue
+                    if not _static_pillar_sls(jinja_env,
+                                              os.path.join(dirpath, name),
+                                              opts['renderer']):
+                        log.debug('Pillar SLS %s depends on the minion, '
+                                  'environment %s is compiled per minion',
+                                  os.path.join(dirpath, name), saltenv)
+                        static = False
+                        break
+                if not static:
+                    break
+            if not static:
+                break
+        if static:
+            ret.add(saltenv)
+    return ret
+
+
+class _SharedPillar(salt.pillar.Pillar):
+    '''
+    Pillar compiler reusing the top data and the rendered pillar SLS files
+    shared by a group of minions
+    '''
+    def __init__(self, *args, **kwargs):
+        self.shared_top = kwargs.pop('shared_top', None)
+        self.shared_render = kwargs.pop('shared_render', None)
+        super(_SharedPillar, self).__init__(*args, **kwargs)
+
+    def get_top(self):
+        if self.shared_top is not None:
+            return self.shared_top, []
+        return super(_SharedPillar, self).get_top()
+
+    def render_pillar(self, matches, errors=None):
+        if self.shared_render is None:
+            return super(_SharedPillar, self).render_pillar(matches, errors=errors)
+        if errors is None:
+            errors = []
+        key = repr(sorted(six.iteritems(matches)))
+        if key not in self.shared_render:
+            self.shared_render[key] = super(_SharedPillar, self).render_pillar(matches)
+        pillar, render_errors = copy.deepcopy(self.shared_render[key])
+        errors.extend(render_errors)
+        return pillar, errors
+
+
+def _compile_minion_pillars(task):
+    '''
+    Compile the pillar of a group of minions and store it in the caches,
+    return the number of times the SLS files were rendered and the errors by
+    minion
+    '''
+    opts, saltenv, pillarenv, top, shared, minions = task
+    cache = salt.cache.factory(opts)
+    shared_render = {} if shared else None
+    errors = {}
+    for minion_id, grains in minions:
+        pillar = _SharedPillar(opts, grains, minion_id, saltenv,
+                               pillarenv=pillarenv,
+                               shared_top=top,
+                               shared_render=shared_render).compile_pillar()
+        if pillar.get('_errors'):
+            errors[minion_id] = pillar['_errors']
+        if opts.get('minion_data_cache', False):
+            cache.store('minions/{0}'.format(minion_id), 'data',
+                        {'grains': grains, 'pillar': pillar})
+        if opts.get('pillar_cache', False):
+            salt.pillar.PillarCache(opts, grains, minion_id, saltenv,
+                                    pillarenv=pillarenv).store_pillar(pillar)
+    return len(shared_render) if shared else len(minions), errors
+
+
 class CacheTimer(Thread):
     '''
     A basic timer class the fires timer-events every second.
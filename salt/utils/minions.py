@@ -9,6 +9,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 import fnmatch
 import re
+import time
 import logging
 
 # Import salt libs
@@ -91,6 +92,19 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+def fetch_minions_cache(cache, minion_ids, key='data'):
+    '''
+    Fetch the ``key`` entry of the cache banks of several minions at once.
+
+    Return a dict mapping each minion ID to its cached data, which is an
+    empty dict for minions with nothing cached.
+    '''
+    banks = dict(('minions/{0}'.format(minion_id), minion_id)
+                 for minion_id in minion_ids)
+    return dict((banks[bank], mdata)
+                for bank, mdata in six.iteritems(cache.fetch_banks(banks, key)))
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     '''
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -182,6 +196,208 @@ def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
         return ret
 
 
+# Per-process listings of the PKI key directories, see pki_dir_minions
+_PKI_DIRS = {}
+
+# Per-process MinionDataIndex objects keyed by cache driver and cachedir
+_DATA_INDEXES = {}
+
+
+def pki_dir_minions(pki_dir):
+    '''
+    Return the sorted list of minion IDs which have a key in ``pki_dir``.
+
+    The listing is kept in memory by every process and is only read again
+    when the modification time of the directory changes, which happens
+    whenever a key is added to, renamed in or removed from it. While the keys
+    do not change a call costs a single ``stat`` of the directory, no matter
+    how many keys there are.
+
+    :raises OSError: If the directory can not be read
+    '''
+    now = time.time()
+    mtime = os.stat(pki_dir).st_mtime
+    cached = _PKI_DIRS.get(pki_dir)
+    # Changes made within a second of the last listing may share its mtime on
+    # filesystems with a coarse timestamp resolution, so such a listing is
+    # never trusted.
+    if cached is not None and cached[0] == mtime and cached[1] - mtime > 1:
+        return list(cached[2])
+    minions = []
+    for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(pki_dir)):
+        if not fn_.startswith('.') and os.path.isfile(os.path.join(pki_dir, fn_)):
+            minions.append(fn_)
+    _PKI_DIRS[pki_dir] = (mtime, now, minions)
+    return list(minions)
+
+
+class MinionDataIndex(object):
+    '''
+    In-memory inverted index over the grains and pillar stored in the minion
+    data cache.
+
+    For every minion the index records which top level grain and pillar keys
+    it has and the values found directly under those keys. This is enough to
+    resolve the common ``key:value`` targets with set lookups instead of
+    reading and matching the cached data of every minion. Other targets
+    (nested keys, globs and regular expressions) are narrowed down to the
+    minions which have the top level key before falling back to matching the
+    cached data.
+
+    Entries are checked against the update time reported by the cache driver
+    at most once every ``interval`` seconds, so only minions whose data
+    changed since they were indexed are read from the cache again.
+    '''
+    # Characters in a pattern which mean the lookup can not be answered with
+    # a plain comparison of the indexed values
+    NON_LITERAL_CHARS = '*?[]{}()'
+
+    def __init__(self, interval=0):
+        self.interval = interval
+        # {<search_type>: {<posting>: set(<minion_id>)}}
+        self.postings = {'grains': {}, 'pillar': {}}
+        # {<minion_id>: (<updated>, <indexed_at>, {<search_type>: set(<posting>)})}
+        self.minions = {}
+        # The minions whose data is fetched as None, which greedy targeting
+        # keeps like _check_cache_minions does
+        self.missing = set()
+        # When the update time of every indexed minion was last checked
+        self.checked = 0
+
+    @staticmethod
+    def _postings(data):
+        '''
+        Return the set of postings for the grains or pillar of a minion.
+
+        ``('has', key)`` is recorded for every top level key, ``('v', key,
+        value)`` for the lowercased text of a scalar, or of the scalar members
+        of a list, found under the key, and ``('k', key, subkey)`` for the
+        keys of a dict, or of the dict members of a list, found under the key.
+        These are exactly the comparisons subdict_match does for a
+        ``key:value`` expression.
+        '''
+        postings = set()
+        if not isinstance(data, dict):
+            return postings
+        for key, node in six.iteritems(data):
+            if not isinstance(key, six.string_types):
+                continue
+            postings.add(('has', key))
+            if isinstance(node, dict):
+                members = [node]
+            elif isinstance(node, (list, tuple)):
+                members = node
+            else:
+                postings.add(('v', key, six.text_type(node).lower()))
+                continue
+            for member in members:
+                if isinstance(member, dict):
+                    for subkey in member:
+                        if isinstance(subkey, six.string_types):
+                            postings.add(('k', key, subkey))
+                elif node is not member and not isinstance(member, (list, tuple)):
+                    postings.add(('v', key, six.text_type(member).lower()))
+        return postings
+
+    def add(self, minion_id, mdata, updated):
+        '''
+        Index the cached data of a minion, replacing what was indexed before
+
+        :param str minion_id: The minion ID
+        :param dict mdata: The ``data`` key of the minion's cache bank, None
+            if the minion has no data in the cache
+        :param int updated: The update time reported by the cache driver
+        '''
+        self.remove(minion_id)
+        if mdata is None:
+            self.missing.add(minion_id)
+        mdata = mdata or {}
+        entry = {}
+        for search_type, postings in six.iteritems(self.postings):
+            entry[search_type] = self._postings(mdata.get(search_type))
+            for posting in entry[search_type]:
+                postings.setdefault(posting, set()).add(minion_id)
+        self.minions[minion_id] = (updated, int(time.time()), entry)
+
+    def remove(self, minion_id):
+        '''
+        Drop a minion from the index
+        '''
+        self.missing.discard(minion_id)
+        try:
+            _, _, entry = self.minions.pop(minion_id)
+        except KeyError:
+            return
+        for search_type, postings in six.iteritems(self.postings):
+            for posting in entry[search_type]:
+                ids = postings[posting]
+                ids.discard(minion_id)
+                if not ids:
+                    del postings[posting]
+
+    def refresh(self, cache, minion_ids):
+        '''
+        Bring the index in line with the cached data of ``minion_ids``,
+        re-reading only the minions whose data was updated since it was
+        indexed. Minions which are not in ``minion_ids`` are dropped.
+
+        The minions already in the index are only checked again once
+        ``interval`` seconds have passed since they were last checked, new
+        minions are always read.
+        '''
+        minion_ids = set(minion_ids)
+        for minion_id in set(self.minions) - minion_ids:
+            self.remove(minion_id)
+        now = time.time()
+        if now - self.checked < self.interval:
+            minion_ids.difference_update(self.minions)
+        else:
+            self.checked = now
+        stale = {}
+        for minion_id in minion_ids:
+            bank = 'minions/{0}'.format(minion_id)
+            updated = cache.updated(bank, 'data')
+            entry = self.minions.get(minion_id)
+            # The driver reports whole seconds, so an entry indexed in the
+            # same second as the last update may have missed a later one
+            if entry is not None and entry[0] == updated \
+                    and (updated is None or updated < entry[1]):
+                continue
+            # Also read the minions without an update time, the driver
+            # decides whether their data comes back empty or as None
+            stale[bank] = (minion_id, updated)
+        if stale:
+            for bank, mdata in six.iteritems(cache.fetch_banks(stale, 'data')):
+                minion_id, updated = stale[bank]
+                self.add(minion_id, mdata, updated)
+
+    def lookup(self,
+               search_type,
+               expr,
+               delimiter=DEFAULT_TARGET_DELIM,
+               regex_match=False,
+               exact_match=False):
+        '''
+        Return a tuple of the set of indexed minions which may match the
+        grains or pillar expression ``expr`` and a boolean telling whether
+        that set is the final result or still has to be matched against the
+        cached data.
+        '''
+        postings = self.postings[search_type]
+        key, delim, pattern = expr.partition(delimiter)
+        if not delim:
+            # subdict_match never matches an expression without a delimiter
+            return set(), True
+        if regex_match \
+                or delimiter in pattern \
+                or pattern.startswith('*:') \
+                or (not exact_match and any(char in pattern for char in self.NON_LITERAL_CHARS)) \
+                or (exact_match and pattern == '*'):
+            return set(postings.get(('has', key), ())), False
+        return (postings.get(('v', key, pattern.lower()), set())
+                | postings.get(('k', key, pattern), set())), True
+
+
 class CkMinions(object):
     '''
     Used to check what minions should respond from a target
@@ -201,6 +417,35 @@ class CkMinions(object):
         else:
             self.acc = 'accepted'
 
+    @property
+    def data_index(self):
+        '''
+        The MinionDataIndex shared by all CkMinions objects in this process,
+        or None if ``minion_data_cache_index`` is disabled or the cache driver
+        can not tell when the data of a minion was last updated.
+        '''
+        if not self.opts.get('minion_data_cache', False) \
+                or not self.opts.get('minion_data_cache_index', False):
+            return None
+        if '{0}.updated'.format(self.cache.driver) not in self.cache.modules:
+            return None
+        key = (self.cache.driver, self.cache.cachedir)
+        if key not in _DATA_INDEXES:
+            _DATA_INDEXES[key] = MinionDataIndex(
+                self.opts.get('minion_data_cache_index_interval', 0))
+        return _DATA_INDEXES[key]
+
+    def update_data_index(self, minion_id, mdata):
+        '''
+        Update the data index with minion data which was just stored in the
+        minion data cache
+        '''
+        index = self.data_index
+        if index is not None:
+            index.add(minion_id,
+                      mdata,
+                      self.cache.updated('minions/{0}'.format(minion_id), 'data'))
+
     def _check_nodegroup_minions(self, expr, greedy):  # pylint: disable=unused-argument
         '''
         Return minions found by looking at nodegroups
@@ -222,7 +467,7 @@ class CkMinions(object):
         '''
         if isinstance(expr, six.string_types):
             expr = [m for m in expr.split(',') if m]
-        minions = self._pki_minions()
+        minions = set(self._pki_minions())
         return {'minions': [x for x in expr if x in minions],
                 'missing': [x for x in expr if x not in minions]}
 
@@ -251,9 +496,7 @@ class CkMinions(object):
                 with salt.utils.files.fopen(pki_cache_fn) as fn_:
                     return self.serial.load(fn_)
             else:
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        minions.append(fn_)
+                minions = pki_dir_minions(os.path.join(self.opts['pki_dir'], self.acc))
             return minions
         except OSError as exc:
             log.error(
@@ -280,10 +523,7 @@ class CkMinions(object):
             return self.cache.list('minions')
 
         if greedy:
-            minions = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                    minions.append(fn_)
+            minions = pki_dir_minions(os.path.join(self.opts['pki_dir'], self.acc))
         elif cache_enabled:
             minions = list_cached_minions()
         else:
@@ -299,10 +539,27 @@ class CkMinions(object):
                 return {'minions': minions,
                         'missing': []}
             minions = set(minions)
-            for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            index = self.data_index
+            if index is not None:
+                index.refresh(self.cache, cminions)
+                candidates, complete = index.lookup(search_type,
+                                                    expr,
+                                                    delimiter=delimiter,
+                                                    regex_match=regex_match,
+                                                    exact_match=exact_match)
+                # Cached minions which are not candidates can not match,
+                # but greedy targeting keeps the minions without data
+                excluded = set(index.minions) - candidates
+                if greedy:
+                    excluded -= index.missing
+                minions.difference_update(excluded)
+                if complete:
+                    return {'minions': list(minions),
+                            'missing': []}
+                cminions = candidates
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            for id_, mdata in six.iteritems(fetch_minions_cache(self.cache, cminions)):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -398,8 +655,7 @@ class CkMinions(object):
             proto = 'ipv{0}'.format(tgt.version)
 
             minions = set(minions)
-            for id_ in cminions:
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            for id_, mdata in six.iteritems(fetch_minions_cache(self.cache, cminions)):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -437,11 +693,7 @@ class CkMinions(object):
             )
             cache_enabled = self.opts.get('minion_data_cache', False)
             if greedy:
-                mlist = []
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        mlist.append(fn_)
-                return {'minions': mlist,
+                return {'minions': pki_dir_minions(os.path.join(self.opts['pki_dir'], self.acc)),
                         'missing': []}
             elif cache_enabled:
                 return {'minions': self.cache.list('minions'),
@@ -646,15 +898,21 @@ class CkMinions(object):
                 addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
             if subset:
                 search = subset
-            for id_ in search:
-                try:
-                    mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
-                except SaltCacheError:
-                    # If a SaltCacheError is explicitly raised during the fetch operation,
-                    # permission was denied to open the cached data.p file. Continue on as
-                    # in the releases <= 2016.3. (An explicit error raise was added in PR
-                    # #35388. See issue #36867 for more information.
-                    continue
+            try:
+                cached = fetch_minions_cache(self.cache, search)
+            except SaltCacheError:
+                # Fetch the minions one by one to skip only the unreadable ones
+                cached = {}
+                for id_ in search:
+                    try:
+                        cached[id_] = self.cache.fetch('minions/{0}'.format(id_), 'data')
+                    except SaltCacheError:
+                        # If a SaltCacheError is explicitly raised during the fetch operation,
+                        # permission was denied to open the cached data.p file. Continue on as
+                        # in the releases <= 2016.3. (An explicit error raise was added in PR
+                        # #35388. See issue #36867 for more information.
+                        continue
+            for id_, mdata in six.iteritems(cached):
                 if mdata is None:
                     continue
                 grains = mdata.get('grains', {})
@@ -678,11 +936,8 @@ class CkMinions(object):
         '''
         Return a list of all minions that have auth'd
         '''
-        mlist = []
-        for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-            if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                mlist.append(fn_)
-        return {'minions': mlist, 'missing': []}
+        return {'minions': pki_dir_minions(os.path.join(self.opts['pki_dir'], self.acc)),
+                'missing': []}
 
     def check_minions(self,
                       expr,
@@ -1165,9 +1420,7 @@ def mine_get(tgt, fun, tgt_type='glob', opts=None):
     else:
         return {}
 
-    for minion in minions:
-        mdata = cache.fetch('minions/{0}'.format(minion), 'mine')
-
+    for minion, mdata in six.iteritems(fetch_minions_cache(cache, minions, 'mine')):
         if not isinstance(mdata, dict):
             continue
 
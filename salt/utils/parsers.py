@@ -1991,7 +1991,9 @@ class SaltCMDOptionParser(six.with_metaclass(OptionParserMeta,
             dest='batch',
             help=('Execute the salt job in batch mode, pass either the number '
                   'of minions to batch at a time, or the percentage of '
-                  'minions to have running.')
+                  'minions to have running, or the smallest and the largest '
+                  'of either separated by a colon, like 5:20, for a window '
+                  'growing as the minions succeed.')
         )
         self.add_option(
             '--batch-wait',
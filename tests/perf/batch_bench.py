@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+'''
+Run a batch job on simulated minions, most of them quick and a few of them
+slow or down, with the legacy batch loop and with the batch engine, and report
+how long the runs take.
+
+    python tests/perf/batch_bench.py --minions 100 --batch 10 --slow 10
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import random
+import time
+
+# Import Salt libs
+import salt.payload
+import salt.utils.event
+import salt.utils.stringutils
+import salt.cli.batch
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
+from tests.support.mock import MagicMock, patch
+
+# Import 3rd-party libs
+import tornado.gen
+
+
+class Minions(object):
+    '''
+    The delays of the simulated minions to answer the ping and to run the
+    job, None for the minions which are down
+    '''
+    def __init__(self, args):
+        rand = random.Random(args.seed)
+        self.ping = {}
+        self.run = {}
+        for num in range(args.minions):
+            minion = 'minion{0:04d}'.format(num)
+            if num < args.down:
+                self.ping[minion] = None
+                continue
+            self.ping[minion] = rand.uniform(0, args.ping_delay)
+            if num < args.down + args.slow:
+                self.run[minion] = args.slow_delay
+            else:
+                self.run[minion] = rand.uniform(0, args.delay)
+
+
+class LegacyClient(object):
+    '''
+    Answer the calls of the legacy batch loop
+    '''
+    def __init__(self, minions):
+        self.minions = minions
+
+    def cmd_iter(self, tgt, fun, arg, timeout, tgt_type, **kwargs):
+        start = time.time()
+        yield {'minions': sorted(self.minions.ping), 'jid': '1'}
+        answers = sorted((delay, minion) for minion, delay in self.minions.ping.items()
+                         if delay is not None)
+        for delay, minion in answers:
+            time.sleep(max(start + delay - time.time(), 0))
+            yield {minion: {'ret': True}}
+        if len(answers) < len(self.minions.ping):
+            # wait on the minions which are down
+            time.sleep(max(start + timeout - time.time(), 0))
+
+    def cmd_iter_no_block(self, tgt, fun, arg, timeout, tgt_type, **kwargs):
+        start = time.time()
+        pending = set(tgt)
+        while pending:
+            done = [minion for minion in pending
+                    if start + self.minions.run[minion] <= time.time()]
+            if not done:
+                yield None
+            for minion in done:
+                pending.discard(minion)
+                yield {minion: {'ret': True, 'retcode': 0}}
+
+
+class EngineClient(object):
+    '''
+    Answer the publications of the batch engine with events
+    '''
+    def __init__(self, minions, io_loop):
+        self.minions = minions
+        self.io_loop = io_loop
+        self.event = MagicMock()
+        self.serial = salt.payload.Serial({'serial': 'msgpack'})
+
+    def _send(self, delay, data, tag):
+        raw = salt.utils.stringutils.to_bytes(tag) + \
+            salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND) + \
+            self.serial.dumps(data)
+        handler = self.event.set_event_handler.call_args[0][0]
+        self.io_loop.call_later(delay, handler, raw)
+
+    @tornado.gen.coroutine
+    def run_job_async(self, tgt, fun, arg, tgt_type, jid='', **kwargs):
+        if fun == 'test.ping':
+            for minion, delay in self.minions.ping.items():
+                if delay is not None:
+                    self._send(delay, {'id': minion, 'return': True},
+                               'salt/job/{0}/ret/{1}'.format(jid, minion))
+            raise tornado.gen.Return({'jid': jid, 'minions': sorted(self.minions.ping)})
+        for minion in tgt:
+            self._send(self.minions.run[minion],
+                       {'id': minion, 'jid': jid, 'return': True, 'retcode': 0},
+                       'salt/job/{0}/ret/{1}'.format(jid, minion))
+        raise tornado.gen.Return({'jid': jid, 'minions': tgt})
+
+
+def run(name, batch_class, make_client, opts):
+    clients = []
+
+    def get_local_client(conf_file, io_loop=None):
+        clients.append(make_client(io_loop))
+        return clients[-1]
+
+    with patch('salt.client.get_local_client', get_local_client):
+        start = time.time()
+        batch = batch_class(opts, quiet=True)
+        count = len(list(batch.run()))
+        duration = time.time() - start
+    print('{0}: {1} returns in {2:.2f} s'.format(name, count, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--minions', type=int, default=100,
+                        help='Number of minions targeted')
+    parser.add_argument('--batch', default='10',
+                        help='Batch size of the run, like 10, 10%% or 5:20')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Largest run time of the quick minions')
+    parser.add_argument('--slow', type=int, default=10,
+                        help='Number of slow minions')
+    parser.add_argument('--slow-delay', type=float, default=3,
+                        help='Run time of the slow minions')
+    parser.add_argument('--down', type=int, default=2,
+                        help='Number of minions which do not answer the ping')
+    parser.add_argument('--ping-delay', type=float, default=0.2,
+                        help='Largest time of the minions to answer the ping')
+    parser.add_argument('--timeout', type=float, default=5,
+                        help='Timeout of the ping and of the job')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the simulated delays')
+    args = parser.parse_args()
+
+    minions = Minions(args)
+    opts = {'conf_file': None,
+            'tgt': '*',
+            'fun': 'test.sleep',
+            'arg': [],
+            'batch': args.batch,
+            'timeout': args.timeout,
+            'gather_job_timeout': args.timeout}
+    if ':' not in args.batch:
+        run('legacy batch', salt.cli.batch.LegacyBatch,
+            lambda io_loop: LegacyClient(minions), dict(opts))
+    run('batch engine', salt.cli.batch.Batch,
+        lambda io_loop: EngineClient(minions, io_loop), dict(opts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+'''
+Compare reading the minion data cache one minion at a time with the batched
+Cache.fetch_banks for a large number of minions.
+
+    python tests/perf/cache_fetch_bench.py --minions 5000
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.cache
+import salt.config
+import salt.utils.minions
+
+
+def _time(func, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        func()
+    return (time.time() - start) * 1000 / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--minions', type=int, default=2000,
+                        help='Number of cached minions')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    cachedir = tempfile.mkdtemp()
+    try:
+        opts = salt.config.master_config(None)
+        opts['cachedir'] = cachedir
+        cache = salt.cache.Cache(opts)
+        minion_ids = ['minion{0}'.format(idx) for idx in range(args.minions)]
+        for minion_id in minion_ids:
+            cache.store('minions/{0}'.format(minion_id), 'data',
+                        {'grains': {'id': minion_id, 'os': 'Ubuntu', 'num_cpus': 4},
+                         'pillar': {'role': 'web'}})
+
+        def fetch():
+            for minion_id in minion_ids:
+                cache.fetch('minions/{0}'.format(minion_id), 'data')
+
+        print('{0:>20}: {1:10.1f} ms'.format('fetch', _time(fetch, args.rounds)))
+        print('{0:>20}: {1:10.1f} ms'.format(
+            'fetch_banks',
+            _time(lambda: salt.utils.minions.fetch_minions_cache(cache, minion_ids),
+                  args.rounds)))
+    finally:
+        shutil.rmtree(cachedir)
+
+
+if __name__ == '__main__':
+    main()
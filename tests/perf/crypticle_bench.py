@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the encrypt and decrypt throughput of the session ciphers for
+payloads from 100 bytes to 50 megabytes.
+
+"aes-cbc-hmac" is the default AES-192-CBC plus HMAC-SHA256 Crypticle,
+"aes-gcm" the single pass AES-256-GCM one enabled with session_cipher.
+
+    python tests/perf/crypticle_bench.py --rounds 20
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import os
+import time
+
+# Import Salt libs
+import salt.crypt
+
+
+def _throughput(func, data, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        func(data)
+    return len(data) * rounds / (time.time() - start) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=10,
+                        help='Operations per payload size')
+    args = parser.parse_args()
+
+    opts = {'serial': 'msgpack'}
+    print('{0:>14} {1:>10} {2:>14} {3:>14}'.format(
+        'cipher', 'bytes', 'encrypt MB/s', 'decrypt MB/s'))
+    for cipher in salt.crypt.Crypticle.supported_ciphers():
+        crypticle = salt.crypt.Crypticle(
+            opts, salt.crypt.Crypticle.generate_key_string(cipher=cipher))
+        for size in (100, 10 * 1024, 1024 * 1024, 50 * 1024 * 1024):
+            data = os.urandom(size)
+            rounds = max(1, args.rounds if size < 1024 * 1024 else args.rounds // 5)
+            encrypted = crypticle.encrypt(data)
+            print('{0:>14} {1:>10} {2:>14.1f} {3:>14.1f}'.format(
+                cipher,
+                size,
+                _throughput(crypticle.encrypt, data, rounds),
+                _throughput(crypticle.decrypt, encrypted, rounds)))
+
+
+if __name__ == '__main__':
+    main()
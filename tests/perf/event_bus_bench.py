@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+'''
+Fire job return events at the master event bus from several processes while
+several listeners receive all of them, with the events published by 1, 2, 4
+and 8 event publisher shards, and report the events received per second.
+
+    python tests/perf/event_bus_bench.py --events 5000 --firers 4 --listeners 8
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.utils.event
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
+
+
+def _fire(sock_dir, opts, start, index, events):
+    event = salt.utils.event.MasterEvent(sock_dir, opts=opts, listen=False)
+    start.wait()
+    for num in range(events):
+        jid = '2018{0:04d}{1:08d}'.format(index, num // 100)
+        event.fire_event({'id': 'minion{0}'.format(num % 100),
+                          'jid': jid,
+                          'fun': 'test.ping',
+                          'return': 'x' * 200},
+                         'salt/job/{0}/ret/minion{1}'.format(jid, num % 100))
+    event.destroy()
+
+
+def _listen(sock_dir, opts, ready, total, results):
+    event = salt.utils.event.MasterEvent(sock_dir, opts=opts, listen=True)
+    ready.release()
+    received = 0
+    while received < total:
+        if event.get_event(wait=10, full=True) is None:
+            break
+        received += 1
+    results.put((received, time.time()))
+    event.destroy()
+
+
+def run(sock_dir, shards, args):
+    opts = {'sock_dir': sock_dir, 'event_publisher_shards': shards}
+    publishers = [salt.utils.event.EventPublisher(opts, shard=shard)
+                  for shard in range(shards)]
+    for publisher in publishers:
+        publisher.start()
+    time.sleep(2)
+    total = args.events * args.firers
+    ready = multiprocessing.Semaphore(0)
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    listeners = [
+        multiprocessing.Process(target=_listen,
+                                args=(sock_dir, opts, ready, total, results))
+        for _ in range(args.listeners)]
+    firers = [
+        multiprocessing.Process(target=_fire,
+                                args=(sock_dir, opts, start, index, args.events))
+        for index in range(args.firers)]
+    try:
+        for proc in listeners + firers:
+            proc.start()
+        for _ in listeners:
+            ready.acquire()
+        time.sleep(1)
+        begin = time.time()
+        start.set()
+        received = []
+        end = begin
+        for _ in listeners:
+            count, done = results.get()
+            received.append(count)
+            end = max(end, done)
+        duration = end - begin
+        print('{0} shard(s): {1:.0f} events/s received by each listener, '
+              '{2:.2f} s{3}'.format(
+                  shards, total / duration, duration,
+                  '' if min(received) == total else
+                  ', {0} events lost'.format(total - min(received))))
+    finally:
+        for proc in listeners + firers + publishers:
+            proc.terminate()
+            proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=5000,
+                        help='Number of events fired by each firer')
+    parser.add_argument('--firers', type=int, default=4,
+                        help='Number of processes firing events')
+    parser.add_argument('--listeners', type=int, default=8,
+                        help='Number of processes listening to all the events')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Numbers of event publisher shards to compare')
+    args = parser.parse_args()
+
+    sock_dir = tempfile.mkdtemp()
+    try:
+        for shards in args.shards:
+            run(sock_dir, shards, args)
+    finally:
+        shutil.rmtree(sock_dir)
+
+
+if __name__ == '__main__':
+    main()
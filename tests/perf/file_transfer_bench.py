@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+'''
+Pull a large file through RemoteClient.get_file over a simulated high-latency
+link, one chunk request at a time and with several requests in flight.
+
+The link is a local file server channel which waits for the round trip time
+before answering each request.
+
+    python tests/perf/file_transfer_bench.py --size 1024 --latency 0.02 --window 8
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.fileclient
+import salt.fileserver
+import salt.transport
+import salt.utils.files
+
+
+class LatencyChannel(salt.fileserver.FSChan):
+    '''
+    A local file server channel answering after the round trip time
+    '''
+    latency = 0
+
+    def send(self, load, tries=None, timeout=None, raw=False):
+        time.sleep(self.latency)
+        return super(LatencyChannel, self).send(load, tries, timeout, raw)
+
+
+def _write_file(path, size):
+    block = os.urandom(1024 * 1024)
+    with salt.utils.files.fopen(path, 'wb') as fp_:
+        for _ in range(size):
+            fp_.write(block)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=1024,
+                        help='Size of the file in MiB')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Round trip time of the link in seconds')
+    parser.add_argument('--window', type=int, default=8,
+                        help='Number of chunk requests in flight')
+    parser.add_argument('--buffer', type=int, default=1048576,
+                        help='Chunk size of the file server in bytes')
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        file_root = os.path.join(root_dir, 'files')
+        os.makedirs(file_root)
+        _write_file(os.path.join(file_root, 'big.bin'), args.size)
+        opts = salt.config.minion_config(None)
+        opts.update({'root_dir': root_dir,
+                     'cachedir': os.path.join(root_dir, 'cache'),
+                     'file_roots': {'base': [file_root]},
+                     'fileserver_backend': ['roots'],
+                     'file_buffer_size': args.buffer,
+                     'hash_type': 'sha256'})
+        LatencyChannel.latency = args.latency
+        salt.transport.Channel.factory = staticmethod(
+            lambda opts, **kwargs: LatencyChannel(opts))
+        chunks = -(-args.size * 1024 * 1024 // args.buffer)
+        print('{0} MiB in {1} chunks, {2:.3f} s round trip'.format(
+            args.size, chunks, args.latency))
+        for window in (1, args.window):
+            opts['file_transfer_window'] = window
+            client = salt.fileclient.RemoteClient(opts)
+            dest = os.path.join(root_dir, 'dest-{0}.bin'.format(window))
+            start = time.time()
+            ret = client.get_file('salt://big.bin', dest)
+            duration = time.time() - start
+            print('window {0}: {1:.2f} s, {2:.1f} MiB/s{3}'.format(
+                window, duration, args.size / duration,
+                '' if ret == dest else ', FAILED'))
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+'''
+Compile and run a synthetic highstate of a few thousand states with
+test=True and report the time spent.
+
+Every state requires the previous one by ID, every tenth one also requires
+a state by name and a whole SLS file, and every hundredth one uses a glob
+and a require_in. ``--scan`` resolves the requisites by matching every
+chunk as was done before the requisite index.
+
+    python tests/perf/highstate_bench.py --states 5000
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.state
+from salt.utils.odict import OrderedDict
+
+
+def _high(count):
+    high = OrderedDict()
+    for idx in range(count):
+        args = ['succeed_without_changes', {'name': 'name{0:05d}'.format(idx)}]
+        requires = []
+        if idx:
+            requires.append('state{0:05d}'.format(idx - 1))
+        if idx % 10 == 0 and idx >= 20:
+            requires.append({'test': 'name{0:05d}'.format(idx - 15)})
+            requires.append({'sls': 'sls{0}'.format(idx // 100 - 1)} if idx >= 200
+                            else {'test': 'name00000'})
+        if idx % 100 == 50:
+            requires.append({'test': 'name{0:03d}[0-3]*'.format(idx // 100)})
+            args.append({'require_in': ['state{0:05d}'.format(idx + 1)]})
+        if requires:
+            args.append({'require': requires})
+        high['state{0:05d}'.format(idx)] = OrderedDict([
+            ('test', args),
+            ('__sls__', 'sls{0}'.format(idx // 100)),
+            ('__env__', 'base')])
+    return high
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--states', type=int, default=5000,
+                        help='Number of states in the highstate')
+    parser.add_argument('--scan', action='store_true',
+                        help='Match every requisite against every chunk')
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        opts = salt.config.minion_config(None)
+        opts.update({'file_client': 'local',
+                     'root_dir': root_dir,
+                     'cachedir': root_dir,
+                     'pillar_roots': {'base': [root_dir]},
+                     'file_roots': {'base': [root_dir]},
+                     'state_events': False,
+                     'test': True})
+        state = salt.state.State(opts)
+        if args.scan:
+            salt.state.RequisiteIndex.match = salt.state.RequisiteIndex.scan
+        high = _high(args.states)
+        start = time.time()
+        ret = state.call_high(high)
+        duration = time.time() - start
+        failed = [tag for tag, val in ret.items() if val['result'] is False]
+        print('{0} states, {1} failed: {2:.2f} s'.format(len(ret), len(failed), duration))
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the local_cache and sqlite3_local_cache master job caches with a
+large number of cached jobs.
+
+Each job has a load, a minion list and one return per minion. The times are
+for storing all jobs, listing the 50 most recent ones with get_jids_filter,
+loading one job and running clean_old_jobs when nothing has expired.
+
+    python tests/perf/job_cache_bench.py --jobs 20000
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.returners.local_cache
+import salt.returners.sqlite3_local_cache
+
+
+def _time(func, *args):
+    start = time.time()
+    func(*args)
+    return (time.time() - start) * 1000
+
+
+def run(module, jobs, minions):
+    cachedir = tempfile.mkdtemp()
+    module.__opts__ = {'cachedir': cachedir,
+                       'keep_jobs': 24,
+                       'serial': 'msgpack',
+                       'hash_type': 'sha256'}
+    try:
+        def store():
+            for idx in range(jobs):
+                jid = module.prep_jid()
+                module.save_load(jid, {'fun': 'test.arg', 'arg': [idx], 'tgt': minions,
+                                       'tgt_type': 'list', 'user': 'root', 'jid': jid},
+                                 minions=minions)
+                for minion in minions:
+                    module.returner({'jid': jid, 'id': minion, 'return': idx,
+                                     'retcode': 0, 'success': True})
+            return jid
+        start = time.time()
+        jid = store()
+        timings = [(time.time() - start) * 1000]
+        timings.append(_time(module.get_jids_filter, 50))
+        timings.append(_time(module.get_load, jid))
+        timings.append(_time(module.clean_old_jobs))
+        return timings
+    finally:
+        shutil.rmtree(cachedir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=5000,
+                        help='Number of cached jobs')
+    parser.add_argument('--minions', type=int, default=3,
+                        help='Returns per job')
+    args = parser.parse_args()
+
+    minions = ['minion{0}'.format(idx) for idx in range(args.minions)]
+    print('{0:>20} {1:>12} {2:>12} {3:>12} {4:>12}'.format(
+        'job cache', 'store ms', 'filter ms', 'load ms', 'clean ms'))
+    for module in (salt.returners.local_cache, salt.returners.sqlite3_local_cache):
+        print('{0:>20} {1:>12.1f} {2:>12.2f} {3:>12.2f} {4:>12.2f}'.format(
+            module.__name__.rsplit('.', 1)[-1], *run(module, args.jobs, minions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the per-call cost of listing the accepted minion keys for 1k, 10k and
+50k keys.
+
+The "listdir" column is the old listdir plus isfile scan done on every target
+check, "cached" is salt.utils.minions.pki_dir_minions once the listing is in
+memory.
+
+    python tests/perf/pki_minions_bench.py
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.utils.data
+import salt.utils.files
+import salt.utils.minions
+
+
+def listdir_minions(pki_dir):
+    '''
+    The listing as it was done before it was cached
+    '''
+    minions = []
+    for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(pki_dir)):
+        if not fn_.startswith('.') and os.path.isfile(os.path.join(pki_dir, fn_)):
+            minions.append(fn_)
+    return minions
+
+
+def _time(func, pki_dir, calls):
+    start = time.time()
+    for _ in range(calls):
+        func(pki_dir)
+    return (time.time() - start) * 1000 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20,
+                        help='Listings per key count')
+    args = parser.parse_args()
+
+    print('{0:>8} {1:>14} {2:>14}'.format('keys', 'listdir ms', 'cached ms'))
+    for count in (1000, 10000, 50000):
+        pki_dir = tempfile.mkdtemp()
+        try:
+            for idx in range(count):
+                with salt.utils.files.fopen(os.path.join(pki_dir, 'minion{0}'.format(idx)), 'w'):
+                    pass
+            # Leave the directory alone long enough for the listing to be trusted
+            mtime = time.time() - 10
+            os.utime(pki_dir, (mtime, mtime))
+            salt.utils.minions.pki_dir_minions(pki_dir)
+            print('{0:>8} {1:>14.3f} {2:>14.3f}'.format(
+                count,
+                _time(listdir_minions, pki_dir, args.calls),
+                _time(salt.utils.minions.pki_dir_minions, pki_dir, args.calls)))
+        finally:
+            shutil.rmtree(pki_dir)
+
+
+if __name__ == '__main__':
+    main()
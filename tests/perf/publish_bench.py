@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how many jobs per second an MWorker can hand to the zeromq publish
+daemon.
+
+The "oneshot" mode reproduces the old behaviour of building a new context,
+socket and Crypticle for every publish, "persistent" uses the long-lived
+publisher socket of ZeroMQPubServerChannel.
+
+    python tests/perf/publish_bench.py -n 20000
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import threading
+import time
+
+# Import Salt libs
+import salt.crypt
+import salt.master
+import salt.payload
+import salt.transport.zeromq
+from salt.utils.zeromq import zmq
+
+from tests.support.helpers import get_unused_localhost_port
+from tests.support.mock import MagicMock
+
+
+def _drain(pull_sock, count, done):
+    for _ in range(count):
+        pull_sock.recv()
+    done.set()
+
+
+def oneshot_publish(opts, serial, load):
+    '''
+    The publish path as it was before the socket was kept open
+    '''
+    crypticle = salt.crypt.Crypticle(opts, salt.master.SMaster.secrets['aes']['secret'].value)
+    payload = {'enc': 'aes', 'load': crypticle.dumps(load)}
+    context = zmq.Context(1)
+    pub_sock = context.socket(zmq.PUSH)
+    pub_sock.connect('tcp://127.0.0.1:{0}'.format(opts['tcp_master_publish_pull']))
+    pub_sock.send(serial.dumps({'payload': serial.dumps(payload)}))
+    pub_sock.close()
+    context.term()
+
+
+def run(mode, opts, count):
+    context = zmq.Context()
+    pull_sock = context.socket(zmq.PULL)
+    pull_sock.bind('tcp://127.0.0.1:{0}'.format(opts['tcp_master_publish_pull']))
+    done = threading.Event()
+    drainer = threading.Thread(target=_drain, args=(pull_sock, count, done))
+    drainer.daemon = True
+    drainer.start()
+
+    load = {'tgt_type': 'glob', 'tgt': '*', 'fun': 'test.ping', 'arg': [], 'jid': '20181016000000000000'}
+    serial = salt.payload.Serial(opts)
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
+    start = time.time()
+    for _ in range(count):
+        if mode == 'oneshot':
+            oneshot_publish(opts, serial, load)
+        else:
+            channel.publish(load)
+    done.wait()
+    elapsed = time.time() - start
+    channel.pub_close()
+    pull_sock.close(linger=0)
+    context.term()
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-n', '--count', type=int, default=10000,
+                        help='Number of jobs to publish per mode')
+    args = parser.parse_args()
+
+    opts = {'ipc_mode': 'tcp',
+            'tcp_master_publish_pull': get_unused_localhost_port(),
+            'sign_pub_messages': False,
+            'zmq_filtering': False,
+            'serial': 'msgpack',
+            'cachedir': '/tmp',
+            'cache': 'localfs',
+            'pki_dir': '/tmp',
+            'sock_dir': '/tmp'}
+    salt.master.SMaster.secrets['aes'] = {
+        'secret': MagicMock(value=salt.crypt.Crypticle.generate_key_string())
+    }
+    for mode in ('oneshot', 'persistent'):
+        print('{0:>10}: {1:10.1f} publishes/sec'.format(mode, run(mode, opts, args.count)))
+
+
+if __name__ == '__main__':
+    main()
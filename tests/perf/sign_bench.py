@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the per-message cost of signing publications on the master and of
+verifying them on the minion.
+
+"sign_message" and "verify (reload)" load the key from disk for every
+message as was done before, "MessageSigner" and "verify (cached)" keep the
+key in memory.
+
+    python tests/perf/sign_bench.py -n 500
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.crypt
+
+
+def _time(func, count):
+    start = time.time()
+    for _ in range(count):
+        func()
+    return (time.time() - start) * 1000000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-n', '--count', type=int, default=200,
+                        help='Messages per mode')
+    parser.add_argument('--payload-size', type=int, default=4096,
+                        help='Size in bytes of the signed payload')
+    parser.add_argument('--keysize', type=int, default=2048)
+    args = parser.parse_args()
+
+    pki_dir = tempfile.mkdtemp()
+    try:
+        salt.crypt.gen_keys(pki_dir, 'master', args.keysize)
+        priv = os.path.join(pki_dir, 'master.pem')
+        pub = os.path.join(pki_dir, 'master.pub')
+        message = os.urandom(args.payload_size)
+        signer = salt.crypt.MessageSigner(priv)
+        sig = signer.sign(message)
+
+        def verify_reload():
+            salt.crypt._RSA_PUB_KEYS.clear()
+            salt.crypt.verify_signature(pub, message, sig)
+
+        for name, func in (
+                ('sign_message', lambda: salt.crypt.sign_message(priv, message)),
+                ('MessageSigner', lambda: signer.sign(message)),
+                ('verify (reload)', verify_reload),
+                ('verify (cached)', lambda: salt.crypt.verify_signature(pub, message, sig))):
+            print('{0:>16}: {1:10.1f} us/message'.format(name, _time(func, args.count)))
+    finally:
+        shutil.rmtree(pki_dir)
+
+
+if __name__ == '__main__':
+    main()
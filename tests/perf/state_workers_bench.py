@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+'''
+Run a synthetic highstate of mostly independent states, serially and on the
+state workers, and report the time spent next to its critical path.
+
+Every state sleeps, a few of them form a chain of requires which is the
+critical path of the run.
+
+    python tests/perf/state_workers_bench.py --states 40 --chain 4 --workers 8
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.loader
+import salt.state
+from salt.utils.odict import OrderedDict
+
+
+def _high(count, chain, sleep):
+    high = OrderedDict()
+    for idx in range(count):
+        args = [{'name': 'sleep {0}'.format(sleep)}]
+        if 0 < idx < chain:
+            args.append({'require': ['state{0:04d}'.format(idx - 1)]})
+        high['state{0:04d}'.format(idx)] = OrderedDict([
+            ('cmd', ['run'] + args),
+            ('__sls__', 'sls{0}'.format(idx % 10)),
+            ('__env__', 'base')])
+    return high
+
+
+def _run(opts, high):
+    state = salt.state.State(opts)
+    start = time.time()
+    ret = state.call_high(high)
+    duration = time.time() - start
+    failed = [tag for tag, val in ret.items() if val['result'] is False]
+    return len(ret), len(failed), duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--states', type=int, default=40,
+                        help='Number of states in the highstate')
+    parser.add_argument('--chain', type=int, default=4,
+                        help='Number of states requiring each other')
+    parser.add_argument('--sleep', type=float, default=0.25,
+                        help='Seconds each state sleeps')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of state workers')
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        opts = salt.config.minion_config(None)
+        opts.update({'file_client': 'local',
+                     'root_dir': root_dir,
+                     'cachedir': root_dir,
+                     'pillar_roots': {'base': [root_dir]},
+                     'file_roots': {'base': [root_dir]},
+                     'state_events': False})
+        opts['grains'] = salt.loader.grains(opts)
+        high = _high(args.states, args.chain, args.sleep)
+        print('critical path: {0:.2f} s'.format(
+            max(args.chain * args.sleep, args.states * args.sleep / args.workers)))
+        for workers in (0, args.workers):
+            opts['state_workers'] = workers
+            count, failed, duration = _run(opts, high)
+            print('{0} workers, {1} states, {2} failed: {3:.2f} s'.format(
+                workers, count, failed, duration))
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    main()
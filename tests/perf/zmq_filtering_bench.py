@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the cost of a zmq_filtering publish in the publish daemon as the
+number of targeted minions grows.
+
+The "copy" mode reproduces the old loop which handed the payload bytes to
+zmq once per targeted minion, "frame" uses the shared zero-copy frame of
+ZeroMQPubServerChannel._publish_filtered.
+
+    python tests/perf/zmq_filtering_bench.py --payload-size 65536
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import argparse
+import hashlib
+import os
+import threading
+import time
+
+# Import Salt libs
+import salt.transport.zeromq
+import salt.utils.stringutils
+from salt.utils.zeromq import zmq
+
+
+def copy_publish(pub_sock, payload, topic_lst):
+    '''
+    The fan-out as it was before the payload frame was shared
+    '''
+    for topic in topic_lst:
+        htopic = salt.utils.stringutils.to_bytes(
+            hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest()
+        )
+        pub_sock.send(htopic, flags=zmq.SNDMORE)
+        pub_sock.send(payload)
+
+
+def _drain(sub_sock, stop):
+    while not stop.is_set():
+        if sub_sock.poll(100):
+            sub_sock.recv_multipart()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--payload-size', type=int, default=4096,
+                        help='Size in bytes of the encrypted payload')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='Publishes per target size')
+    args = parser.parse_args()
+
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(
+        {'serial': 'msgpack', 'cachedir': '/tmp', 'cache': 'localfs'}
+    )
+    context = zmq.Context()
+    pub_sock = context.socket(zmq.PUB)
+    pub_sock.setsockopt(zmq.SNDHWM, 0)
+    pub_sock.bind('inproc://zmq_filtering_bench')
+    sub_sock = context.socket(zmq.SUB)
+    sub_sock.setsockopt(zmq.RCVHWM, 0)
+    sub_sock.setsockopt(zmq.SUBSCRIBE, b'')
+    sub_sock.connect('inproc://zmq_filtering_bench')
+    stop = threading.Event()
+    drainer = threading.Thread(target=_drain, args=(sub_sock, stop))
+    drainer.daemon = True
+    drainer.start()
+    time.sleep(0.2)
+
+    payload = os.urandom(args.payload_size)
+    print('{0:>8} {1:>12} {2:>12}'.format('targets', 'copy ms', 'frame ms'))
+    for size in (1, 10, 100, 1000, 5000, 20000):
+        topic_lst = ['minion{0}'.format(idx) for idx in range(size)]
+        timings = []
+        for func in (copy_publish, channel._publish_filtered):
+            start = time.time()
+            for _ in range(args.rounds):
+                func(pub_sock, payload, topic_lst)
+            timings.append((time.time() - start) * 1000 / args.rounds)
+        print('{0:>8} {1:>12.2f} {2:>12.2f}'.format(size, *timings))
+
+    stop.set()
+    drainer.join()
+    pub_sock.close(linger=0)
+    sub_sock.close(linger=0)
+    context.term()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,11 +5,14 @@ unit tests for salt.cache
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import os
+import time
 
 # Import Salt Testing libs
 # import integration
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON,
     patch,
@@ -49,6 +52,8 @@ class MemCacheTest(TestCase):
     @patch('salt.payload.Serial')
     def setUp(self, serial_mock):  # pylint: disable=W0221
         salt.cache.MemCache.data = {}
+        salt.cache.MemCache._events = {}
+        salt.cache.MemCache._event_retries = {}
         self.opts = {'cache': 'fake_driver',
                      'memcache_expire_seconds': 10,
                      'memcache_max_items': 3,
@@ -217,3 +222,222 @@ class MemCacheTest(TestCase):
         # Check debug data
         self.assertEqual(self.cache.call, 6)
         self.assertEqual(self.cache.hit, 3)
+
+    @patch('salt.cache.Cache.store')
+    @patch('salt.cache.Cache.fetch_many', return_value={'key2': 'fake_data2'})
+    @patch('salt.loader.cache', return_value={})
+    def test_fetch_many(self, loader_mock, cache_fetch_many_mock, cache_store_mock):
+        # Only the key which is not in memory is fetched from the driver
+        with patch('time.time', return_value=0):
+            self.cache.store('bank', 'key1', 'fake_data1')
+        with patch('time.time', return_value=1):
+            ret = self.cache.fetch_many('bank', ['key1', 'key2'])
+        self.assertEqual(ret, {'key1': 'fake_data1', 'key2': 'fake_data2'})
+        cache_fetch_many_mock.assert_called_once_with('bank', ['key2'])
+        self.assertDictEqual(salt.cache.MemCache.data, {
+            'fake_driver': {
+                ('bank', 'key1'): [1, 'fake_data1'],
+                ('bank', 'key2'): [1, 'fake_data2'],
+                }})
+
+    @patch('salt.cache.Cache.store_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_store_many(self, loader_mock, cache_store_many_mock):
+        with patch('time.time', return_value=0):
+            self.cache.store_many('bank', {'key1': 'fake_data1'})
+        cache_store_many_mock.assert_called_once_with('bank', {'key1': 'fake_data1'})
+        self.assertDictEqual(salt.cache.MemCache.data, {
+            'fake_driver': {
+                ('bank', 'key1'): [0, 'fake_data1'],
+                }})
+
+
+    @patch('salt.cache.Cache.store')
+    @patch('salt.loader.cache', return_value={})
+    def test_max_bytes(self, loader_mock, cache_store_mock):
+        self.opts['memcache_max_items'] = 10
+        self.opts['memcache_max_bytes'] = 20
+        self.cache = salt.cache.factory(self.opts)
+        self.cache.serial = salt.payload.Serial({'serial': 'msgpack'})
+        with patch('time.time', return_value=0):
+            self.cache.store('bank', 'key1', 'x' * 8)
+        with patch('time.time', return_value=1):
+            self.cache.store('bank', 'key2', 'x' * 8)
+        # Touch key1 so key2 is the least recently used one
+        with patch('time.time', return_value=2):
+            self.assertEqual(self.cache.fetch('bank', 'key1'), 'x' * 8)
+        with patch('time.time', return_value=3):
+            self.cache.store('bank', 'key3', 'x' * 8)
+        self.assertEqual(list(salt.cache.MemCache.data['fake_driver']),
+                         [('bank', 'key1'), ('bank', 'key3')])
+        # Too big to be kept in memory at all
+        self.cache.store('bank', 'key4', 'x' * 30)
+        self.assertNotIn(('bank', 'key4'), salt.cache.MemCache.data['fake_driver'])
+        stats = self.cache.stats()
+        self.assertEqual(stats['items'], 2)
+        self.assertEqual(stats['bytes'], 18)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    @patch('salt.cache.Cache.fetch', return_value='fake_data')
+    @patch('salt.cache.Cache.store')
+    @patch('salt.cache.Cache.flush')
+    @patch('salt.loader.cache', return_value={})
+    def test_invalidate_events(self, loader_mock, cache_flush_mock, cache_store_mock,
+                               cache_fetch_mock):
+        self.opts.update({'memcache_invalidate_events': True,
+                          '__role': 'master',
+                          'sock_dir': '/nonexistent'})
+        self.cache = salt.cache.factory(self.opts)
+        event = MagicMock()
+        event.get_event_noblock.return_value = None
+        with patch.object(self.cache, '_event', return_value=event):
+            self.cache.store('bank', 'key1', 'data1')
+            self.cache.store('bank/sub', 'key2', 'data2')
+            self.cache.store('bank2', 'key1', 'data3')
+            event.fire_event.assert_called_with(
+                {'storage': 'fake_driver', 'bank': 'bank2', 'keys': ['key1'],
+                 'pid': os.getpid()},
+                'salt/cache/invalidate')
+            self.assertEqual(len(salt.cache.MemCache.data['fake_driver']), 3)
+
+            # Events of this process and of other storages are ignored
+            events = [{'tag': 'salt/cache/invalidate',
+                       'data': {'storage': 'fake_driver', 'bank': 'bank2',
+                                'keys': ['key1'], 'pid': os.getpid()}},
+                      {'tag': 'salt/cache/invalidate',
+                       'data': {'storage': 'other', 'bank': 'bank2',
+                                'keys': ['key1'], 'pid': -1}},
+                      {'tag': 'salt/job/1/ret', 'data': {}},
+                      {'tag': 'salt/cache/invalidate',
+                       'data': {'storage': 'fake_driver', 'bank': 'bank',
+                                'keys': None, 'pid': -1}},
+                      None]
+            event.get_event_noblock.side_effect = events
+            self.assertEqual(self.cache.fetch('bank2', 'key1'), 'data3')
+            # The whole bank was dropped with its sub-banks
+            self.assertEqual(list(salt.cache.MemCache.data['fake_driver']),
+                             [('bank2', 'key1')])
+            cache_fetch_mock.assert_not_called()
+            self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+            self.cache.flush('bank2')
+            event.fire_event.assert_called_with(
+                {'storage': 'fake_driver', 'bank': 'bank2', 'keys': None,
+                 'pid': os.getpid()},
+                'salt/cache/invalidate')
+            self.assertEqual(len(salt.cache.MemCache.data['fake_driver']), 0)
+
+    @patch('salt.cache.Cache.fetch', return_value='fake_data')
+    @patch('salt.cache.Cache.store')
+    @patch('salt.loader.cache', return_value={})
+    def test_invalidate_events_first_fetch(self, loader_mock, cache_store_mock,
+                                           cache_fetch_mock):
+        self.opts.update({'memcache_invalidate_events': True,
+                          '__role': 'master',
+                          'sock_dir': '/nonexistent'})
+        event = MagicMock()
+        event.get_event_noblock.return_value = None
+        with patch.object(salt.cache.MemCache, '_event', return_value=event):
+            salt.cache.factory(self.opts).store('bank', 'key1', 'data1')
+            # The events drained by the first call of a new instance apply
+            # to the storage it shares with the other instances
+            self.cache = salt.cache.factory(self.opts)
+            event.get_event_noblock.side_effect = [
+                {'tag': 'salt/cache/invalidate',
+                 'data': {'storage': 'fake_driver', 'bank': 'bank',
+                          'keys': ['key1'], 'pid': -1}},
+                None]
+            self.assertEqual(self.cache.fetch('bank', 'key1'), 'fake_data')
+            cache_fetch_mock.assert_called_once_with('bank', 'key1')
+            self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+
+    @patch('salt.cache.Cache.fetch', return_value='fake_data')
+    @patch('salt.cache.Cache.store')
+    @patch('salt.loader.cache', return_value={})
+    def test_invalidate_events_connection(self, loader_mock, cache_store_mock,
+                                          cache_fetch_mock):
+        self.opts.update({'memcache_invalidate_events': True,
+                          '__role': 'master',
+                          'sock_dir': '/nonexistent'})
+        self.cache = salt.cache.factory(self.opts)
+        down = MagicMock()
+        down.connect_pub.return_value = False
+        event = MagicMock()
+        event.get_event_noblock.return_value = None
+        pub = MagicMock()
+        get_master_event = MagicMock(side_effect=[down, pub, event])
+        with patch('salt.utils.event.get_master_event', get_master_event):
+            self.cache.fetch('bank', 'key1')
+            down.filter_events.assert_called_once_with(
+                tags=[['startswith', 'salt/cache/invalidate']])
+            down.destroy.assert_called_once_with()
+            # No new attempt before the retry interval
+            self.cache.fetch('bank', 'key2')
+            self.assertEqual(get_master_event.call_count, 1)
+            with patch('time.time', MagicMock(return_value=time.time() + 61)):
+                self.cache.store('bank', 'key3', 'data3')
+                self.cache.fetch('bank', 'key1')
+            pub.fire_event.assert_called_once_with(
+                {'storage': 'fake_driver', 'bank': 'bank', 'keys': ['key3'],
+                 'pid': os.getpid()},
+                'salt/cache/invalidate')
+            self.assertEqual(get_master_event.call_count, 3)
+            self.assertEqual(len(salt.cache.MemCache.data['fake_driver']), 3)
+
+            # The entries are dropped when the connection is lost
+            event.get_event_noblock.side_effect = IOError('closed')
+            self.cache.fetch('bank', 'key2')
+            event.destroy.assert_called_once_with()
+            self.assertEqual(list(salt.cache.MemCache.data['fake_driver']),
+                             [('bank', 'key2')])
+            self.assertNotIn((os.getpid(), True), salt.cache.MemCache._events)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class CacheBatchTest(TestCase):
+    '''
+    Validate the generic fallbacks of the batched Cache methods
+    '''
+    def setUp(self):
+        self.opts = {'cache': 'fake_driver'}
+        self.data = {'bank': {'key1': 'data1', 'key2': 'data2'},
+                     'bank2': {'key1': 'data3'}}
+
+        def fetch(bank, key, **kwargs):
+            return self.data.get(bank, {}).get(key, {})
+
+        def store(bank, key, data, **kwargs):
+            self.data.setdefault(bank, {})[key] = data
+
+        self.modules = {'fake_driver.fetch': fetch,
+                        'fake_driver.store': store,
+                        # 'bank' also holds the 'sub' bank
+                        'fake_driver.list': lambda bank, **kwargs: list(self.data[bank]) + ['sub'],
+                        'fake_driver.contains': lambda bank, key, **kwargs: key in self.data[bank]}
+        patcher = patch('salt.loader.cache', return_value=self.modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = salt.cache.Cache(self.opts)
+
+    def test_fetch_many(self):
+        self.assertEqual(self.cache.fetch_many('bank', ['key1', 'key3']),
+                         {'key1': 'data1', 'key3': {}})
+
+    def test_fetch_banks(self):
+        self.assertEqual(self.cache.fetch_banks(['bank', 'bank2', 'bank3'], 'key1'),
+                         {'bank': 'data1', 'bank2': 'data3', 'bank3': {}})
+
+    def test_store_many(self):
+        self.cache.store_many('bank3', {'key1': 'data4', 'key2': 'data5'})
+        self.assertEqual(self.data['bank3'], {'key1': 'data4', 'key2': 'data5'})
+
+    def test_iter_bank(self):
+        self.assertEqual(sorted(self.cache.iter_bank('bank')),
+                         [('key1', 'data1'), ('key2', 'data2')])
+
+    def test_native(self):
+        self.modules['fake_driver.fetch_many'] = MagicMock(return_value={'key1': 'native'})
+        self.assertEqual(self.cache.fetch_many('bank', iter(['key1'])), {'key1': 'native'})
+        self.modules['fake_driver.fetch_many'].assert_called_once_with('bank', ['key1'])
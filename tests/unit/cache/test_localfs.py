@@ -5,6 +5,7 @@ unit tests for the localfs cache
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import errno
 import os
 import shutil
 import tempfile
@@ -268,3 +269,57 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
         # Now test the return of the contains function when key='key'
         with patch.dict(localfs.__opts__, {'cachedir': tmp_dir}):
             self.assertTrue(localfs.contains(bank='bank', key='key', cachedir=tmp_dir))
+
+    # 'store_many', 'fetch_many', 'fetch_banks' and 'iter_bank' function tests: 4
+
+    def test_store_many_fetch_many(self):
+        '''
+        Test that store_many writes one file per key and that fetch_many reads
+        them back, returning an empty dict for missing keys.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            localfs.store_many('bank', {'key1': 'data1', 'key2': {'a': 1}}, cachedir=tmp_dir)
+            self.assertEqual(sorted(os.listdir(os.path.join(tmp_dir, 'bank'))),
+                             ['key1.p', 'key2.p'])
+            self.assertEqual(localfs.fetch_many('bank', ['key1', 'key2', 'key3'], cachedir=tmp_dir),
+                             {'key1': 'data1', 'key2': {'a': 1}, 'key3': {}})
+
+    def test_fetch_many_error_reading_cache(self):
+        '''
+        Tests that a SaltCacheError is raised when a cache file exists but can
+        not be read.
+        '''
+        with patch('salt.utils.files.fopen', MagicMock(side_effect=IOError(errno.EACCES, ''))):
+            self.assertRaises(SaltCacheError, localfs.fetch_many, 'bank', ['key'], cachedir='')
+
+    def test_fetch_banks(self):
+        '''
+        Test fetching the same key from several banks
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            localfs.store('minions/alpha', 'data', {'grains': 1}, cachedir=tmp_dir)
+            localfs.store('minions/beta', 'data', {'grains': 2}, cachedir=tmp_dir)
+            self.assertEqual(
+                localfs.fetch_banks(['minions/alpha', 'minions/beta', 'minions/gamma'],
+                                    'data', cachedir=tmp_dir),
+                {'minions/alpha': {'grains': 1},
+                 'minions/beta': {'grains': 2},
+                 'minions/gamma': {}})
+
+    def test_iter_bank(self):
+        '''
+        Test that iter_bank returns the keys of the bank with their data and
+        skips sub-banks
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            self.assertEqual(list(localfs.iter_bank('bank', cachedir=tmp_dir)), [])
+            localfs.store_many('bank', {'key1': 'data1', 'key2': 'data2'}, cachedir=tmp_dir)
+            localfs.store('bank/sub', 'key3', 'data3', cachedir=tmp_dir)
+            self.assertEqual(sorted(localfs.iter_bank('bank', cachedir=tmp_dir)),
+                             [('key1', 'data1'), ('key2', 'data2')])
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the redis cache
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import (
+    MagicMock,
+    NO_MOCK,
+    NO_MOCK_REASON,
+    patch
+)
+
+# Import Salt libs
+import salt.payload
+import salt.cache.redis_cache as redis_cache
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class RedisCacheTest(TestCase, LoaderModuleMockMixin):
+    '''
+    Validate the functions in the redis cache
+    '''
+
+    def setup_loader_modules(self):
+        return {redis_cache: {'__context__': {'serial': salt.payload.Serial('msgpack')},
+                              '__opts__': {}}}
+
+    def test_iter_bank_bytes_members(self):
+        '''
+        The bank keys read as bytes are returned, and looked up, as strings
+        '''
+        serial = salt.payload.Serial('msgpack')
+        server = MagicMock()
+        server.smembers.return_value = set([b'minion1'])
+        pipe = server.pipeline.return_value
+        pipe.execute.return_value = [serial.dumps({'grains': {'id': 'minion1'}})]
+        with patch.object(redis_cache, '_get_redis_server', MagicMock(return_value=server)):
+            ret = redis_cache.iter_bank('minions/data')
+        self.assertEqual(ret, [('minion1', {'grains': {'id': 'minion1'}})])
+        pipe.get.assert_called_once_with('$KEY_minions/data/minion1')
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Libs
+import salt.payload
+import salt.utils.event
+import salt.utils.stringutils
+from salt.cli.batch import Batch
+from salt.cli.batch_async import BatchAsync, batch_size, parse_batch
+from salt.exceptions import SaltInvocationError
+
+# Import Salt Testing Libs
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+
+# Import 3rd-party libs
+import tornado.gen
+from tornado.testing import AsyncTestCase
+
+
+class FakeEvent(object):
+    def __init__(self):
+        self.handler = None
+        self.fired = []
+        self.closed = False
+
+    def set_event_handler(self, handler):
+        self.handler = handler
+
+    def fire_event(self, data, tag):
+        self.fired.append((tag, data))
+
+    def close_pub(self):
+        self.closed = True
+
+
+class FakeLocalClient(object):
+    '''
+    Answer the publications of a batch run with the events of minions which
+    return after the given delays, or never if the delay is None
+    '''
+    def __init__(self, io_loop, delays, down=(), retcodes=None, running=()):
+        self.io_loop = io_loop
+        self.delays = delays
+        self.down = down
+        self.retcodes = retcodes or {}
+        self.running = running
+        self.event = FakeEvent()
+        self.published = []
+        self.active = 0
+        self.max_active = 0
+        self.serial = salt.payload.Serial({'serial': 'msgpack'})
+
+    def _send(self, delay, data, tag):
+        raw = salt.utils.stringutils.to_bytes(tag) + \
+            salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND) + \
+            self.serial.dumps(data)
+        self.io_loop.call_later(delay, self.event.handler, raw)
+
+    def _return(self, minion, jid):
+        self.active -= 1
+        self._send(0, {'id': minion, 'jid': jid, 'return': True,
+                       'retcode': self.retcodes.get(minion, 0)},
+                   'salt/job/{0}/ret/{1}'.format(jid, minion))
+
+    @tornado.gen.coroutine
+    def run_job_async(self, tgt, fun, arg, tgt_type, timeout=None, jid='',
+                      listen=True, io_loop=None, **kwargs):
+        self.published.append((fun, tgt))
+        if fun == 'test.ping':
+            minions = sorted(self.delays)
+            for minion in minions:
+                if minion not in self.down:
+                    self._send(0.01, {'id': minion, 'return': True},
+                               'salt/job/{0}/ret/{1}'.format(jid, minion))
+        elif fun == 'saltutil.find_job':
+            minions = tgt
+            for minion in tgt:
+                self._send(0.01, {'id': minion,
+                                  'return': {'jid': arg[0]} if minion in self.running else {}},
+                           'salt/job/{0}/ret/{1}'.format(jid, minion))
+        else:
+            minions = tgt
+            for minion in tgt:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                if self.delays[minion] is not None:
+                    self.io_loop.call_later(self.delays[minion], self._return, minion, jid)
+        raise tornado.gen.Return({'jid': jid, 'minions': minions})
+
+
+class BatchSizeTestCase(TestCase):
+    '''
+    Unit Tests for the batch values of salt.cli.batch_async
+    '''
+    def test_batch_size(self):
+        self.assertEqual(batch_size('3', 10), 3)
+        self.assertEqual(batch_size('25%', 10), 2)
+        self.assertEqual(batch_size('5%', 10), 1)
+        self.assertRaises(ValueError, batch_size, 'x', 10)
+
+    def test_parse_batch(self):
+        self.assertEqual(parse_batch('3'), ('3', '3'))
+        self.assertEqual(parse_batch('10%:50%'), ('10%', '50%'))
+        self.assertRaises(ValueError, parse_batch, '3:x')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BatchAsyncTestCase(AsyncTestCase):
+    '''
+    Unit Tests for salt.cli.batch_async.BatchAsync
+    '''
+    def get_opts(self, **kwargs):
+        opts = {'batch': '2',
+                'conf_file': {},
+                'tgt': '*',
+                'fun': 'test.sleep',
+                'arg': [],
+                'timeout': 1,
+                'gather_job_timeout': 0.2}
+        opts.update(kwargs)
+        return opts
+
+    def run_batch(self, client, **kwargs):
+        with patch('salt.client.get_local_client', MagicMock(return_value=client)):
+            batch = BatchAsync(self.get_opts(**kwargs), io_loop=self.io_loop)
+        returns = self.io_loop.run_sync(batch.run, timeout=10)
+        return batch, returns
+
+    def test_rolling_window(self):
+        '''
+        The window is refilled as soon as a minion returns, without waiting
+        on the slow minion of the window
+        '''
+        delays = {'m1': 0.5, 'm2': 0.05, 'm3': 0.05, 'm4': 0.05}
+        client = FakeLocalClient(self.io_loop, delays)
+        batch, returns = self.run_batch(client)
+        self.assertEqual(sorted(returns), ['m1', 'm2', 'm3', 'm4'])
+        self.assertEqual(returns['m2'], {'ret': True, 'retcode': 0, 'jid': returns['m2']['jid']})
+        self.assertEqual(client.max_active, 2)
+        run_pubs = [tgt for fun, tgt in client.published if fun == 'test.sleep']
+        # m3 and m4 run one after the other while m1 is still running
+        self.assertEqual(len(run_pubs), 3)
+        self.assertEqual([tag.split('/')[-1] for tag, _ in client.event.fired],
+                         ['start', 'done'])
+        self.assertTrue(client.event.closed)
+
+    def test_down_minions(self):
+        '''
+        The minions which do not answer the ping get no job
+        '''
+        delays = {'m1': 0.01, 'm2': 0.01, 'm3': 0.01}
+        client = FakeLocalClient(self.io_loop, delays, down=('m3',))
+        with patch('salt.client.get_local_client', MagicMock(return_value=client)):
+            batch = BatchAsync(self.get_opts(timeout=0.3), io_loop=self.io_loop, stream=True)
+        self.io_loop.run_sync(batch.run, timeout=10)
+        items = []
+        while batch.results.qsize():
+            items.append(batch.results.get_nowait())
+        self.assertIn(('down', 'm3'), items)
+        self.assertEqual(items[-1], None)
+        self.assertEqual(sorted(item[1] for item in items if item and item[0] == 'ret'),
+                         ['m1', 'm2'])
+        self.assertEqual(batch.down_minions, set(['m3']))
+        self.assertFalse(any('m3' in tgt for fun, tgt in client.published
+                             if fun == 'test.sleep'))
+
+    def test_adaptive_window(self):
+        '''
+        An adaptive window grows with each success
+        '''
+        delays = dict(('m{0}'.format(num), 0.1) for num in range(8))
+        client = FakeLocalClient(self.io_loop, delays)
+        batch, returns = self.run_batch(client, batch='1:4')
+        self.assertEqual(len(returns), 8)
+        self.assertEqual(client.max_active, 4)
+
+    def test_adaptive_window_failure(self):
+        '''
+        An adaptive window halves on each failure
+        '''
+        delays = dict(('m{0}'.format(num), 0.05) for num in range(4))
+        client = FakeLocalClient(self.io_loop, delays, retcodes={'m0': 1})
+        with patch('salt.client.get_local_client', MagicMock(return_value=client)):
+            batch = BatchAsync(self.get_opts(batch='2:4'), io_loop=self.io_loop)
+        batch.size = 4
+        batch._adapt(False)
+        self.assertEqual(batch.size, 2)
+        self.assertEqual(batch._window(), 2)
+
+    def test_batch_wait(self):
+        '''
+        A slot is only reused batch_wait seconds after its minion returned
+        '''
+        delays = {'m1': 0.01, 'm2': 0.01}
+        client = FakeLocalClient(self.io_loop, delays)
+        with patch('salt.client.get_local_client', MagicMock(return_value=client)):
+            batch = BatchAsync(self.get_opts(batch='1', batch_wait=0.3), io_loop=self.io_loop)
+        start = self.io_loop.time()
+        self.io_loop.run_sync(batch.run, timeout=10)
+        self.assertGreaterEqual(self.io_loop.time() - start, 0.3)
+        self.assertEqual(sorted(batch.returns), ['m1', 'm2'])
+
+    def test_failhard(self):
+        '''
+        The run stops on the first non-zero retcode with failhard
+        '''
+        delays = {'m1': 0.01, 'm2': 0.01, 'm3': 0.01}
+        client = FakeLocalClient(self.io_loop, delays, retcodes={'m1': 1, 'm2': 1, 'm3': 1})
+        batch, returns = self.run_batch(client, batch='1', failhard=True)
+        self.assertEqual(len(returns), 1)
+        self.assertTrue(batch.stopped)
+
+    def test_job_timeout(self):
+        '''
+        The minions which do not return and no longer run the job are
+        failed once they are found not running it
+        '''
+        delays = {'m1': None, 'm2': 0.01}
+        client = FakeLocalClient(self.io_loop, delays)
+        batch, returns = self.run_batch(client, timeout=0.2)
+        self.assertEqual(returns['m1'], {'ret': {}})
+        self.assertEqual(batch.failed, set(['m1']))
+        self.assertIn(('saltutil.find_job', ['m1']), client.published)
+
+    def test_job_heartbeat(self):
+        '''
+        The minions are not asked whether they run the job with
+        require_job_heartbeat
+        '''
+        delays = {'m1': None}
+        client = FakeLocalClient(self.io_loop, delays)
+        batch, returns = self.run_batch(client, timeout=0.2, require_job_heartbeat=True)
+        self.assertEqual(returns['m1'], {'ret': {}})
+        self.assertNotIn('saltutil.find_job', [fun for fun, _ in client.published])
+
+    def test_invalid_batch(self):
+        with patch('salt.client.get_local_client', MagicMock()):
+            self.assertRaises(SaltInvocationError, BatchAsync,
+                              self.get_opts(batch='x'), io_loop=self.io_loop)
+
+    def test_batch(self):
+        '''
+        Batch yields the returns of the engine as they come
+        '''
+        delays = {'m1': 0.05, 'm2': 0.01}
+        opts = self.get_opts()
+        with patch('salt.client.get_local_client',
+                   MagicMock(side_effect=lambda conf_file, io_loop=None:
+                             FakeLocalClient(io_loop, delays))):
+            batch = Batch(opts, quiet=True)
+            rets = list(batch.run())
+        self.assertEqual(rets, [{'m2': True}, {'m1': True}])
+        self.assertEqual(sorted(batch.minions), ['m1', 'm2'])
@@ -563,6 +563,9 @@ class FakeCache(object):
     def fetch(self, bank, key):
         return self.data[bank, key]
 
+    def fetch_banks(self, banks, key):
+        return dict((bank, self.fetch(bank, key)) for bank in banks)
+
 
 class RemoteFuncsTestCase(TestCase):
     '''
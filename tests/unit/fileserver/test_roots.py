@@ -17,6 +17,7 @@ from tests.support.unit import TestCase, skipIf
 from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
+import salt.fileserver
 import salt.fileserver.roots as roots
 import salt.fileclient
 import salt.utils.files
@@ -149,6 +150,64 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
             }
         )
 
+    def test_file_hash_index(self):
+        path = os.path.join(self.tmp_dir, 'testfile')
+        load = {'saltenv': 'base', 'path': path}
+        fnd = {'path': path, 'rel': 'testfile', 'stat': list(os.stat(path))}
+        with patch.dict(roots._HASH_INDEX, {'hashes': {}, 'mtime': None, 'checked': 0}):
+            ret = roots.file_hash(load, fnd)
+            # The hash is now served without reading the file
+            with patch('os.path.getmtime', side_effect=OSError), \
+                    patch('salt.utils.files.fopen', side_effect=IOError):
+                self.assertEqual(roots.file_hash(load, fnd), ret)
+
+    def test_file_hash_index_same_second(self):
+        path = os.path.join(self.tmp_dir, 'samesecond')
+        load = {'saltenv': 'base', 'path': path}
+        fnd = {'path': path, 'rel': 'samesecond'}
+        data = b'same size'
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(data)
+        self.addCleanup(os.remove, path)
+        mtime = int(os.stat(path).st_mtime) + 0.25
+        with patch.dict(roots._HASH_INDEX, {'hashes': {}, 'mtime': None, 'checked': 0}):
+            os.utime(path, (mtime, mtime))
+            ret = roots.file_hash(load, fnd)
+            # A same size edit within the same second gets a new hash
+            with salt.utils.files.fopen(path, 'wb') as fp_:
+                fp_.write(data[::-1])
+            os.utime(path, (mtime + 0.5, mtime + 0.5))
+            self.assertNotEqual(roots.file_hash(load, fnd)['hsum'], ret['hsum'])
+
+    def test_update_hash_index(self):
+        path = os.path.join(self.tmp_dir, 'testfile')
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            hsum = salt.utils.hashutils.sha256_digest(fp_.read())
+        with patch.dict(roots.__opts__, {'file_roots': {'base': [self.tmp_dir]}}), \
+                patch.dict(roots._HASH_INDEX, {'hashes': {}, 'mtime': None, 'checked': 0}):
+            roots.update()
+            self.assertEqual(roots._HASH_INDEX['hashes'][path][0], hsum)
+            # Another process reads the index written by update()
+            roots._HASH_INDEX.update({'hashes': {}, 'mtime': None, 'checked': 0})
+            self.assertEqual(roots._hash_index()[path][0], hsum)
+            self.assertFalse(os.path.isdir(
+                os.path.join(self.tmp_cachedir, 'roots', 'hash')))
+
+    def test_file_manifest(self):
+        fileserver = salt.fileserver.Fileserver(self.opts)
+        fileserver.init()
+        ret = fileserver.file_manifest({'saltenv': 'base', 'prefix': 'testfile'})
+        self.assertEqual(sorted(ret), ['testfile'])
+        fnd = roots.find_file('testfile')
+        self.assertEqual(
+            ret['testfile'],
+            [roots.file_hash({'saltenv': 'base', 'path': 'testfile'}, fnd),
+             fnd['stat'][0],
+             fnd['stat'][6]])
+        ret = fileserver.file_manifest(
+            {'saltenv': 'base', 'paths': ['testfile', 'missing']})
+        self.assertEqual(sorted(ret), ['testfile'])
+
     def test_file_list_emptydirs(self):
         ret = roots.file_list_emptydirs({'saltenv': 'base'})
         self.assertIn('empty_dir', ret)
@@ -351,3 +351,63 @@ class Local_CacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleM
         self._check_dir_files('new_jid_dir was not removed',
                               self.EMPTY_JID_DIR,
                               status='removed')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class LocalCacheIterJidsTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for listing the local_cache newest first
+    '''
+    def setup_loader_modules(self):
+        return {local_cache: {'__opts__': {'cachedir': TMP_CACHE_DIR,
+                                           'hash_type': 'sha256',
+                                           'serial': 'msgpack',
+                                           'keep_jobs': 1}}}
+
+    def setUp(self):
+        self.jids = []
+        for idx, fun in enumerate(('test.ping', 'saltutil.find_job', 'test.echo',
+                                   'test.arg', 'test.ping')):
+            jid = '2018101610000000000{0}'.format(idx)
+            local_cache.prep_jid(passed_jid=jid)
+            local_cache.save_load(jid, {'fun': fun, 'jid': jid, 'tgt': 'minion',
+                                        'tgt_type': 'list', 'arg': []},
+                                  minions=['minion'])
+            self.jids.append(jid)
+
+    def tearDown(self):
+        if os.path.exists(TMP_CACHE_DIR):
+            shutil.rmtree(TMP_CACHE_DIR)
+
+    def test_iter_jids(self):
+        for batch_size in (1, 2, 100):
+            ret = list(local_cache.iter_jids(batch_size=batch_size))
+            self.assertEqual([jid for jid, _ in ret], self.jids[::-1])
+            self.assertEqual(ret[1][1]['fun'], 'test.arg')
+            ret = local_cache.iter_jids(cursor=self.jids[3], filter_find_job=True,
+                                        batch_size=batch_size)
+            self.assertEqual([jid for jid, _ in ret],
+                             [self.jids[2], self.jids[0]])
+
+    def test_iter_jids_walks(self):
+        walk_jids = local_cache._walk_jids
+        # The pages of 1, 2 and 4 jobs take one walk each
+        for batch_size, walks in ((1, 3), (5, 2), (100, 1)):
+            with patch('salt.returners.local_cache._walk_jids',
+                       MagicMock(side_effect=walk_jids)) as mock_walk:
+                ret = list(local_cache.iter_jids(batch_size=batch_size))
+            self.assertEqual(len(ret), len(self.jids))
+            self.assertEqual(mock_walk.call_count, walks)
+
+    def test_iter_jids_without_jid_file(self):
+        os.remove(os.path.join(
+            salt.utils.jid.jid_dir(self.jids[2], os.path.join(TMP_CACHE_DIR, 'jobs'), 'sha256'),
+            'jid'))
+        self.assertEqual([jid for jid, _ in local_cache.iter_jids()], self.jids[::-1])
+
+    def test_get_jids_filter(self):
+        ret = local_cache.get_jids_filter(3)
+        self.assertEqual([job['JID'] for job in ret], [self.jids[2], self.jids[3], self.jids[4]])
+        ret = local_cache.get_jids_filter(4, filter_find_job=False)
+        self.assertEqual([job['JID'] for job in ret], self.jids[1:])
+        self.assertEqual(ret[0]['Function'], 'saltutil.find_job')
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+'''
+Unit tests for the sqlite3 master job cache (sqlite3_local_cache).
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.paths import TMP
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    patch
+)
+
+# Import Salt libs
+import salt.returners.sqlite3_local_cache as sqlite3_local_cache
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+@skipIf(not sqlite3_local_cache.HAS_SQLITE3, 'sqlite3 is not available')
+class Sqlite3LocalCacheTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the sqlite3_local_cache job cache
+    '''
+    def setup_loader_modules(self):
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        return {sqlite3_local_cache: {'__opts__': {'cachedir': self.cachedir,
+                                                   'keep_jobs': 1,
+                                                   'serial': 'msgpack',
+                                                   'hash_type': 'sha256',
+                                                   'job_cache_store_endtime': True}}}
+
+    def tearDown(self):
+        sqlite3_local_cache._CONN.clear()
+        shutil.rmtree(self.cachedir)
+
+    def _save_job(self, fun='test.ping', minions=('alpha', 'beta')):
+        jid = sqlite3_local_cache.prep_jid()
+        load = {'fun': fun, 'arg': [], 'tgt': list(minions), 'tgt_type': 'list',
+                'user': 'root', 'jid': jid}
+        sqlite3_local_cache.save_load(jid, load, minions=list(minions))
+        return jid, load
+
+    def test_job_roundtrip(self):
+        jid, load = self._save_job()
+        self.assertTrue(os.path.isfile(os.path.join(self.cachedir, 'jobs.sqlite3')))
+        ret = sqlite3_local_cache.get_load(jid)
+        self.assertEqual(ret.pop('Minions'), ['alpha', 'beta'])
+        self.assertEqual(ret, load)
+
+        sqlite3_local_cache.save_minions(jid, ['gamma'], syndic_id='syndic')
+        self.assertEqual(sqlite3_local_cache.get_load(jid)['Minions'], ['alpha', 'beta', 'gamma'])
+
+        sqlite3_local_cache.returner({'jid': jid, 'id': 'alpha', 'return': True,
+                                      'retcode': 0, 'success': True, 'out': 'nested'})
+        sqlite3_local_cache.returner({'jid': jid, 'id': 'beta', 'return': {'a': 1}})
+        self.assertEqual(
+            sqlite3_local_cache.get_jid(jid),
+            {'alpha': {'return': True, 'retcode': 0, 'success': True, 'out': 'nested'},
+             'beta': {'return': {'a': 1}}})
+
+        self.assertFalse(sqlite3_local_cache.get_endtime(jid))
+        sqlite3_local_cache.update_endtime(jid, '2018, Oct 16 10:00:00.000000')
+        self.assertEqual(sqlite3_local_cache.get_endtime(jid), '2018, Oct 16 10:00:00.000000')
+        self.assertEqual(sqlite3_local_cache.get_jids()[jid]['EndTime'],
+                         '2018, Oct 16 10:00:00.000000')
+
+    def test_load_and_missing_jid(self):
+        self.assertEqual(sqlite3_local_cache.get_load('20181016000000000000'), {})
+        self.assertEqual(sqlite3_local_cache.get_jid('20181016000000000000'), {})
+        self.assertFalse(sqlite3_local_cache.returner(
+            {'jid': '20181016000000000000', 'id': 'alpha', 'return': True}))
+
+    def test_duplicate_return(self):
+        jid, _ = self._save_job()
+        load = {'jid': jid, 'id': 'alpha', 'return': True}
+        self.assertIsNone(sqlite3_local_cache.returner(load))
+        self.assertFalse(sqlite3_local_cache.returner(load))
+
+    def test_nocache(self):
+        jid = sqlite3_local_cache.prep_jid(nocache=True)
+        sqlite3_local_cache.returner({'jid': jid, 'id': 'alpha', 'return': True})
+        self.assertEqual(sqlite3_local_cache.get_jid(jid), {})
+
+    def test_req_jid(self):
+        load = {'jid': 'req', 'id': 'alpha', 'return': True}
+        sqlite3_local_cache.returner(load)
+        self.assertNotEqual(load['jid'], 'req')
+        self.assertEqual(sqlite3_local_cache.get_jid(load['jid']), {'alpha': {'return': True}})
+
+    def test_prep_jid_passed(self):
+        jid = sqlite3_local_cache.prep_jid(passed_jid='20181016000000000000')
+        self.assertEqual(jid, '20181016000000000000')
+        self.assertEqual(sqlite3_local_cache.prep_jid(passed_jid=jid), jid)
+
+    def test_get_jids_filter(self):
+        jids = []
+        for fun in ('test.ping', 'saltutil.find_job', 'test.echo', 'test.arg'):
+            jids.append(self._save_job(fun=fun)[0])
+        ret = sqlite3_local_cache.get_jids_filter(2)
+        self.assertEqual([job['JID'] for job in ret], jids[2:])
+        ret = sqlite3_local_cache.get_jids_filter(3)
+        self.assertEqual([job['JID'] for job in ret], [jids[0], jids[2], jids[3]])
+        ret = sqlite3_local_cache.get_jids_filter(3, filter_find_job=False)
+        self.assertEqual([job['JID'] for job in ret], jids[1:])
+        self.assertEqual(ret[0]['Function'], 'saltutil.find_job')
+        self.assertEqual(sorted(sqlite3_local_cache.get_jids()), jids)
+
+    def test_iter_jids(self):
+        jids = [self._save_job(fun=fun)[0]
+                for fun in ('test.ping', 'saltutil.find_job', 'test.echo', 'test.arg')]
+        for batch_size in (1, 3, 100):
+            ret = list(sqlite3_local_cache.iter_jids(batch_size=batch_size))
+            self.assertEqual([jid for jid, _ in ret], jids[::-1])
+            self.assertEqual(ret[0][1]['fun'], 'test.arg')
+            ret = sqlite3_local_cache.iter_jids(cursor=jids[2], filter_find_job=True,
+                                                batch_size=batch_size)
+            self.assertEqual([jid for jid, _ in ret], [jids[0]])
+
+    def test_clean_old_jobs(self):
+        old_jid, _ = self._save_job()
+        sqlite3_local_cache.returner({'jid': old_jid, 'id': 'alpha', 'return': True})
+        with patch('time.time', return_value=time.time() + 7200):
+            new_jid, _ = self._save_job()
+            sqlite3_local_cache.clean_old_jobs()
+        self.assertEqual(list(sqlite3_local_cache.get_jids()), [new_jid])
+        self.assertEqual(sqlite3_local_cache.get_load(old_jid), {})
+        self.assertEqual(sqlite3_local_cache.get_jid(old_jid), {})
+        conn = sqlite3_local_cache._get_conn()
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM minions').fetchone()[0], 1)
+
+    def test_register(self):
+        self.assertEqual(sqlite3_local_cache.load_reg(), {})
+        sqlite3_local_cache.save_reg({'reg': {'val': [1, 2]}})
+        sqlite3_local_cache.save_reg({'reg': {'val': [3]}})
+        self.assertEqual(sqlite3_local_cache.load_reg(), {'reg': {'val': [3]}})
@@ -78,3 +78,43 @@ class JobsTest(TestCase, LoaderModuleMockMixin):
 
             self.assertEqual(jobs.list_jobs(search_target='non-existant'),
                              returns['non-existant'])
+
+    def test_list_jobs_limit(self):
+        '''
+        test jobs.list_jobs runner with limit and cursor args
+        '''
+        loads = [('20160524035524895387', {'fun': 'test.ping', 'tgt': 'node-1-2.com'}),
+                 ('20160524035513123456', {'fun': 'test.echo', 'tgt': 'node-1-1.com'}),
+                 ('20160524035503086853', {'fun': 'test.ping', 'tgt': 'node-1-1.com'})]
+        calls = []
+
+        def iter_jids(cursor=None):
+            calls.append(cursor)
+            for jid, load in loads:
+                if cursor is None or jid < cursor:
+                    yield jid, load
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.iter_jids': iter_jids}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            ret = jobs.list_jobs(limit=2)
+            self.assertEqual(sorted(ret), ['20160524035513123456', '20160524035524895387'])
+            self.assertEqual(ret['20160524035513123456']['Function'], 'test.echo')
+
+            ret = jobs.list_jobs(limit='1', search_function='test.ping',
+                                 cursor=20160524035524895387)
+            self.assertEqual(list(ret), ['20160524035503086853'])
+            self.assertEqual(calls, [None, '20160524035524895387'])
+
+        # Job caches without iter_jids are listed with get_jids
+        mock_jobs_cache = dict((jid, {'Function': load['fun']}) for jid, load in loads)
+        MockMasterMinion.returners = {'local_cache.get_jids': lambda: mock_jobs_cache}
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(list(jobs.list_jobs(limit=1)), ['20160524035524895387'])
+            self.assertEqual(list(jobs.list_jobs(limit=1, cursor='20160524035513123456')),
+                             ['20160524035503086853'])
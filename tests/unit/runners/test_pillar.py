@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the pillar runner
+'''
+
+# Import Python Libs
+from __future__ import absolute_import, print_function, unicode_literals
+import copy
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing Libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.paths import TMP
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    MagicMock,
+    patch
+)
+
+# Import Salt Libs
+import salt.cache
+import salt.config
+import salt.runners.pillar as pillar_runner
+import salt.utils.files
+import salt.utils.master
+
+GRAINS = {
+    'web1': {'id': 'web1', 'role': 'web'},
+    'web2': {'id': 'web2', 'role': 'web'},
+    'db1': {'id': 'db1', 'role': 'db'},
+}
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PillarRunnerTest(TestCase, LoaderModuleMockMixin):
+    '''
+    Validate the pillar runner
+    '''
+    def setup_loader_modules(self):
+        self.tmpdir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.pillar_root = os.path.join(self.tmpdir, 'pillar')
+        os.makedirs(self.pillar_root)
+        self._write('top.sls',
+                    "base:\n"
+                    "  '*':\n"
+                    "    - common\n"
+                    "  'role:web':\n"
+                    "    - match: grain\n"
+                    "    - web\n")
+        self._write('common.sls', 'common: {{ saltenv }}\n')
+        self._write('web.sls', 'web: True\n')
+        opts = copy.deepcopy(salt.config.DEFAULT_MASTER_OPTS)
+        opts.update({'cachedir': os.path.join(self.tmpdir, 'cache'),
+                     'pki_dir': os.path.join(self.tmpdir, 'pki'),
+                     'extension_modules': os.path.join(self.tmpdir, 'extmods'),
+                     'pillar_roots': {'base': [self.pillar_root]},
+                     'file_roots': {'base': [self.pillar_root]},
+                     'minion_data_cache': True,
+                     'pillar_cache': True})
+        self.opts = opts
+        return {pillar_runner: {'__opts__': opts}}
+
+    def _write(self, name, contents):
+        with salt.utils.files.fopen(os.path.join(self.pillar_root, name), 'w') as fp_:
+            fp_.write(contents)
+
+    def _compile_bulk(self):
+        with patch.object(salt.utils.master.MasterPillarUtil, '_tgt_to_list',
+                          MagicMock(return_value=sorted(GRAINS) + ['gone'])), \
+                patch.object(salt.utils.master.MasterPillarUtil, '_get_cached_minion_data',
+                             MagicMock(return_value=(dict(GRAINS, gone={}), {}))):
+            return pillar_runner.compile_bulk(processes=1)
+
+    def test_compile_bulk(self):
+        ret = self._compile_bulk()
+        self.assertEqual(ret['minions'], 3)
+        self.assertEqual(ret['missing'], ['gone'])
+        self.assertTrue(ret['shared_top'])
+        # web1 and web2 match the same SLS files and share their rendering
+        self.assertEqual(ret['groups'], 2)
+        self.assertEqual(ret['renders'], 2)
+        self.assertEqual(ret['errors'], {})
+        cache = salt.cache.factory(self.opts)
+        self.assertEqual(cache.fetch('minions/web2', 'data'),
+                         {'grains': GRAINS['web2'],
+                          'pillar': {'common': 'base', 'web': True}})
+        self.assertEqual(cache.fetch('minions/db1', 'data')['pillar'],
+                         {'common': 'base'})
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.opts['cachedir'], 'pillar_cache', 'web1')))
+
+    def test_compile_bulk_per_minion(self):
+        self._write('web.sls', 'web: {{ grains.id }}\n')
+        ret = self._compile_bulk()
+        self.assertFalse(ret['shared_top'])
+        self.assertEqual(ret['groups'], 3)
+        self.assertEqual(ret['renders'], 3)
+        cache = salt.cache.factory(self.opts)
+        self.assertEqual(cache.fetch('minions/web2', 'data')['pillar'],
+                         {'common': 'base', 'web': 'web2'})
@@ -5,11 +5,12 @@
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import time
 
 # Import Salt Testing libs
 import tests.integration as integration
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
 from salt import client
@@ -80,6 +81,35 @@ class LocalClientTestCase(TestCase,
                                                     kwarg=None, tgt_type='list', full_return=True,
                                                     ret='')
 
+    def test_get_iter_returns_job_heartbeat(self):
+        '''
+        Tests that the minions sending job heartbeats are not asked whether they still run the job
+        '''
+        def get_returns_no_block(tag, match_type=None):
+            for id_ in ('m1', 'm2'):
+                yield {'tag': 'salt/job/1234/ack/{0}'.format(id_),
+                       'data': {'id': id_, 'jid': '1234', 'state': 'started', 'interval': 1}}
+            started = time.time()
+            while time.time() < started + 1.5:
+                yield None
+            yield {'tag': 'salt/job/1234/ret/m1',
+                   'data': {'id': 'm1', 'jid': '1234', 'return': True, 'retcode': 0}}
+            while True:
+                yield None
+
+        with patch.object(self.client, 'returners',
+                          {'local_cache.get_load': MagicMock(return_value={'fun': 'test.sleep'})}), \
+                patch.object(self.client, 'get_returns_no_block', get_returns_no_block), \
+                patch.object(self.client, 'gather_job_info', MagicMock()):
+            started = time.time()
+            ret = list(self.client.get_iter_returns('1234', ['m1', 'm2'], timeout=1,
+                                                    expect_minions=True))
+            self.assertEqual(ret, [{'m1': {'ret': True, 'retcode': 0, 'jid': '1234'}},
+                                   {'m2': {'failed': True}}])
+            # m2 is given up on once its heartbeat is overdue
+            self.assertLess(time.time() - started, 5)
+            self.client.gather_job_info.assert_not_called()
+
     @skipIf(salt.utils.platform.is_windows(), 'Not supported on Windows')
     def test_pub(self):
         '''
@@ -2,6 +2,7 @@
 
 # python libs
 from __future__ import absolute_import
+import binascii
 import os
 import tempfile
 import shutil
@@ -313,3 +314,125 @@ class TestM2CryptoRegression47124(TestCase):
         with patch('salt.crypt.get_rsa_key', return_value=key):
             signature = salt.crypt.sign_message('/keydir/keyname.pem', message, passphrase='password')
         self.assertEqual(signature, self.SIGNATURE)
+
+
+class CrypticleTestCase(TestCase):
+
+    def setUp(self):
+        self.opts = {'serial': 'msgpack'}
+        self.load = {'fun': 'test.ping', 'arg': [], 'data': 'x' * 1024}
+
+    def _roundtrip(self, cipher):
+        key = salt.crypt.Crypticle.generate_key_string(cipher=cipher)
+        crypticle = salt.crypt.Crypticle(self.opts, key)
+        self.assertEqual(crypticle.cipher, cipher)
+        self.assertEqual(crypticle.loads(crypticle.dumps(self.load)), self.load)
+        self.assertEqual(crypticle.decrypt(crypticle.encrypt(b'meh')), b'meh')
+        # The minion gets the key as bytes
+        crypticle = salt.crypt.Crypticle(self.opts, salt.utils.stringutils.to_bytes(key))
+        self.assertEqual(crypticle.cipher, cipher)
+        return crypticle
+
+    def test_cbc_roundtrip(self):
+        self._roundtrip('aes-cbc-hmac')
+
+    @skipIf(not salt.crypt.HAS_GCM, 'AES-GCM requires pycryptodome')
+    def test_gcm_roundtrip(self):
+        crypticle = self._roundtrip('aes-gcm')
+        self.assertIn('aes-gcm', salt.crypt.Crypticle.supported_ciphers())
+        # nonce, tag and the padded data
+        self.assertEqual(len(crypticle.encrypt(b'meh')), 12 + 16 + 3)
+
+    def test_default_key_string(self):
+        key = salt.crypt.Crypticle.generate_key_string()
+        self.assertEqual(salt.crypt.Crypticle.key_cipher(key), 'aes-cbc-hmac')
+        self.assertNotIn(':', key)
+
+    def test_unknown_cipher(self):
+        with self.assertRaises(ValueError):
+            salt.crypt.Crypticle.generate_key_string(cipher='rot13')
+
+    def _tamper(self, cipher):
+        crypticle = salt.crypt.Crypticle(
+            self.opts, salt.crypt.Crypticle.generate_key_string(cipher=cipher))
+        data = bytearray(crypticle.dumps(self.load))
+        data[20] ^= 1
+        with self.assertRaises(salt.crypt.AuthenticationError):
+            crypticle.loads(bytes(data))
+        with self.assertRaises(salt.crypt.AuthenticationError):
+            crypticle.loads(crypticle.dumps(self.load)[:-1])
+
+    def test_cbc_tamper(self):
+        self._tamper('aes-cbc-hmac')
+
+    @skipIf(not salt.crypt.HAS_GCM, 'AES-GCM requires pycryptodome')
+    def test_gcm_tamper(self):
+        self._tamper('aes-gcm')
+        crypticle = salt.crypt.Crypticle(
+            self.opts, salt.crypt.Crypticle.generate_key_string(cipher='aes-gcm'))
+        with self.assertRaises(salt.crypt.AuthenticationError):
+            crypticle.loads(b'short')
+
+    @skipIf(not salt.crypt.HAS_GCM, 'AES-GCM requires pycryptodome')
+    def test_gcm_wrong_key(self):
+        crypticle = salt.crypt.Crypticle(
+            self.opts, salt.crypt.Crypticle.generate_key_string(cipher='aes-gcm'))
+        other = salt.crypt.Crypticle(
+            self.opts, salt.crypt.Crypticle.generate_key_string(cipher='aes-gcm'))
+        with self.assertRaises(salt.crypt.AuthenticationError):
+            other.loads(crypticle.dumps(self.load))
+
+
+class MessageSignerTestCase(TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.priv_path = os.path.join(self.test_dir, 'master.pem')
+        self.pub_path = os.path.join(self.test_dir, 'master.pub')
+        with salt.utils.files.fopen(self.priv_path, 'w') as fd:
+            fd.write(PRIVKEY_DATA)
+        with salt.utils.files.fopen(self.pub_path, 'w') as fd:
+            fd.write(PUBKEY_DATA)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_sign(self):
+        signer = salt.crypt.MessageSigner(self.priv_path)
+        self.assertEqual(signer.sign(MSG), SIG)
+        self.assertEqual(signer.sign(MSG), salt.crypt.sign_message(self.priv_path, MSG))
+        self.assertTrue(salt.crypt.verify_signature(self.pub_path, MSG, signer.sign(MSG)))
+
+    def test_sign_loads_key_once(self):
+        signer = salt.crypt.MessageSigner(self.priv_path)
+        with patch('salt.crypt.get_rsa_key', wraps=salt.crypt.get_rsa_key) as get_rsa_key:
+            signer.sign(MSG)
+            signer.sign(b'meh')
+            self.assertEqual(get_rsa_key.call_count, 1)
+            # A changed key file is picked up
+            mtime = os.path.getmtime(self.priv_path) + 10
+            os.utime(self.priv_path, (mtime, mtime))
+            self.assertEqual(signer.sign(MSG), SIG)
+            self.assertEqual(get_rsa_key.call_count, 2)
+
+    def test_pub_key_cache(self):
+        key = salt.crypt.get_rsa_pub_key(self.pub_path)
+        self.assertIs(salt.crypt.get_rsa_pub_key(self.pub_path), key)
+        with salt.utils.files.fopen(self.pub_path, 'w') as fd:
+            fd.write(TestBadCryptodomePubKey.TEST_KEY)
+        self.assertIsNot(salt.crypt.get_rsa_pub_key(self.pub_path), key)
+        self.assertFalse(salt.crypt.verify_signature(self.pub_path, MSG, SIG))
+
+    def test_verify_pubkey_sig_cache(self):
+        opts = {'master_sign_key_name': 'master',
+                'pki_dir': self.test_dir}
+        auth = MagicMock(opts=opts)
+        sig = binascii.b2a_base64(SIG)
+        with patch('salt.crypt.verify_signature', wraps=salt.crypt.verify_signature) as verify:
+            self.assertTrue(salt.crypt.AsyncAuth.verify_pubkey_sig(auth, MSG, sig))
+            self.assertTrue(salt.crypt.AsyncAuth.verify_pubkey_sig(auth, MSG, sig))
+            self.assertEqual(verify.call_count, 1)
+            # Failures are not cached
+            self.assertFalse(salt.crypt.AsyncAuth.verify_pubkey_sig(auth, b'meh', sig))
+            self.assertFalse(salt.crypt.AsyncAuth.verify_pubkey_sig(auth, b'meh', sig))
+            self.assertEqual(verify.call_count, 3)
@@ -18,6 +18,7 @@ from tests.support.paths import TMP
 from tests.support.unit import TestCase, skipIf
 
 # Import Salt libs
+import salt.fileserver
 import salt.utils.files
 from salt.ext.six.moves import range
 from salt import fileclient
@@ -408,3 +409,103 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('cache_loc = %s', cache_loc)
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
+
+    def _get_file_window(self, broken=False):
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        patched_opts.update({'file_buffer_size': 1024,
+                             'file_transfer_window': 4,
+                             'hash_type': 'sha256'})
+        contents = os.urandom(10000)
+        with salt.utils.files.fopen(os.path.join(FS_ROOT, 'base', 'big.bin'), 'wb') as fp_:
+            fp_.write(contents)
+        channels = []
+
+        def _channel(opts, **kwargs):
+            channel = salt.fileserver.FSChan(opts)
+            if broken and channels:
+                channel.send = MagicMock(return_value={'data': '', 'dest': ''})
+            channels.append(channel)
+            return channel
+
+        with patch.dict(fileclient.__opts__, patched_opts), \
+                patch('salt.transport.Channel.factory', _channel):
+            client = fileclient.RemoteClient(fileclient.__opts__)
+            dest = os.path.join(CACHE_ROOT, 'big.bin')
+            self.assertEqual(client.get_file('salt://big.bin', dest), dest)
+        with salt.utils.files.fopen(dest, 'rb') as fp_:
+            self.assertEqual(fp_.read(), contents)
+        # The main channel and the ones of the window
+        self.assertEqual(len(channels), 5)
+
+    def test_get_file_window(self):
+        '''
+        Ensure a file fetched with several chunk requests in flight is whole
+        '''
+        self._get_file_window()
+
+    def test_get_file_window_broken(self):
+        '''
+        Ensure a file is fetched chunk by chunk when the windowed transfer
+        fails
+        '''
+        self._get_file_window(broken=True)
+
+    def test_cache_file_store(self):
+        '''
+        Ensure a file whose content is in the file store is linked into the
+        cache rather than transferred again
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        patched_opts.update({'file_cache_store': True, 'hash_type': 'sha256'})
+        for saltenv in SALTENVS:
+            with salt.utils.files.fopen(os.path.join(FS_ROOT, saltenv, 'same.txt'), 'w') as fp_:
+                fp_.write('Same content in every saltenv\n')
+        channel = salt.fileserver.FSChan(patched_opts)
+
+        with patch.dict(fileclient.__opts__, patched_opts), \
+                patch('salt.transport.Channel.factory', MagicMock(return_value=channel)), \
+                patch.object(channel, 'send', MagicMock(side_effect=channel.send)) as send:
+            client = fileclient.RemoteClient(fileclient.__opts__)
+            base = client.cache_file('salt://same.txt', 'base')
+            serves = [x for x in send.call_args_list if x[0][0]['cmd'] == '_serve_file']
+            self.assertTrue(serves)
+            dev = client.cache_file('salt://same.txt', 'dev')
+            self.assertEqual(
+                [x for x in send.call_args_list if x[0][0]['cmd'] == '_serve_file'],
+                serves)
+            self.assertNotEqual(base, dev)
+            self.assertTrue(os.path.samefile(base, dev))
+            with salt.utils.files.fopen(dev) as fp_:
+                self.assertEqual(fp_.read(), 'Same content in every saltenv\n')
+            # Files no longer in the cache are pruned from the store
+            self.assertEqual(client.prune_store(), [])
+            os.remove(base)
+            os.remove(dev)
+            self.assertEqual(len(client.prune_store()), 1)
+
+    def test_cache_dir_manifest(self):
+        '''
+        Ensure the hashes of the files of a directory are requested at once
+        '''
+        patched_opts = dict((x, y) for x, y in six.iteritems(self.minion_opts))
+        patched_opts.update(MOCKED_OPTS)
+        channel = salt.fileserver.FSChan(patched_opts)
+
+        with patch.dict(fileclient.__opts__, patched_opts), \
+                patch('salt.transport.Channel.factory', MagicMock(return_value=channel)), \
+                patch.object(channel, 'send', MagicMock(side_effect=channel.send)) as send:
+            client = fileclient.RemoteClient(fileclient.__opts__)
+            ret = client.cache_dir('salt://{0}'.format(SUBDIR), 'base')
+            cmds = [x[0][0]['cmd'] for x in send.call_args_list]
+            self.assertEqual(cmds.count('_file_manifest'), 1)
+            self.assertNotIn('_file_hash', cmds)
+            self.assertNotIn('_file_find', cmds)
+            self.assertEqual(client.manifest, {})
+        self.assertEqual(len(ret), len(SUBDIR_FILES))
+        for subdir_file in SUBDIR_FILES:
+            cache_loc = os.path.join(fileclient.__opts__['cachedir'],
+                                     'files', 'base', SUBDIR, subdir_file)
+            with salt.utils.files.fopen(cache_loc) as fp_:
+                self.assertIn(subdir_file, fp_.read())
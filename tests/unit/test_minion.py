@@ -7,6 +7,8 @@
 from __future__ import absolute_import
 import copy
 import os
+import shutil
+import tempfile
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -16,6 +18,7 @@ from tests.support.helpers import skip_if_not_root
 # Import salt libs
 import salt.minion
 import salt.utils.event as event
+import salt.utils.files
 from salt.exceptions import SaltSystemExit
 import salt.syspaths
 import tornado
@@ -24,6 +27,25 @@ from salt.ext.six.moves import range
 __opts__ = {}
 
 
+class JobRecorder(object):
+    '''
+    A minion recording the pid of the process each job runs in
+    '''
+    def __init__(self, io_loop, proc_dir):
+        self.io_loop = io_loop
+        self.opts = {'multiprocessing': True}
+        self.proc_dir = proc_dir
+        self.connected = False
+        self.job_pool = None
+        self.functions = MagicMock(pack={'__context__': {'retcode': 0}})
+
+    def _target(self, minion_instance, opts, data, connected):
+        context = self.functions.pack['__context__']
+        with salt.utils.files.fopen(os.path.join(self.proc_dir, 'ran_' + data['jid']), 'w') as fp_:
+            fp_.write('{0} {1}'.format(os.getpid(), sorted(context)))
+        context['pkg.list_pkgs'] = {}
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def test_invalid_master_address(self):
@@ -256,6 +278,107 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             finally:
                 minion.destroy()
 
+    def test_job_heartbeats(self):
+        '''
+        Tests that the minion acknowledges the jobs it receives, then tells the master they still run or
+        finished, as per job_heartbeat_interval.
+        '''
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.minion.Minion._fire_master', MagicMock(return_value=True)), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True)), \
+                patch('salt.utils.minion.running', MagicMock(return_value=[{'jid': '1'}])):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            mock_opts['id'] = 'minion'
+            mock_opts['job_heartbeat_interval'] = 5
+            io_loop = tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            minion.connected = True
+            try:
+                io_loop.run_sync(lambda: minion._handle_decoded_payload({'fun': 'foo.bar', 'jid': '1'}))
+                events = salt.minion.Minion._fire_master.call_args[1]['events']
+                self.assertEqual(events[0]['tag'], 'salt/job/1/ack/minion')
+                self.assertEqual(events[0]['data']['state'], 'started')
+
+                minion._fire_job_heartbeats()
+                events = salt.minion.Minion._fire_master.call_args[1]['events']
+                self.assertEqual([event['data']['state'] for event in events], ['alive'])
+
+                # The job is done, once it could have been seen running
+                salt.utils.minion.running.return_value = []
+                minion._fire_job_heartbeats()
+                self.assertEqual(salt.minion.Minion._fire_master.call_count, 2)
+                minion.job_heartbeats['1'] -= 10
+                minion._fire_job_heartbeats()
+                events = salt.minion.Minion._fire_master.call_args[1]['events']
+                self.assertEqual([event['data']['state'] for event in events], ['finished'])
+                self.assertEqual(minion.job_heartbeats, {})
+            finally:
+                minion.destroy()
+
+    def test_job_worker_pool(self):
+        '''
+        Tests that the jobs queue for the pre-forked job workers, which are replaced after job_worker_max_jobs
+        jobs and when recycled.
+        '''
+        proc_dir = tempfile.mkdtemp()
+        io_loop = tornado.ioloop.IOLoop()
+        minion = JobRecorder(io_loop, proc_dir)
+        minion.job_pool = pool = salt.minion.JobWorkerPool(minion, 2, max_jobs=2)
+        pool.start()
+        try:
+            @tornado.gen.coroutine
+            def run_jobs():
+                for jid in range(6):
+                    yield pool.run({'jid': str(jid)}, True)
+                while len(pool.idle) < 2:
+                    yield tornado.gen.sleep(0.05)
+            io_loop.run_sync(run_jobs, timeout=60)
+
+            pids = []
+            for jid in range(6):
+                with salt.utils.files.fopen(os.path.join(proc_dir, 'ran_{0}'.format(jid))) as fp_:
+                    pid, context = fp_.read().split(' ', 1)
+                pids.append(int(pid))
+                # The jobs do not see the __context__ of the previous ones
+                self.assertEqual(context, "['retcode']")
+            self.assertNotIn(os.getpid(), pids)
+            self.assertGreaterEqual(len(set(pids)), 3)
+            for pid in set(pids):
+                self.assertLessEqual(pids.count(pid), 2)
+
+            old_pids = set(worker['process'].pid for worker in pool.idle)
+            pool.recycle()
+            self.assertEqual(len(pool.idle), 2)
+            self.assertFalse(old_pids & set(worker['process'].pid for worker in pool.idle))
+        finally:
+            pool.stop()
+            io_loop.close()
+            shutil.rmtree(proc_dir)
+
+    def test_handle_decoded_payload_job_worker_pool(self):
+        '''
+        Tests that the _handle_decoded_payload function hands the jobs to the job worker pool instead of forking a
+        process per job.
+        '''
+        future = tornado.concurrent.Future()
+        future.set_result(None)
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            io_loop = tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            minion.job_pool = MagicMock()
+            minion.job_pool.run.return_value = future
+            try:
+                mock_data = {'fun': 'foo.bar', 'jid': '1'}
+                io_loop.run_sync(lambda: minion._handle_decoded_payload(mock_data))
+                minion.job_pool.run.assert_called_once_with(mock_data, False)
+                self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count, 0)
+            finally:
+                minion.job_pool = None
+                minion.destroy()
+
     def test_beacons_before_connect(self):
         '''
         Tests that the 'beacons_before_connect' option causes the beacons to be initialized before connect.
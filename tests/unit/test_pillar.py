@@ -9,7 +9,10 @@
 
 # Import python libs
 from __future__ import absolute_import
+import os
+import shutil
 import tempfile
+import time
 
 # Import Salt Testing libs
 from tests.support.unit import skipIf, TestCase
@@ -18,6 +21,7 @@ from tests.support.paths import TMP
 
 # Import salt libs
 import salt.pillar
+import salt.utils.files
 import salt.utils.stringutils
 import salt.exceptions
 
@@ -220,6 +224,52 @@ class PillarTestCase(TestCase):
             'mocked-minion', 'fake_pillar', arg='foo',
             extra_minion_data={'fake_key': 'foo'})
 
+    def test_ext_pillar_concurrency(self):
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {
+                'dev': [],
+                'base': []
+            },
+            'file_roots': {
+                'dev': [],
+                'base': []
+            },
+            'extension_modules': '',
+            'ext_pillar': [{'slow': 0.3}, {'fast': 0}, {'hung': 5},
+                           {'reader': 'slow'}],
+            'ext_pillar_concurrency': 4,
+            'ext_pillar_serial': ['reader'],
+            'ext_pillar_timeout': {'hung': 0.5},
+        }
+
+        def _sleep(minion_id, pillar, delay):
+            time.sleep(delay)
+            return {'key': delay, 'delays': {delay: True}}
+
+        def _reader(minion_id, pillar, key):
+            return {'seen': sorted(pillar['delays'])}
+
+        with patch('salt.loader.pillars',
+                   MagicMock(return_value={'slow': _sleep, 'fast': _sleep,
+                                           'hung': _sleep, 'reader': _reader})):
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+        start = time.time()
+        ret, errors = pillar.ext_pillar({})
+        self.assertLess(time.time() - start, 1)
+        # Merged in the configured order, the slow source returning last
+        # does not override the fast one
+        self.assertEqual(ret['key'], 0)
+        self.assertEqual(ret['seen'], [0, 0.3])
+        self.assertEqual(errors, ['ext_pillar hung timed out after 0.5 seconds'])
+        self.assertEqual([key for key, _ in pillar.ext_pillar_timing],
+                         ['slow', 'fast', 'hung', 'reader'])
+        self.assertGreaterEqual(pillar.ext_pillar_timing[0][1], 0.3)
+
     def test_ext_pillar_with_extra_minion_data_val_list(self):
         opts = {
             'optimization_order': [0, 1, 2],
@@ -866,3 +916,91 @@ class AsyncRemotePillarTestCase(TestCase):
              'pillar_override': {},
              'extra_minion_data': {'path_to_add': 'fake_data'}},
             dictkey='pillar')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PillarCacheTestCase(TestCase):
+    '''
+    Tests for the PillarCache in salt.pillar
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(dir=TMP)
+        self.pillar_root = os.path.join(self.tmpdir, 'pillar')
+        os.makedirs(self.pillar_root)
+        self.opts = {'cachedir': self.tmpdir,
+                     'pillar_roots': {'base': [self.pillar_root]},
+                     'ext_pillar': [{'fake': ['repo']}],
+                     'pillar_cache_backend': 'disk',
+                     'pillar_cache_ttl': 3600,
+                     'pillar_cache_revision_interval': 0}
+        self.revision = 'rev1'
+        self.compiled = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        salt.pillar._PILLAR_SOURCE_REVISIONS.clear()
+        salt.pillar._PILLAR_MEMORY_CACHE.clear()
+
+    def _compile(self, grains=None, pillar_override=None, pillar=None):
+        def _compile_pillar():
+            self.compiled += 1
+            return pillar or {'compiled': self.compiled}
+
+        def _revision(*repos):
+            self.assertEqual(repos, ('repo',))
+            return self.revision
+
+        with patch('salt.pillar.Pillar',
+                   MagicMock(return_value=MagicMock(compile_pillar=_compile_pillar))), \
+                patch('salt.loader.pillar_revisions',
+                      MagicMock(return_value={'fake': _revision})):
+            return salt.pillar.PillarCache(
+                self.opts, grains or {'os': 'Ubuntu'}, 'minion', 'base',
+                pillar_override=pillar_override).compile_pillar()
+
+    def test_cache_hit(self):
+        self.assertEqual(self._compile(), {'compiled': 1})
+        self.assertEqual(self._compile(), {'compiled': 1})
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.tmpdir, 'pillar_cache', 'minion')))
+
+    def test_memory_backend(self):
+        self.opts['pillar_cache_backend'] = 'memory'
+        self.assertEqual(self._compile(), {'compiled': 1})
+        self.assertEqual(self._compile(), {'compiled': 1})
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'pillar_cache')))
+
+    def test_invalidate_grains(self):
+        self._compile()
+        self.assertEqual(self._compile(grains={'os': 'Debian'}), {'compiled': 2})
+        self.assertEqual(self._compile(grains={'os': 'Debian'}), {'compiled': 2})
+
+    def test_invalidate_pillar_roots(self):
+        self._compile()
+        with salt.utils.files.fopen(os.path.join(self.pillar_root, 'top.sls'), 'w') as fp_:
+            fp_.write('base: {}')
+        self.assertEqual(self._compile(), {'compiled': 2})
+        self.assertEqual(self._compile(), {'compiled': 2})
+
+    def test_invalidate_ext_pillar_revision(self):
+        self._compile()
+        self.revision = 'rev2'
+        self.assertEqual(self._compile(), {'compiled': 2})
+
+    def test_revision_interval(self):
+        self.opts['pillar_cache_revision_interval'] = 3600
+        self._compile()
+        self.revision = 'rev2'
+        self.assertEqual(self._compile(), {'compiled': 1})
+
+    def test_ttl(self):
+        self.opts['pillar_cache_ttl'] = 0
+        self._compile()
+        self.assertEqual(self._compile(), {'compiled': 2})
+
+    def test_not_cached(self):
+        self.assertEqual(self._compile(pillar_override={'foo': 'bar'}), {'compiled': 1})
+        self.assertEqual(self._compile(pillar_override={'foo': 'bar'}), {'compiled': 2})
+        errors = {'_errors': ['failed']}
+        self.assertEqual(self._compile(pillar=errors), errors)
+        self.assertEqual(self._compile(), {'compiled': 4})
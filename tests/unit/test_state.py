@@ -23,6 +23,7 @@ from tests.support.paths import BASE_FILES
 # Import Salt libs
 import salt.exceptions
 import salt.state
+import salt.utils.files
 from salt.utils.odict import OrderedDict
 from salt.utils.decorators import state as statedecorators
 
@@ -74,6 +75,114 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
                 state_obj.call_high(high_data)
 
 
+    def test_requisite_index(self):
+        '''
+        Test that the requisite index finds the same chunks, in the same
+        order, as matching every chunk
+        '''
+        chunks = [{'state': 'pkg', '__id__': 'vim', 'name': 'vim', '__sls__': 'editors'},
+                  {'state': 'file', '__id__': 'vimrc', 'name': '/etc/vimrc', '__sls__': 'editors'},
+                  {'state': 'pkg', '__id__': 'editors', 'name': 'vim', '__sls__': 'editors.extra'},
+                  {'state': 'service', '__id__': 'vim', 'name': 'vimd', '__sls__': 'daemons'},
+                  {'state': 'cmd', '__id__': 'reload', 'name': 'reload', '__sls__': 'daemons'}]
+        index = salt.state.RequisiteIndex(chunks)
+        for req_key, req_val in (('id', 'vim'), ('pkg', 'vim'), ('file', 'vim'),
+                                 ('file', '/etc/vimrc'), ('id', 'vim*'), ('service', 'vim'),
+                                 ('sls', 'editors'), ('sls', 'editors*'), ('sls', 'missing'),
+                                 ('id', 'editors'), ('id', 'rel?ad'), ('cmd', 'missing')):
+            self.assertEqual(index.match(req_key, req_val), index.scan(req_key, req_val),
+                             '{0}: {1}'.format(req_key, req_val))
+        self.assertEqual([chunk['__sls__'] for chunk in index.match('id', 'vim')],
+                         ['editors', 'editors.extra', 'daemons'])
+        self.assertTrue(index.covers(chunks))
+        chunks.pop()
+        self.assertFalse(index.covers(chunks))
+
+    def _requisites_high(self):
+        def _state(fun, *args):
+            return OrderedDict([('test', [fun] + list(args)), ('__sls__', 'sls1'), ('__env__', 'base')])
+
+        high = OrderedDict([
+            ('last', _state('succeed_without_changes',
+                            {'require': [{'test': 'second'}, {'sls': 'sls*'}]})),
+            ('second', _state('succeed_with_changes', {'name': 'second_name'},
+                              {'require': ['first']})),
+            ('first', _state('succeed_without_changes')),
+            ('watcher', _state('succeed_without_changes', {'watch': [{'test': 'sec*'}]})),
+            ('before', _state('succeed_without_changes', {'require_in': ['second_name']})),
+            ('missing', _state('succeed_without_changes', {'require': [{'test': 'nothere'}]})),
+            ('failed', _state('fail_without_changes', {'order': 1})),
+            ('onfail', _state('succeed_with_changes', {'onfail': ['failed']})),
+        ])
+        high['watcher']['__sls__'] = 'other'
+        high['missing']['__sls__'] = 'other'
+        high['last']['__sls__'] = 'last'
+        high['failed']['__sls__'] = 'other'
+        high['onfail']['__sls__'] = 'other'
+        return high
+
+    def _call_requisites_high(self, **opts):
+        with patch('salt.state.State._gather_pillar'):
+            minion_opts = self.get_temp_config('minion')
+            minion_opts['test'] = True
+            minion_opts.update(opts)
+            state_obj = salt.state.State(minion_opts)
+            ret = state_obj.call_high(self._requisites_high())
+        return dict((salt.state.split_low_tag(tag)['__id__'], val)
+                    for tag, val in ret.items())
+
+    def _assert_requisites(self, ret):
+        order = sorted(ret, key=lambda id_: ret[id_]['__run_num__'])
+        self.assertEqual(order[0], 'failed')
+        self.assertLess(order.index('first'), order.index('second'))
+        self.assertLess(order.index('before'), order.index('second'))
+        self.assertLess(order.index('second'), order.index('last'))
+        self.assertLess(order.index('second'), order.index('watcher'))
+        self.assertTrue(ret['last']['result'])
+        self.assertTrue(ret['watcher']['result'])
+        self.assertFalse(ret['missing']['result'])
+        self.assertIn('nothere', ret['missing']['comment'])
+        self.assertTrue(ret['onfail']['changes'])
+
+    def test_requisites(self):
+        '''
+        Test the resolution of the requisites of a state run
+        '''
+        self._assert_requisites(self._call_requisites_high())
+
+    def test_requisites_state_workers(self):
+        '''
+        Test that the state workers honor the requisites and the order and
+        return the same results as the serial run
+        '''
+        serial = self._call_requisites_high()
+        ret = self._call_requisites_high(state_workers=3)
+        self._assert_requisites(ret)
+        for id_ in serial:
+            self.assertEqual(ret[id_]['result'], serial[id_]['result'], id_)
+            self.assertEqual(ret[id_]['changes'], serial[id_]['changes'], id_)
+        self.assertEqual(sorted(val['__run_num__'] for val in ret.values()),
+                         list(range(len(ret))))
+
+    def test_auto_order_state_workers(self):
+        '''
+        Test that the definition order is only dropped when the state workers
+        actually run the chunks
+        '''
+        def _orders(**opts):
+            highstate = MagicMock(iorder=0, opts=dict(state_auto_order=True, **opts))
+            state = {'first': {'test': ['nop']}, 'second': {'test': ['nop']}}
+            salt.state.BaseHighState._handle_iorder(highstate, state)
+            return [arg for args in state.values() for arg in args['test'] if isinstance(arg, dict)]
+
+        self.assertEqual(len(_orders()), 2)
+        self.assertEqual(len(_orders(state_workers=1)), 2)
+        with patch('salt.utils.platform.is_windows', MagicMock(return_value=True)):
+            self.assertEqual(len(_orders(state_workers=3)), 2)
+        with patch('salt.utils.platform.is_windows', MagicMock(return_value=False)):
+            self.assertEqual(_orders(state_workers=3), [])
+
+
 class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
     def setUp(self):
         root_dir = tempfile.mkdtemp(dir=integration.TMP)
@@ -171,6 +280,72 @@ class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         ret = salt.state.find_sls_ids('issue-47182.stateA.newer', high)
         self.assertEqual(ret, [('somestuff', 'cmd')])
 
+    def test_render_cache(self):
+        '''
+        Test that the compiled SLS files are reused until the files they
+        import change, and that the SLS files calling other execution
+        functions are not cached
+        '''
+        files = {
+            'top.sls': 'base:\n  match:\n    - web\n    - uptime\n    - alias\n    - opts\n',
+            'web.sls': ('{% from "map.jinja" import port with context %}\n'
+                        'web:\n  test.succeed_without_changes:\n'
+                        '    - name: {{ salt["pillar.get"]("web:name", "nginx") }}:{{ port }}\n'
+                        'web_z:\n  test.succeed_without_changes: []\n'
+                        'web_a:\n  test.succeed_without_changes: []\n'),
+            'map.jinja': '{% set port = 80 %}\n',
+            'uptime.sls': ('uptime:\n  test.succeed_without_changes:\n'
+                           '    - name: {{ salt["cmd.run"]("echo up") }}\n'),
+            'alias.sls': ('{% set run = salt %}\n'
+                          'alias:\n  test.succeed_without_changes:\n'
+                          '    - name: {{ run["test.echo"]("alias") }}\n'),
+            'opts.sls': ('opts:\n  test.succeed_without_changes:\n'
+                         '    - name: {{ opts["id"] }}\n'),
+        }
+        self.config['state_render_cache'] = True
+        for name, contents in files.items():
+            with salt.utils.files.fopen(os.path.join(self.state_tree_dir, name), 'w') as fp_:
+                fp_.write(contents)
+
+        def _name(high, id_):
+            return [arg['name'] for arg in high[id_]['test']
+                    if isinstance(arg, dict) and 'name' in arg][0]
+
+        def _compile():
+            highstate = salt.state.HighState(self.config)
+            highstate.push_active()
+            try:
+                high = highstate.compile_highstate()
+            finally:
+                highstate.pop_active()
+            return high, highstate.render_stats, highstate.timing
+
+        high, stats, timing = _compile()
+        self.assertEqual(_name(high, 'web'), 'nginx:80')
+        self.assertEqual(stats, {'hits': 0, 'misses': 1, 'uncached': 3})
+        order = [id_ for id_ in high if id_.startswith('web')]
+        high, stats, timing = _compile()
+        self.assertEqual(_name(high, 'web'), 'nginx:80')
+        self.assertEqual(_name(high, 'uptime'), 'up')
+        self.assertEqual(_name(high, 'alias'), 'alias')
+        self.assertEqual(stats, {'hits': 1, 'misses': 0, 'uncached': 3})
+        # The cached SLS keeps the order its states are defined in
+        self.assertEqual([id_ for id_ in high if id_.startswith('web')], order)
+        self.assertEqual(order, ['web', 'web_z', 'web_a'])
+        self.assertTrue(timing['sls']['base:web']['cached'])
+        self.assertFalse(timing['sls']['base:uptime']['cached'])
+
+        with salt.utils.files.fopen(os.path.join(self.state_tree_dir, 'map.jinja'), 'w') as fp_:
+            fp_.write('{% set port = 8080 %}\n')
+        high, stats, timing = _compile()
+        self.assertEqual(_name(high, 'web'), 'nginx:8080')
+        self.assertEqual(stats, {'hits': 0, 'misses': 1, 'uncached': 3})
+
+        self.config['state_render_cache'] = False
+        high, stats, timing = _compile()
+        self.assertEqual(_name(high, 'web'), 'nginx:8080')
+        self.assertEqual(stats, {'hits': 0, 'misses': 0, 'uncached': 0})
+
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 @skipIf(pytest is None, 'PyTest is missing')
@@ -7,6 +7,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 import os
 import time
+import hashlib
 import threading
 
 # linux_distribution deprecated in py3.7
@@ -25,10 +26,15 @@ import tornado.gen
 
 # Import Salt libs
 import salt.config
+import salt.crypt
+import salt.master
+import salt.payload
 from salt.ext import six
 import salt.utils.process
+import salt.utils.stringutils
 import salt.transport.server
 import salt.transport.client
+import salt.transport.zeromq
 import salt.exceptions
 from salt.ext.six.moves import range
 from salt.transport.zeromq import AsyncReqMessageClientPool
@@ -338,3 +344,99 @@ class ZMQConfigTest(TestCase):
             assert salt.transport.zeromq._get_master_uri(master_ip=m_ip,
                                                          master_port=m_port,
                                                          source_port=s_port) == 'tcp://0.0.0.0:{0};{1}:{2}'.format(s_port, m_ip, m_port)
+
+
+class PubServerChannelPublishTest(TestCase):
+    '''
+    Tests for the MWorker side of ZeroMQPubServerChannel.publish
+    '''
+    def setUp(self):
+        self.pull_port = get_unused_localhost_port()
+        self.opts = {'ipc_mode': 'tcp',
+                     'tcp_master_publish_pull': self.pull_port,
+                     'sign_pub_messages': False,
+                     'zmq_filtering': False,
+                     'serial': 'msgpack',
+                     'cachedir': '/tmp',
+                     'cache': 'localfs',
+                     'pki_dir': '/tmp',
+                     'sock_dir': '/tmp'}
+        self.context = zmq.Context()
+        self.pull_sock = self.context.socket(zmq.PULL)
+        self.pull_sock.bind('tcp://127.0.0.1:{0}'.format(self.pull_port))
+        self.secrets = {'aes': {'secret': MagicMock(value=salt.crypt.Crypticle.generate_key_string())}}
+
+    def tearDown(self):
+        salt.transport.zeromq.ZeroMQPubServerChannel(self.opts).pub_close()
+        self.pull_sock.close(linger=0)
+        self.context.term()
+        del self.pull_sock
+        del self.context
+
+    def _recv(self):
+        self.assertTrue(self.pull_sock.poll(5000))
+        serial = salt.payload.Serial(self.opts)
+        return serial.loads(serial.loads(self.pull_sock.recv())['payload'])
+
+    def test_publish_reuses_socket_and_crypticle(self):
+        load = {'tgt_type': 'glob', 'tgt': '*', 'fun': 'test.ping', 'jid': '1'}
+        with patch.dict(salt.master.SMaster.secrets, self.secrets):
+            channel = salt.transport.zeromq.ZeroMQPubServerChannel(self.opts)
+            channel.publish(load)
+            sock = channel.pub_sock
+            crypticle = channel.crypticle
+            # A new channel in the same thread shares the socket
+            channel = salt.transport.zeromq.ZeroMQPubServerChannel(self.opts)
+            channel.publish(load)
+            self.assertIs(channel.pub_sock, sock)
+            self.assertIs(channel.crypticle, crypticle)
+            for _ in range(2):
+                payload = self._recv()
+                self.assertEqual(crypticle.loads(payload['load']), load)
+
+    def test_publish_rebuilds_crypticle_on_key_rotation(self):
+        load = {'tgt_type': 'glob', 'tgt': '*', 'fun': 'test.ping', 'jid': '1'}
+        with patch.dict(salt.master.SMaster.secrets, self.secrets):
+            channel = salt.transport.zeromq.ZeroMQPubServerChannel(self.opts)
+            crypticle = channel.crypticle
+            self.secrets['aes']['secret'].value = salt.crypt.Crypticle.generate_key_string()
+            self.assertIsNot(channel.crypticle, crypticle)
+            channel.publish(load)
+            payload = self._recv()
+            self.assertEqual(channel.crypticle.loads(payload['load']), load)
+
+
+class PubServerChannelFilteringTest(TestCase):
+    '''
+    Tests for the zmq_filtering fan-out in the publish daemon
+    '''
+    def setUp(self):
+        self.opts = {'serial': 'msgpack',
+                     'cachedir': '/tmp',
+                     'cache': 'localfs',
+                     'order_masters': False}
+        self.channel = salt.transport.zeromq.ZeroMQPubServerChannel(self.opts)
+
+    def tearDown(self):
+        del self.channel
+
+    def test_publish_filtered_shares_one_frame(self):
+        pub_sock = MagicMock()
+        topic_lst = ['minion{0}'.format(idx) for idx in range(5)]
+        self.channel._publish_filtered(pub_sock, b'payload', topic_lst)
+        sent = [call[0][0] for call in pub_sock.send.call_args_list]
+        self.assertEqual(len(sent), 10)
+        topics, frames = sent[::2], sent[1::2]
+        self.assertEqual(
+            topics,
+            [salt.utils.stringutils.to_bytes(hashlib.sha1(salt.utils.stringutils.to_bytes(topic)).hexdigest())
+             for topic in topic_lst]
+        )
+        self.assertTrue(all(frame is frames[0] for frame in frames))
+        self.assertEqual(frames[0].bytes, b'payload')
+
+    def test_publish_filtered_syndic(self):
+        pub_sock = MagicMock()
+        self.opts['order_masters'] = True
+        self.channel._publish_filtered(pub_sock, b'payload', ['minion'])
+        self.assertEqual(pub_sock.send.call_args_list[2][0][0], b'syndic')
@@ -41,9 +41,11 @@ if getattr(zmq, 'IPC_PATH_MAX_LEN', 103) <= 103:
 
 
 @contextmanager
-def eventpublisher_process():
-    proc = salt.utils.event.EventPublisher({'sock_dir': SOCK_DIR})
-    proc.start()
+def eventpublisher_process(shards=1):
+    procs = [salt.utils.event.EventPublisher({'sock_dir': SOCK_DIR}, shard=shard)
+             for shard in range(shards)]
+    for proc in procs:
+        proc.start()
     try:
         if os.environ.get('TRAVIS_PYTHON_VERSION', None) is not None:
             # Travis is slow
@@ -52,7 +54,8 @@ def eventpublisher_process():
             time.sleep(2)
         yield
     finally:
-        clean_proc(proc)
+        for proc in procs:
+            clean_proc(proc)
 
 
 class EventSender(Process):
@@ -292,6 +295,80 @@ class TestSaltEvent(TestCase):
             evt2 = me2.get_event(tag='evt1')
             self.assertGotEvent(evt2, {'data': 'foo1'})
 
+    def test_event_filtered(self):
+        '''Test the publisher only forwards the subscribed events'''
+        with eventpublisher_process():
+            me = salt.utils.event.MasterEvent(SOCK_DIR, listen=True)
+            self.assertTrue(me.filter_events())
+            me.subscribe('evt1')
+            # Give the publisher the time to get the filters
+            time.sleep(0.5)
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            me.fire_event({'data': 'foo1'}, 'evt1')
+            raw = me.subscriber.read_sync(timeout=5)
+            self.assertEqual(me.unpack(raw)[0], 'evt1')
+            evt2 = me.get_event(tag='evt2', wait=0.5)
+            self.assertIsNone(evt2)
+            # The tag last waited on is forwarded too
+            time.sleep(0.5)
+            me.fire_event({'data': 'foo3'}, 'evt2')
+            evt2 = me.get_event(tag='evt2')
+            self.assertGotEvent(evt2, {'data': 'foo3'})
+            # The extra filters are forwarded without subscribing to them
+            me.filter_events(tags=[['startswith', 'evt4']])
+            self.assertIn(['startswith', 'evt4'], me.pub_filters)
+            time.sleep(0.5)
+            me.fire_event({'data': 'foo4'}, 'evt4/sub')
+            raw = me.subscriber.read_sync(timeout=5)
+            self.assertEqual(me.unpack(raw)[0], 'evt4/sub')
+
+    def test_event_sharded(self):
+        '''Test the events go through the shards of the event bus'''
+        opts = {'event_publisher_shards': 2}
+        with eventpublisher_process(shards=2):
+            me = salt.utils.event.MasterEvent(SOCK_DIR, opts=opts, listen=True)
+            self.assertEqual(len(me.shard_uris), 2)
+            self.assertEqual(me.shard_uris[1][0],
+                             os.path.join(SOCK_DIR, 'master_event_pub_1.ipc'))
+            tags = ['evt{0}'.format(i) for i in range(10)]
+            shards = set(salt.utils.event.event_shard(tag, 2) for tag in tags)
+            self.assertEqual(shards, set([0, 1]))
+            for tag in tags:
+                me.fire_event({'data': tag}, tag)
+            got = set()
+            for _ in tags:
+                evt = me.get_event(full=True)
+                self.assertIsNotNone(evt)
+                self.assertEqual(evt['data']['data'], evt['tag'])
+                got.add(evt['tag'])
+            self.assertEqual(got, set(tags))
+            # The events of a job are kept in order
+            for i in range(20):
+                me.fire_event({'data': i}, 'salt/job/1234/ret/minion{0}'.format(i))
+            for i in range(20):
+                evt = me.get_event(tag='salt/job/1234/ret/')
+                self.assertGotEvent(evt, {'data': i})
+
+    def test_event_shard(self):
+        '''Test the events of a job go through the shard of its jid'''
+        shard = salt.utils.event.event_shard
+        self.assertEqual(shard('salt/job/1234/ret/minion', 1), 0)
+        self.assertEqual(shard('salt/job/1234/ret/minion', 8),
+                         shard('1234', 8))
+        self.assertEqual(shard('salt/job/1234/new', 8),
+                         shard('salt/job/1234/prog/minion/0', 8))
+
+    def test_match_tag_filters(self):
+        '''Test the matching of the filters of subscribers'''
+        match = salt.utils.event.match_tag_filters
+        self.assertTrue(match('salt/job/1/ret/m', [['startswith', 'salt/job/1']]))
+        self.assertFalse(match('salt/job/2/ret/m', [['startswith', 'salt/job/1']]))
+        self.assertTrue(match('salt/job/2/ret/m', [['startswith', 'salt/job/1'],
+                                                   ['regex', 'salt/job/[0-9]/ret']]))
+        self.assertTrue(match('salt/auth', [['fnmatch', 'salt/a*']]))
+        self.assertTrue(match('salt/auth', [['startswith', '']]))
+        self.assertFalse(match('salt/auth', []))
+
     @expectedFailure
     def test_event_nested_sub_all(self):
         '''Test nested event subscriptions do not drop events, get event for all tags'''
@@ -2,12 +2,20 @@
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals
+import os
 import sys
+import shutil
+import tempfile
+import time
 
 # Import Salt Libs
+import salt.cache
+import salt.config
+import salt.utils.files
 import salt.utils.minions
 
 # Import Salt Testing Libs
+from tests.support.paths import TMP
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import (
     patch,
@@ -509,3 +517,203 @@ class NodegroupCompTest(TestCase):
         # If this works, it should also print an error to the console
         ret = salt.utils.minions.nodegroup_comp('group1', referenced_nodegroups)
         self.assertEqual(ret, [])
+
+
+class MinionDataIndexTestCase(TestCase):
+    '''
+    Test that targeting through the minion data index gives the same results
+    as matching the cached data of every minion
+    '''
+    MINIONS = {
+        'web1': {'grains': {'os': 'Ubuntu', 'roles': ['web', 'db'], 'num_cpus': 4,
+                            'ec2_tags': {'env': 'prod'}},
+                 'pillar': {'team': 'Ops', 'users': [{'bob': {'uid': 1000}}]}},
+        'web2': {'grains': {'os': 'ubuntu', 'roles': ['web'], 'num_cpus': 2,
+                            'ec2_tags': {'env': 'dev'}},
+                 'pillar': {'team': 'dev'}},
+        'db1': {'grains': {'os': 'CentOS', 'roles': 'db', 'num_cpus': 4,
+                           'ec2_tags': {'env': 'prod:eu'}},
+                'pillar': {'team': 'ops', 'users': [{'alice': {'uid': 1001}}]}},
+        'nodata': {},
+    }
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(dir=TMP)
+        self.opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        self.opts.update({'cachedir': os.path.join(self.tmpdir, 'cache'),
+                          'pki_dir': os.path.join(self.tmpdir, 'pki'),
+                          'cache': 'localfs',
+                          'minion_data_cache': True,
+                          'minion_data_cache_index_interval': 0})
+        os.makedirs(os.path.join(self.opts['pki_dir'], 'minions'))
+        self.cache = salt.cache.Cache(self.opts)
+        for minion_id, mdata in self.MINIONS.items():
+            self.cache.store('minions/{0}'.format(minion_id), 'data', mdata)
+        for minion_id in list(self.MINIONS) + ['nocache']:
+            with salt.utils.files.fopen(os.path.join(self.opts['pki_dir'], 'minions', minion_id), 'w'):
+                pass
+        salt.utils.minions._DATA_INDEXES.clear()
+
+    def tearDown(self):
+        salt.utils.minions._DATA_INDEXES.clear()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        del self.cache
+        del self.opts
+
+    def _check(self, expr, tgt_type, greedy=True):
+        self.opts['minion_data_cache_index'] = False
+        expected = salt.utils.minions.CkMinions(self.opts).check_minions(expr, tgt_type, greedy=greedy)
+        self.opts['minion_data_cache_index'] = True
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        self.assertIsNotNone(ckminions.data_index)
+        ret = ckminions.check_minions(expr, tgt_type, greedy=greedy)
+        self.assertEqual(sorted(ret['minions']), sorted(expected['minions']),
+                         '{0} {1} greedy={2}'.format(tgt_type, expr, greedy))
+        return sorted(ret['minions'])
+
+    def test_equivalence(self):
+        '''
+        Compare indexed and unindexed results over a range of expressions
+        '''
+        targets = [('os:ubuntu', 'grain'),
+                   ('os:UBUNTU', 'grain'),
+                   ('os:Ubun*', 'grain'),
+                   ('os:centos', 'grain'),
+                   ('roles:web', 'grain'),
+                   ('roles:db', 'grain'),
+                   ('num_cpus:4', 'grain'),
+                   ('ec2_tags:env', 'grain'),
+                   ('ec2_tags:env:prod', 'grain'),
+                   ('ec2_tags:env:prod:eu', 'grain'),
+                   ('ec2_tags:*:prod', 'grain'),
+                   ('missing:foo', 'grain'),
+                   ('os', 'grain'),
+                   ('os:^ub.*', 'grain_pcre'),
+                   ('team:ops', 'pillar'),
+                   ('team:Ops', 'pillar_exact'),
+                   ('team:OPS', 'pillar_exact'),
+                   ('users:bob', 'pillar'),
+                   ('users:bob:uid:1000', 'pillar'),
+                   ('team:o.*', 'pillar_pcre'),
+                   ('G@os:ubuntu and I@team:ops', 'compound'),
+                   ('G@roles:db or not G@num_cpus:4', 'compound')]
+        for expr, tgt_type in targets:
+            for greedy in (True, False):
+                self._check(expr, tgt_type, greedy=greedy)
+
+    def test_index_follows_cache_updates(self):
+        '''
+        Data stored by another process is picked up and data stored through
+        update_data_index is used without reading the cache again
+        '''
+        self.assertEqual(self._check('os:centos', 'grain', greedy=False), ['db1'])
+        mdata = {'grains': {'os': 'CentOS'}, 'pillar': {}}
+        self.cache.store('minions/web2', 'data', mdata)
+        # Make the update visible to the one second resolution of the driver
+        index = salt.utils.minions._DATA_INDEXES[('localfs', self.opts['cachedir'])]
+        index.minions['web2'] = (index.minions['web2'][0] - 1,) + index.minions['web2'][1:]
+        self.assertEqual(self._check('os:centos', 'grain', greedy=False), ['db1', 'web2'])
+
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        mdata = {'grains': {'os': 'Debian'}, 'pillar': {}}
+        self.cache.store('minions/web1', 'data', mdata)
+        # Index it a second later than the write, as the driver only reports
+        # whole seconds entries indexed in the same second are re-read
+        with patch('time.time', MagicMock(return_value=time.time() + 1)):
+            ckminions.update_data_index('web1', mdata)
+        fetch_banks = MagicMock(wraps=ckminions.cache.fetch_banks)
+        with patch.object(ckminions.cache, 'fetch_banks', fetch_banks):
+            ret = ckminions.check_minions('os:debian', 'grain', greedy=False)
+        self.assertEqual(ret['minions'], ['web1'])
+        for args, _ in fetch_banks.call_args_list:
+            self.assertNotIn('minions/web1', args[0])
+
+        self.cache.flush('minions/db1')
+        self.assertEqual(self._check('os:centos', 'grain', greedy=False), ['web2'])
+
+    def test_minions_without_data(self):
+        '''
+        A cached minion without data is targeted the same with and without
+        the index
+        '''
+        self.cache.store('minions/mineonly', 'mine', {'network.ip_addrs': []})
+        with salt.utils.files.fopen(os.path.join(self.opts['pki_dir'], 'minions', 'mineonly'), 'w'):
+            pass
+        targets = [('os:ubuntu', 'grain'),
+                   ('os:Ubun*', 'grain'),
+                   ('team:ops', 'pillar'),
+                   ('team:o.*', 'pillar_pcre'),
+                   ('G@os:ubuntu or I@team:ops', 'compound')]
+        for expr, tgt_type in targets:
+            for greedy in (True, False):
+                self.assertNotIn('mineonly', self._check(expr, tgt_type, greedy=greedy))
+        self.assertIn('mineonly', self._check('not G@os:centos', 'compound'))
+
+    def test_refresh_interval(self):
+        '''
+        The update times of the indexed minions are only checked again once
+        the interval has passed
+        '''
+        self.opts.update({'minion_data_cache_index': True,
+                          'minion_data_cache_index_interval': 60})
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        updated = MagicMock(wraps=ckminions.cache.updated)
+        with patch.object(ckminions.cache, 'updated', updated):
+            ckminions.check_minions('os:centos', 'grain', greedy=False)
+            self.assertEqual(updated.call_count, len(self.MINIONS))
+            ckminions.check_minions('os:ubuntu', 'grain', greedy=False)
+            self.assertEqual(updated.call_count, len(self.MINIONS))
+            # A new minion is indexed right away
+            self.cache.store('minions/web3', 'data', {'grains': {'os': 'CentOS'}})
+            ret = ckminions.check_minions('os:centos', 'grain', greedy=False)
+            self.assertEqual(sorted(ret['minions']), ['db1', 'web3'])
+            self.assertEqual(updated.call_count, len(self.MINIONS) + 1)
+            with patch('time.time', MagicMock(return_value=time.time() + 61)):
+                ckminions.check_minions('os:centos', 'grain', greedy=False)
+            self.assertEqual(updated.call_count, 2 * len(self.MINIONS) + 2)
+
+
+class PkiDirMinionsTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.pki_dir_minions
+    '''
+    def setUp(self):
+        self.pki_dir = tempfile.mkdtemp(dir=TMP)
+        for minion_id in ('beta', 'Alpha', '.key_cache'):
+            with salt.utils.files.fopen(os.path.join(self.pki_dir, minion_id), 'w'):
+                pass
+        os.mkdir(os.path.join(self.pki_dir, 'notakey'))
+        salt.utils.minions._PKI_DIRS.clear()
+
+    def tearDown(self):
+        salt.utils.minions._PKI_DIRS.clear()
+        shutil.rmtree(self.pki_dir, ignore_errors=True)
+
+    def _backdate(self, seconds=10):
+        # Pretend the directory was last changed well before it was listed
+        mtime = time.time() - seconds
+        os.utime(self.pki_dir, (mtime, mtime))
+
+    def test_listing(self):
+        self.assertEqual(salt.utils.minions.pki_dir_minions(self.pki_dir), ['Alpha', 'beta'])
+
+    def test_listing_is_cached_until_the_directory_changes(self):
+        self._backdate()
+        self.assertEqual(salt.utils.minions.pki_dir_minions(self.pki_dir), ['Alpha', 'beta'])
+        with patch('os.listdir', MagicMock(side_effect=AssertionError)):
+            self.assertEqual(salt.utils.minions.pki_dir_minions(self.pki_dir), ['Alpha', 'beta'])
+
+        with salt.utils.files.fopen(os.path.join(self.pki_dir, 'gamma'), 'w'):
+            pass
+        self._backdate(5)
+        self.assertEqual(salt.utils.minions.pki_dir_minions(self.pki_dir), ['Alpha', 'beta', 'gamma'])
+
+        os.remove(os.path.join(self.pki_dir, 'beta'))
+        self.assertEqual(salt.utils.minions.pki_dir_minions(self.pki_dir), ['Alpha', 'gamma'])
+
+    def test_recent_listing_is_not_trusted(self):
+        salt.utils.minions.pki_dir_minions(self.pki_dir)
+        listdir = MagicMock(wraps=os.listdir)
+        with patch('os.listdir', listdir):
+            salt.utils.minions.pki_dir_minions(self.pki_dir)
+        listdir.assert_called_once_with(self.pki_dir)